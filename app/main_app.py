@@ -1,6 +1,15 @@
+import json
+import os
+import re
+import uuid
+from collections import deque
+from itertools import islice
+
 import streamlit as st
 import requests
 from datetime import datetime, timezone, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # --- Configuration and Helper Functions ---
 
@@ -8,38 +17,177 @@ from datetime import datetime, timezone, timedelta
 BACKEND_URL = "http://localhost:8001"
 STREAM_ENDPOINT = f"{BACKEND_URL}/chat/stream"
 
+# 연결 수립 제한 시간(초)과, 스트리밍 중 다음 데이터가 오지 않을 때까지 기다리는 시간(초)
+# 읽기 제한 시간은 전체 응답 시간이 아니라 데이터 사이의 공백 시간에 적용되므로,
+# 토큰이 계속 들어오는 긴 답변은 중간에 끊기지 않습니다.
+CONNECT_TIMEOUT = 5
+READ_IDLE_TIMEOUT = 60
+# 동시에 유지할 백엔드 연결 수 (Streamlit 서버 프로세스 전체 공유)
+HTTP_POOL_SIZE = 20
+
 # 한국 시간(KST)을 위한 timezone 객체 생성
 KST = timezone(timedelta(hours=9))
 
-def stream_response_generator(user_input: str):
+# 대화 기록: 세션당 최대 보관 턴 수와, 한 번에 화면에 그리는 턴 수
+HISTORY_MAX_TURNS = 200
+HISTORY_PAGE_SIZE = 10
+# 대화 기록을 파일로 저장할 디렉토리 (비어 있으면 저장하지 않음)
+# 저장하면 페이지를 새로고침해도 URL의 sid로 이전 대화를 복원합니다.
+CHAT_HISTORY_DIR = os.getenv("CHAT_HISTORY_DIR", "")
+# 서버 세션을 처음 시작할 때 함께 보내는 최근 대화 턴 수
+SESSION_SEED_TURNS = 5
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """
+    Streamlit 서버 프로세스 전체에서 공유하는 HTTP 세션.
+    연결을 재사용(keep-alive)하므로 질문마다 TCP 연결을 새로 맺지 않습니다.
+    """
+    session = requests.Session()
+    # 연결 단계 실패만 재시도합니다. (요청이 전송된 뒤의 POST는 재시도하지 않음)
+    retry = Retry(total=None, connect=2, read=0, status=0, other=0, backoff_factor=0.2)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _history_path(session_id: str) -> str:
+    return os.path.join(CHAT_HISTORY_DIR, f"{session_id}.jsonl")
+
+
+def get_session_id() -> str:
+    """URL 쿼리(sid)에 저장하는 대화 세션 ID. 없으면 새로 만듭니다."""
+    session_id = st.query_params.get("sid", "")
+    if not re.fullmatch(r"[0-9a-f]{32}", session_id):
+        session_id = uuid.uuid4().hex
+        st.query_params["sid"] = session_id
+    return session_id
+
+
+def load_history(session_id: str) -> deque:
+    """저장된 대화 기록 중 최근 HISTORY_MAX_TURNS개의 턴을 불러옵니다."""
+    history = deque(maxlen=HISTORY_MAX_TURNS)
+    if CHAT_HISTORY_DIR and os.path.exists(_history_path(session_id)):
+        with open(_history_path(session_id), encoding="utf-8") as f:
+            history.extend(json.loads(line) for line in f if line.strip())
+    return history
+
+
+def save_turn(session_id: str, turn: dict):
+    """대화 턴 하나를 기록 파일 끝에 추가합니다."""
+    if not CHAT_HISTORY_DIR:
+        return
+    os.makedirs(CHAT_HISTORY_DIR, exist_ok=True)
+    with open(_history_path(session_id), "a", encoding="utf-8") as f:
+        f.write(json.dumps(turn, ensure_ascii=False) + "\n")
+
+
+def time_label(prefix: str, value: datetime) -> str:
+    # 다시 그릴 때마다 날짜를 포맷하지 않도록 저장 시점에 HTML을 만들어 둡니다.
+    return f'<p style="font-size: 12px; color: #888888; text-align: right;">{prefix}: {value.strftime("%Y-%m-%d %H:%M:%S")}</p>'
+
+
+def render_turn(turn: dict):
+    with st.chat_message("user"):
+        st.markdown(turn["prompt"])
+        st.markdown(turn["request_label"], unsafe_allow_html=True)
+    with st.chat_message("assistant"):
+        st.markdown(turn["response"])
+        st.markdown(turn["response_label"], unsafe_allow_html=True)
+
+
+def iter_sse_events(response):
+    """
+    SSE 응답을 (event, data) 튜플로 파싱합니다.
+    chunk_size=None으로 읽어 서버가 보낸 토큰을 모으지 않고 바로 전달합니다.
+    `iter_lines`는 str.splitlines 기준(\\u2028, \\x85, \\x0c 등)으로도 줄을 나눠 토큰 안의 문자가
+    `data:` 프레임을 자를 수 있으므로, 디코딩한 스트림을 "\\n"에서만 나눕니다.
+    """
+    event, data_lines = "message", []
+    buffer = ""
+    for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line = line[:-1] if line.endswith("\r") else line
+            if not line:
+                # 빈 줄은 SSE 프레임의 끝
+                if data_lines:
+                    try:
+                        yield event, json.loads("\n".join(data_lines))
+                    except json.JSONDecodeError:
+                        # 깨진 프레임 하나 때문에 화면 전체가 멈추지 않도록 건너뜁니다.
+                        print(f"SSE 프레임을 파싱하지 못해 건너뜁니다: {data_lines!r}")
+                event, data_lines = "message", []
+            elif line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:"):].lstrip())
+
+
+def build_request(user_input: str) -> dict:
     """
-    백엔드 API에 스트리밍 요청을 보내고, 타임아웃을 포함한 예외를 처리
+    첫 질문은 session_id 없이 보내 서버의 시맨틱 캐시와 같은 질문 합치기를 사용할 수 있게 하고,
+    이전 대화가 생긴 뒤부터 session_id를 보내 서버 세션에 이어서 질문합니다.
+    서버 세션을 처음 시작하는 요청에는 최근 대화를 함께 보내 첫 턴부터 대화가 이어지게 합니다.
+    """
+    payload = {"message": user_input}
+    history = st.session_state.history
+    if history:
+        payload["session_id"] = st.session_state.session_id
+        if not st.session_state.server_session_started:
+            recent = islice(history, max(0, len(history) - SESSION_SEED_TURNS), None)
+            payload["history"] = [{"question": turn["prompt"], "answer": turn["response"]} for turn in recent]
+    return payload
+
+
+def stream_response_generator(payload: dict):
+    """
+    백엔드 API에 스트리밍 요청을 보내고 SSE 이벤트(token/tool_start/tool_end/error/done)를 전달합니다.
+    거절(429)과 타임아웃을 포함한 연결 오류는 각각 `rejected`/`error` 이벤트로 전달합니다.
     """
     try:
-        # 60초 타임아웃 설정
-        with requests.post(
-            STREAM_ENDPOINT, json={"message": user_input}, stream=True, timeout=60
+        # 연결 풀의 세션을 재사용하고, 연결/읽기 공백 제한 시간을 따로 적용
+        with get_http_session().post(
+            STREAM_ENDPOINT,
+            json=payload,
+            stream=True,
+            timeout=(CONNECT_TIMEOUT, READ_IDLE_TIMEOUT),
         ) as response:
+            if response.status_code == 429:
+                # 서버가 동시 실행 한도에 도달해 거절한 경우
+                yield "rejected", {"retry_after": response.headers.get("Retry-After", "잠시")}
+                return
             response.raise_for_status()  # 200 OK가 아닌 경우 예외 발생
-            for chunk in response.iter_content(chunk_size=None, decode_unicode=True):
-                yield chunk
+            response.encoding = "utf-8"
+            # done 이후에도 스트림 끝까지 읽어야 연결이 닫히지 않고 풀로 돌아가 재사용됩니다.
+            for event, data in iter_sse_events(response):
+                if event != "done":
+                    yield event, data
     # Timeout 예외를 별도로 처리
+    except requests.exceptions.ConnectTimeout:
+        yield "error", {"message": f"서버에 연결하지 못했습니다. ({CONNECT_TIMEOUT}초) 백엔드 서버가 실행 중인지 확인해 주세요."}
     except requests.exceptions.Timeout:
-        error_message = "요청 시간이 초과되었습니다. (60초) 서버가 응답하는 데 시간이 더 필요하거나, 문제가 발생했을 수 있습니다."
-        st.error(error_message)
-        yield ""
+        yield "error", {"message": f"서버가 {READ_IDLE_TIMEOUT}초 동안 응답을 보내지 않았습니다. 서버가 응답하는 데 시간이 더 필요하거나, 문제가 발생했을 수 있습니다."}
     except requests.exceptions.RequestException as e:
-        error_message = f"서버 연결에 실패했습니다: {e}"
-        st.error(error_message)
-        yield ""
+        yield "error", {"message": f"서버 연결에 실패했습니다: {e}"}
 
 # --- UI Layout ---
 
 st.set_page_config(page_title="AI 업무 자동화 비서", page_icon="🤖", layout="wide")
 
 # 세션 상태 변수 초기화
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+if "session_id" not in st.session_state:
+    st.session_state.session_id = get_session_id()
+if "history" not in st.session_state:
+    # 오래된 턴부터 순서대로 추가만 하는 기록 (최대 HISTORY_MAX_TURNS개, 초과분은 앞에서 버림)
+    st.session_state.history = load_history(st.session_state.session_id)
+if "server_session_started" not in st.session_state:
+    # 이 브라우저 세션에서 session_id를 보낸 요청이 성공했는지 (서버에 세션이 생겼는지)
+    st.session_state.server_session_started = False
+if "history_visible" not in st.session_state:
+    st.session_state.history_visible = HISTORY_PAGE_SIZE
 if "prompt_to_submit" not in st.session_state:
     st.session_state.prompt_to_submit = ""
 if "prompt_to_process" not in st.session_state:
@@ -77,42 +225,56 @@ with right_column:
     if st.session_state.prompt_to_process:
         prompt = st.session_state.prompt_to_process
         with new_chat_container:
-            request_time = datetime.now(KST)
+            request_label = time_label("요청", datetime.now(KST))
             with st.chat_message("user"):
                 st.markdown(prompt)
-                st.markdown(f'<p style="font-size: 12px; color: #888888; text-align: right;">요청: {request_time.strftime("%Y-%m-%d %H:%M:%S")}</p>', unsafe_allow_html=True)
+                st.markdown(request_label, unsafe_allow_html=True)
 
             with st.chat_message("assistant"):
                 with st.spinner("AI 비서가 분석 중입니다..."):
+                    status = st.empty()
                     placeholder = st.empty()
                     full_response = ""
-                    for chunk in stream_response_generator(prompt):
-                        full_response += chunk
-                        placeholder.markdown(full_response + "▌")
+                    failed = False
+                    payload = build_request(prompt)
+                    for event, data in stream_response_generator(payload):
+                        if event == "token":
+                            full_response += data["text"]
+                            placeholder.markdown(full_response + "▌")
+                        elif event == "tool_start":
+                            status.caption(f"🔧 `{data['name']}` 도구를 실행하는 중입니다...")
+                        elif event == "tool_end":
+                            status.caption(f"✅ `{data['name']}` 도구 실행을 완료했습니다.")
+                        elif event == "rejected":
+                            failed = True
+                            st.warning(f"요청이 많아 지금은 처리할 수 없습니다. {data['retry_after']}초 후에 다시 시도해 주세요.")
+                        elif event == "error":
+                            failed = True
+                            st.error(f"답변 생성 중 오류가 발생했습니다: {data['message']}")
+                    status.empty()
                     placeholder.markdown(full_response)
                     response = full_response
                 
-                response_time = datetime.now(KST)
-                st.markdown(f'<p style="font-size: 12px; color: #888888; text-align: right;">완료: {response_time.strftime("%Y-%m-%d %H:%M:%S")}</p>', unsafe_allow_html=True)
-
-        # ✨ 해결책: 저장 순서를 [질문] -> [답변] 순으로 수정합니다.
-        # 이렇게 하면 session_state.messages 리스트는 [답변, 질문, 이전 답변, 이전 질문, ...] 순이 됩니다.
-        st.session_state.messages.insert(0, {"role": "user", "content": prompt, "time": request_time})
-        st.session_state.messages.insert(0, {"role": "assistant", "content": response, "time": response_time})
-        
+                response_label = time_label("완료", datetime.now(KST))
+                st.markdown(response_label, unsafe_allow_html=True)
+
         st.session_state.prompt_to_process = ""
-        st.rerun()
+        if not failed:
+            # 질문/답변을 한 턴으로 묶어 기록 끝에 추가합니다. (O(1), 화면에는 최신 턴부터 표시)
+            turn = {"prompt": prompt, "response": response, "request_label": request_label, "response_label": response_label}
+            st.session_state.history.append(turn)
+            save_turn(st.session_state.session_id, turn)
+            if "session_id" in payload:
+                st.session_state.server_session_started = True
+            st.rerun()
 
     with past_chat_container:
-        # 저장 순서에 맞춰 화면 표시 로직을 유지합니다.
-        for i in range(0, len(st.session_state.messages), 2):
-            if i + 1 < len(st.session_state.messages):
-                assistant_msg = st.session_state.messages[i]
-                user_msg = st.session_state.messages[i+1]
-                
-                with st.chat_message(user_msg["role"]):
-                    st.markdown(user_msg["content"])
-                    st.markdown(f'<p style="font-size: 12px; color: #888888; text-align: right;">요청: {user_msg["time"].strftime("%Y-%m-%d %H:%M:%S")}</p>', unsafe_allow_html=True)
-                with st.chat_message(assistant_msg["role"]):
-                    st.markdown(assistant_msg["content"])
-                    st.markdown(f'<p style="font-size: 12px; color: #888888; text-align: right;">완료: {assistant_msg["time"].strftime("%Y-%m-%d %H:%M:%S")}</p>', unsafe_allow_html=True)
\ No newline at end of file
+        # 최신 턴부터 history_visible개만 그리므로, 기록이 길어져도 다시 그리는 비용은 일정합니다.
+        history = st.session_state.history
+        for turn in islice(reversed(history), st.session_state.history_visible):
+            render_turn(turn)
+
+        hidden = len(history) - st.session_state.history_visible
+        if hidden > 0 and st.button(f"이전 대화 더 보기 ({hidden}개 남음)"):
+            st.session_state.history_visible += HISTORY_PAGE_SIZE
+            st.rerun()
\ No newline at end of file
@@ -0,0 +1,136 @@
+# server/agent/context_budget.py
+
+"""
+LLM에 보내는 대화 기록의 토큰 예산 관리.
+
+AgentState.messages는 도구 루프를 돌 때마다 계속 늘어나므로, agent_node가 LLM을 호출하기 전에
+대화 기록을 토큰 예산 안으로 줄여서 보냅니다. (그래프 상태 자체는 변경하지 않음)
+
+1. 최근 턴이 아닌 이전 도구 결과는 앞부분만 남기고 줄입니다.
+2. 마지막 턴 하나만으로도 예산을 넘으면 마지막 턴의 도구 결과도 줄입니다.
+3. 그래도 넘치면 가장 오래된 대화 턴(HumanMessage부터 다음 HumanMessage 전까지)부터 제외합니다.
+
+턴 단위로 제외하므로 도구 호출(AIMessage)과 그 결과(ToolMessage)의 짝은 항상 유지됩니다.
+시스템 프롬프트는 예산에 포함하지 않습니다.
+"""
+
+import json
+from typing import List
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+
+_encodings = {}
+
+
+def load_encoding(encoding_name: str = "cl100k_base"):
+    """
+    tiktoken 인코딩을 처음 사용할 때 한 번만 불러옵니다. (최초 1회는 다운로드)
+    인코딩을 쓸 수 없는 환경에서는 None을 반환하며, 이때 토큰 수는 글자 수로 근사합니다.
+    """
+    if encoding_name not in _encodings:
+        encoding = None
+        try:
+            import tiktoken
+        except ImportError:  # pragma: no cover - requirements.txt에 포함되어 있음
+            tiktoken = None
+        if tiktoken is not None:
+            try:
+                encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                # 인코딩 파일을 내려받을 수 없는 환경에서는 글자 수로 근사합니다.
+                print(f"tiktoken 인코딩 '{encoding_name}'을 불러오지 못해 글자 수로 토큰을 근사합니다: {e}")
+        _encodings[encoding_name] = encoding
+    return _encodings[encoding_name]
+
+
+def count_tokens(text: str, encoding_name: str = "cl100k_base") -> int:
+    """토큰 수. (인코딩을 쓸 수 없으면 글자 수로 근사)"""
+    encoding = load_encoding(encoding_name)
+    if encoding is None:
+        return (len(text) + 1) // 2
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class ContextBudget:
+    """
+    Args:
+        max_tokens: LLM에 보낼 대화 기록의 최대 토큰 수.
+        tool_result_tokens: 줄일 때 도구 결과 하나에 남길 최대 토큰 수.
+        encoding_name: tiktoken 인코딩 이름.
+    """
+
+    def __init__(self, max_tokens: int = 8000, tool_result_tokens: int = 1000, encoding_name: str = "cl100k_base"):
+        self.max_tokens = max_tokens
+        self.tool_result_tokens = tool_result_tokens
+        self.encoding_name = encoding_name
+
+    @property
+    def _encoding(self):
+        # 인코딩 파일 로딩은 서버 시작이 아니라 첫 사용 시점으로 미룹니다.
+        return load_encoding(self.encoding_name)
+
+    # --- 토큰 계산 ---
+    def count_text(self, text: str) -> int:
+        return count_tokens(text, self.encoding_name)
+
+    def count(self, message: BaseMessage) -> int:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+        tokens = self.count_text(content) + 4  # 역할/구분자 오버헤드
+        for call in getattr(message, "tool_calls", None) or []:
+            tokens += self.count_text(call["name"]) + self.count_text(json.dumps(call["args"], ensure_ascii=False))
+        return tokens
+
+    def _truncate_tool_result(self, message: ToolMessage) -> ToolMessage:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if self._encoding is None:
+            keep_chars = self.tool_result_tokens * 2
+            if len(content) <= keep_chars:
+                return message
+            head, omitted = content[:keep_chars], self.count_text(content[keep_chars:])
+        else:
+            tokens = self._encoding.encode(content, disallowed_special=())
+            if len(tokens) <= self.tool_result_tokens:
+                return message
+            head, omitted = self._encoding.decode(tokens[:self.tool_result_tokens]), len(tokens) - self.tool_result_tokens
+        return message.model_copy(update={"content": f"{head}\n...(이전 도구 결과 {omitted}토큰 생략)"})
+
+    # --- 예산 적용 ---
+    @staticmethod
+    def _split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        turns = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def fit(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """대화 기록을 예산 안으로 줄인 새 리스트를 반환하고, 절약한 토큰 수를 출력합니다."""
+        before = sum(self.count(m) for m in messages)
+        if before <= self.max_tokens:
+            return messages
+
+        turns = self._split_turns(messages)
+
+        # 1. 마지막 턴이 아닌 도구 결과 줄이기
+        for turn in turns[:-1]:
+            for i, message in enumerate(turn):
+                if isinstance(message, ToolMessage):
+                    turn[i] = self._truncate_tool_result(message)
+
+        # 2. 마지막 턴만으로 예산을 넘으면 마지막 턴의 도구 결과 줄이기
+        last = turns[-1]
+        if sum(self.count(m) for m in last) > self.max_tokens:
+            for i, message in enumerate(last):
+                if isinstance(message, ToolMessage):
+                    last[i] = self._truncate_tool_result(message)
+
+        # 3. 오래된 턴부터 제외하기
+        total = sum(self.count(m) for turn in turns for m in turn)
+        while total > self.max_tokens and len(turns) > 1:
+            total -= sum(self.count(m) for m in turns.pop(0))
+
+        fitted = [m for turn in turns for m in turn]
+        print(f"[context budget] 대화 기록 {before} → {total} 토큰 ({before - total} 토큰 절약, 예산 {self.max_tokens})")
+        return fitted
@@ -1,24 +1,47 @@
+import threading
 from datetime import datetime
 from typing import Annotated, List, TypedDict
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph import END, StateGraph
-from langgraph.prebuilt import ToolNode
 
-from server.core.google_llm import llm  # Google LLM으로 변경
+from server.agent.context_budget import ContextBudget
+from server.agent.router import get_intent_router
+from server.agent.sessions import capped_messages, get_session_manager
+from server.agent.tool_executor import ParallelToolExecutor, parse_tool_timeouts
+from server.core.config import settings
+from server.core.providers import get_chat_model
+from server.core.tracing import router_decisions, span
 from server.tools.custom_tools import available_tools
 
 # --- 1. Agent State 정의 ---
 class AgentState(TypedDict):
-    messages: Annotated[List[BaseMessage], lambda x, y: x + y]
+    # 세션으로 대화를 이어갈 때도 메시지 수가 SESSION_MAX_MESSAGES를 넘지 않도록 오래된 턴부터 버립니다.
+    messages: Annotated[List[BaseMessage], capped_messages]
 
 
 # --- 2. LLM과 도구 바인딩 (Google LLM 방식) ---
 # Google Generative AI는 OpenAI의 tool 형식에 맞춰줘야 합니다.
-tools = [convert_to_openai_tool(t) for t in available_tools]
-llm_with_tools = llm.bind(tools=tools)
+# 도구 변환과 LLM 생성은 첫 요청(또는 서버 시작 시 prewarm)까지 미룹니다.
+_tools = None
+llm_with_tools = None
+
+
+def get_tools():
+    global _tools
+    if _tools is None:
+        _tools = [convert_to_openai_tool(t) for t in available_tools]
+    return _tools
+
+
+def get_llm_with_tools():
+    global llm_with_tools
+    if llm_with_tools is None:
+        llm_with_tools = get_chat_model().bind(tools=get_tools())
+    return llm_with_tools
+
 
 # --- 3. 프롬프트 정의 ---
 system_prompt = """
@@ -40,6 +63,7 @@ system_prompt = """
 - `search_knowledge_base(query: str)`:
     - **설명**: 사용자가 '문서', '보고서', '회의록', '자료', '내용' 등과 관련된 질문을 할 때 사용합니다. 사내 데이터베이스(Vector DB)에서 관련 정보를 검색하여 답변의 근거를 마련합니다.
     - **사용 예시**: "AI 도입 TF 회의록 요약해줘", "프로젝트 A 보고서 내용 알려줘", "AI 비서 활용 사례 문서 찾아줘"
+    - **결과 형식**: 검색된 내용은 `[출처: 파일 경로 | 섹션: 섹션 제목]` 라벨 아래에 정리되어 반환됩니다. 결과에 이미 출처가 포함되어 있으므로 출처를 확인하려고 같은 질문으로 다시 검색하지 마세요.
 - `get_email_summary(user: str = "current_user")`:
     - **설명**: 사용자가 '메일', '이메일'에 대해 질문할 때 사용합니다. 오늘 받은 이메일을 요약해서 반환합니다.
 - `get_schedule(date: str = "today")`:
@@ -47,7 +71,7 @@ system_prompt = """
 
 ## 출력 형식
 모든 답변은 아래 예시와 같이 `[질문]`, `[답변]`, `[참고 자료]` 형식을 반드시 따라야 합니다.
-특히, `search_knowledge_base` 도구를 사용한 경우, **[참고 자료]** 섹션에 검색된 문서의 출처(source)를 명확히 밝혀야 합니다.
+특히, `search_knowledge_base` 도구를 사용한 경우, **[참고 자료]** 섹션에 답변에 사용한 검색 결과의 `[출처: ...]` 라벨에 있는 파일 경로를 명확히 밝혀야 합니다.
 
 ---
 **[질문]**
@@ -78,12 +102,47 @@ prompt = ChatPromptTemplate.from_messages(
 ).partial(today=datetime.now().strftime("%Y-%m-%d"))
 
 
+# 도구 루프가 길어져도 LLM에 보내는 대화 기록이 예산을 넘지 않도록 관리
+context_budget = ContextBudget(
+    max_tokens=settings.CONTEXT_MAX_TOKENS,
+    tool_result_tokens=settings.CONTEXT_TOOL_RESULT_TOKENS,
+)
+
+
 # --- 4. 노드(Node) 및 엣지(Edge) 정의 ---
-# LLM을 호출하여 응답을 생성
-def agent_node(state: AgentState):
-    response = (prompt | llm_with_tools).invoke(state)
+# LLM을 호출하여 응답을 생성 (ainvoke로 호출해 이벤트 루프를 막지 않음)
+async def agent_node(state: AgentState):
+    with span("node", "agent"):
+        messages = context_budget.fit(state["messages"])
+        with span("llm", "chat_model"):
+            response = await (prompt | get_llm_with_tools()).ainvoke({"messages": messages})
     return {"messages": [response]}
 
+# 의도가 분명한 질문은 LLM의 도구 선택 단계를 건너뛰고 도구 호출 메시지를 바로 만듭니다.
+async def router_node(state: AgentState):
+    last = state["messages"][-1]
+    if not isinstance(last, HumanMessage) or not isinstance(last.content, str):
+        return {"messages": []}
+    # 세션 그래프에서 이전 대화가 있으면 질문이 앞 대화를 가리킬 수 있으므로 LLM이 판단합니다.
+    follow_up = len(state["messages"]) > 1
+    with span("node", "router"):
+        decision = await get_intent_router().aroute(last.content, follow_up=follow_up)
+    router_decisions.inc(decision.method, decision.intent or "")
+    if not decision.routed:
+        return {"messages": []}
+    routed = AIMessage(
+        content="",
+        tool_calls=[decision.tool_call()],
+        response_metadata={"intent_router": {"intent": decision.intent, "method": decision.method, "score": decision.score}},
+    )
+    return {"messages": [routed]}
+
+def after_router(state: AgentState):
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage) and last.tool_calls:
+        return "tools"
+    return "agent"
+
 # 다음 단계를 결정하는 조건부 엣지입니다.
 def should_continue(state: AgentState):
     if state["messages"][-1].tool_calls:
@@ -92,22 +151,87 @@ def should_continue(state: AgentState):
 
 
 # --- 5. 그래프 생성 및 컴파일 ---
-workflow = StateGraph(AgentState)
-
-workflow.add_node("agent", agent_node)
-workflow.add_node("tool_executor", ToolNode(tools=available_tools))
-
-workflow.set_entry_point("agent")
-
-workflow.add_conditional_edges(
-    "agent",
-    should_continue,
-    {
-        "continue": "tool_executor",
-        "end": END,
-    },
-)
-
-workflow.add_edge("tool_executor", "agent")
-
-app = workflow.compile()
\ No newline at end of file
+def build_workflow() -> StateGraph:
+    workflow = StateGraph(AgentState)
+
+    workflow.add_node("agent", agent_node)
+    # 여러 도구 호출을 동시에 실행하고, 도구별/전체 제한 시간을 적용
+    workflow.add_node(
+        "tool_executor",
+        ParallelToolExecutor(
+            available_tools,
+            default_timeout=settings.TOOL_TIMEOUT,
+            timeouts=parse_tool_timeouts(settings.TOOL_TIMEOUTS),
+            total_budget=settings.TOOL_TOTAL_BUDGET,
+        ),
+    )
+
+    if settings.INTENT_ROUTER_ENABLED:
+        workflow.add_node("router", router_node)
+        workflow.set_entry_point("router")
+        workflow.add_conditional_edges("router", after_router, {"tools": "tool_executor", "agent": "agent"})
+    else:
+        workflow.set_entry_point("agent")
+
+    workflow.add_conditional_edges(
+        "agent",
+        should_continue,
+        {
+            "continue": "tool_executor",
+            "end": END,
+        },
+    )
+
+    workflow.add_edge("tool_executor", "agent")
+    return workflow
+
+
+_app = None
+_session_app = None
+_app_lock = threading.Lock()
+
+
+def get_agent_graph():
+    """컴파일된 에이전트 그래프(상태 저장 없음). 처음 호출할 때 한 번만 컴파일합니다."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_workflow().compile()
+    return _app
+
+
+def get_session_graph():
+    """
+    세션 체크포인터를 연결한 에이전트 그래프.
+    config의 `thread_id`(= session_id)로 이전 대화 상태를 불러와 이어서 실행합니다.
+    """
+    global _session_app
+    if _session_app is None:
+        with _app_lock:
+            if _session_app is None:
+                _session_app = build_workflow().compile(checkpointer=get_session_manager().checkpointer)
+    return _session_app
+
+
+def prewarm_agent():
+    """도구 변환, LLM 바인딩, 토큰 인코딩 로딩, 그래프 컴파일을 미리 수행합니다. (서버 시작 시 호출)"""
+    get_llm_with_tools()
+    context_budget.count_text("")
+    if settings.INTENT_ROUTER_ENABLED:
+        try:
+            get_intent_router().prepare()
+        except Exception as e:
+            # 실패해도 첫 요청에서 다시 시도하며, 그동안은 키워드로만 라우팅합니다.
+            print(f"[intent router] 의도 예시 임베딩을 미리 계산하지 못했습니다: {e}")
+    get_agent_graph()
+    get_session_graph()
+
+
+def __getattr__(name):
+    # 하위 호환: `logic.app`, `logic.tools`
+    if name == "app":
+        return get_agent_graph()
+    if name == "tools":
+        return get_tools()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,307 @@
+# server/agent/router.py
+
+"""
+LLM 호출 전에 질문의 의도를 판별해 도구를 바로 실행하는 라우터.
+
+"오늘 일정 알려줘", "메일 요약해줘", "회의록 요약해줘"처럼 어떤 도구가 필요한지 분명한 질문은
+LLM이 도구를 고르는 한 번의 왕복 없이 바로 도구를 실행하고, 도구 결과로 답변만 LLM이 생성합니다.
+
+1. 키워드: 의도별 키워드를 긴 것부터 단어 단위로 찾습니다. ("회의록" 안의 "회의"는 따로 세지 않음)
+   키워드 뒤에는 공백/문장 부호나 조사만 올 수 있으므로 "자료구조"의 "자료"는 키워드로 보지 않습니다.
+   한 의도의 키워드만 나오면 그 의도로 결정하되, "문서", "자료"처럼 다른 뜻으로도 자주 쓰이는 약한 키워드만
+   나온 경우는 임베딩 분류가 같은 의도일 때만 결정합니다.
+2. 임베딩: 키워드가 없으면 의도별 예시 질문의 임베딩(미리 계산)과 코사인 유사도를 비교해
+   가장 비슷한 의도가 threshold 이상이고 두 번째와 margin 이상 차이 날 때만 결정합니다.
+3. 그 밖의 경우(세션의 후속 질문, 여러 의도의 키워드가 섞인 질문, 일반 대화 의도, 애매한 질문, 도구 인자를 정할 수 없는 질문)는
+   기존처럼 LLM이 판단합니다. ("오늘 일정이랑 새 메일 둘 다 알려줘"처럼 도구가 여럿 필요한 질문 포함)
+"""
+
+import re
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from server.core.config import settings
+from server.core.executor import run_sync
+from server.core.providers import embeddings
+
+
+class Intent:
+    """
+    Args:
+        name: 의도 이름.
+        tool_name: 실행할 도구 이름. None이면 도구가 필요 없는 질문(일반 대화)으로 LLM에 넘깁니다.
+        keywords: 이 의도로 판단하는 키워드.
+        examples: 임베딩 비교에 사용하는 예시 질문.
+        weak_keywords: keywords 중 단독으로는 결정하지 않고 임베딩 분류와 일치할 때만 결정하는 키워드.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        tool_name: Optional[str],
+        keywords: Tuple[str, ...],
+        examples: Tuple[str, ...],
+        weak_keywords: Tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.tool_name = tool_name
+        self.keywords = keywords
+        self.examples = examples
+        self.weak_keywords = weak_keywords
+
+    def build_args(self, question: str) -> Optional[dict]:
+        """도구 인자를 만듭니다. 질문만으로 인자를 정할 수 없으면 None (LLM에 넘김)"""
+        if self.tool_name == "search_knowledge_base":
+            return {"query": question}
+        if self.tool_name == "get_email_summary":
+            return {"user": "current_user"}
+        if self.tool_name == "get_schedule":
+            # 도구는 "today"만 직접 해석하므로, 다른 날짜 표현은 LLM이 날짜를 정하도록 넘깁니다.
+            return None if _OTHER_DATE_PATTERN.search(question) else {"date": "today"}
+        return None
+
+
+_OTHER_DATE_PATTERN = re.compile(
+    r"내일|모레|어제|그저께|글피|\d+\s*월|\d+\s*일|\d{4}-\d{1,2}|요일|다음\s*주|이번\s*주|지난\s*주|주말|다음\s*달|이번\s*달"
+)
+# 키워드 바로 뒤에 올 수 있는 조사/어미. 이 밖의 글자가 붙으면 다른 단어("자료구조", "문서화")로 봅니다.
+_KEYWORD_SUFFIX = r"(?:이랑|랑|하고|에서|에게|까지|부터|으로|로|을|를|이|가|은|는|의|에|와|과|도|만|들|좀|이야|야|이에요|예요|요)*"
+_KEYWORD_END = _KEYWORD_SUFFIX + r"(?=$|[^\w])"
+
+INTENTS: List[Intent] = [
+    Intent(
+        "knowledge",
+        "search_knowledge_base",
+        keywords=("회의록", "보고서", "문서", "자료", "사례", "발표자료", "매뉴얼", "규정", "가이드"),
+        # "이 문서를 번역해줘", "파이썬 스타일 가이드"처럼 사내 문서 검색이 아닌 질문에도 자주 나옵니다.
+        weak_keywords=("문서", "자료", "사례", "가이드"),
+        examples=(
+            "AI 도입 TF 회의록 요약해줘",
+            "프로젝트 A 보고서 내용 알려줘",
+            "AI 비서 활용 사례 문서 찾아줘",
+            "지난 회의에서 결정된 사항이 뭐였어?",
+            "보고서 초안으로 발표자료 목차 만들어줘",
+            "사내 자료에서 관련 내용 찾아줘",
+        ),
+    ),
+    Intent(
+        "schedule",
+        "get_schedule",
+        # "회의"는 "지난 회의 결정 사항"처럼 문서 질문에도 자주 나오므로 키워드에서 빼고 임베딩으로 판단합니다.
+        keywords=("일정", "미팅", "캘린더", "스케줄", "약속"),
+        examples=(
+            "오늘 일정 알려줘",
+            "오늘 오후에 미팅 있어?",
+            "오늘 캘린더 확인해줘",
+            "오늘 몇 시에 회의가 있지?",
+            "오늘 스케줄 어떻게 돼?",
+        ),
+    ),
+    Intent(
+        "email",
+        "get_email_summary",
+        keywords=("이메일", "메일", "메일함", "받은편지함", "받은 편지함"),
+        examples=(
+            "오늘 받은 메일 요약해줘",
+            "새 이메일 있어?",
+            "받은편지함 정리해줘",
+            "중요한 메일 온 거 있어?",
+        ),
+    ),
+    Intent(
+        "general",
+        None,
+        keywords=(),
+        examples=(
+            "안녕하세요",
+            "고마워",
+            "우주에 사는 돌고래에 대해 알려줘",
+            "파이썬으로 정렬하는 방법 알려줘",
+            "이 문장을 영어로 번역해줘",
+            "너는 누구야?",
+        ),
+    ),
+]
+
+
+class RouteDecision:
+    """
+    라우팅 결과. tool_name이 None이면 LLM에 넘깁니다.
+
+    Args:
+        method: keyword | embedding | fallback (약한 키워드를 임베딩이 확인한 경우는 embedding)
+        reason: LLM에 넘긴 이유 (fallback일 때). 괄호 앞부분은 고정된 분류 문구입니다.
+    """
+
+    def __init__(self, intent: Optional[str], tool_name: Optional[str], args: Optional[dict], method: str, score: float = 0.0, reason: str = ""):
+        self.intent = intent
+        self.tool_name = tool_name
+        self.args = args
+        self.method = method
+        self.score = score
+        self.reason = reason
+
+    @property
+    def routed(self) -> bool:
+        return self.tool_name is not None
+
+    def tool_call(self) -> dict:
+        return {"name": self.tool_name, "args": self.args, "id": f"router_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+
+    def __repr__(self):
+        return f"RouteDecision(intent={self.intent!r}, tool={self.tool_name!r}, method={self.method!r}, score={self.score:.3f}, reason={self.reason!r})"
+
+
+class IntentRouter:
+    """
+    Args:
+        embeddings: 질문/예시 임베딩에 사용할 LangChain Embeddings. None이면 키워드만 사용합니다.
+        intents: 의도 목록.
+        threshold: 임베딩으로 결정할 최소 코사인 유사도.
+        margin: 가장 비슷한 의도와 두 번째 의도의 최소 유사도 차이.
+    """
+
+    def __init__(self, embeddings=None, intents: List[Intent] = None, threshold: float = 0.75, margin: float = 0.05):
+        self.embeddings = embeddings
+        self.intents = intents or INTENTS
+        self.threshold = threshold
+        self.margin = margin
+
+        # 긴 키워드부터 찾아야 "회의록"이 "회의"로 잘못 세지지 않습니다.
+        keywords = sorted(
+            ((keyword, intent) for intent in self.intents for keyword in intent.keywords),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self._keywords = [
+            (keyword, re.compile(re.escape(keyword.lower()) + _KEYWORD_END), intent) for keyword, intent in keywords
+        ]
+        # 예시 임베딩 행렬 (정규화), 행별 의도
+        self._example_matrix = None
+        self._example_intents: List[Intent] = []
+        self._stats = {"requests": 0, "keyword": 0, "embedding": 0, "fallback": 0, "embedding_errors": 0}
+
+    # --- 키워드 ---
+    def match_keywords(self, question: str) -> Dict[str, List[str]]:
+        """{의도 이름: [찾은 키워드, ...]}. 키워드는 단어 끝(공백/문장 부호/조사 앞)에서 끝나야 합니다."""
+        text = question.lower()
+        matched = {}
+        for keyword, pattern, intent in self._keywords:
+            if pattern.search(text):
+                matched.setdefault(intent.name, []).append(keyword)
+                text = pattern.sub(" ", text)
+        return matched
+
+    # --- 임베딩 ---
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.where(norms == 0, 1.0, norms)
+
+    def prepare(self):
+        """의도별 예시 질문을 임베딩해 둡니다. (동기, 서버 시작 시 또는 첫 사용 시 한 번)"""
+        if self.embeddings is None or self._example_matrix is not None:
+            return
+        examples = [(intent, example) for intent in self.intents for example in intent.examples]
+        # 사용자 질문과 같은 공간에서 비교하도록 질문(query) 임베딩으로 계산합니다.
+        vectors = [self.embeddings.embed_query(example) for _, example in examples]
+        self._example_intents = [intent for intent, _ in examples]
+        self._example_matrix = self._normalize(vectors)
+
+    def _similarities(self, query_vector) -> List[Tuple[Intent, float]]:
+        """의도별 최대 유사도 (높은 순)"""
+        scores = self._example_matrix @ self._normalize(query_vector)
+        best = {}
+        for intent, score in zip(self._example_intents, scores.tolist()):
+            if score > best.get(intent.name, (None, -1.0))[1]:
+                best[intent.name] = (intent, score)
+        return sorted(best.values(), key=lambda item: item[1], reverse=True)
+
+    async def _classify_embedding(self, question: str) -> Optional[Tuple[Intent, float, str]]:
+        if self.embeddings is None:
+            return None
+        if self._example_matrix is None:
+            await run_sync(self.prepare)
+        ranked = self._similarities(await self.embeddings.aembed_query(question))
+        if not ranked:
+            return None
+        (intent, score), runner_up = ranked[0], (ranked[1][1] if len(ranked) > 1 else -1.0)
+        if score < self.threshold:
+            return None, score, f"유사도 낮음 ({score:.2f} < {self.threshold})"
+        if score - runner_up < self.margin:
+            return None, score, f"의도 간 유사도 차이 작음 ({intent.name}, {score - runner_up:.2f} < {self.margin})"
+        return intent, score, ""
+
+    # --- 라우팅 ---
+    def _decide(self, intent: Intent, question: str, method: str, score: float) -> RouteDecision:
+        if intent.tool_name is None:
+            return RouteDecision(intent.name, None, None, "fallback", score, "도구가 필요 없는 질문")
+        args = intent.build_args(question)
+        if args is None:
+            return RouteDecision(intent.name, None, None, "fallback", score, "도구 인자를 정할 수 없음")
+        return RouteDecision(intent.name, intent.tool_name, args, method, score)
+
+    async def aroute(self, question: str, follow_up: bool = False) -> RouteDecision:
+        """
+        Args:
+            follow_up: 이전 대화에 이어지는 질문인지. "그거 요약해줘"처럼 앞 대화를 가리키는 질문은
+                질문만으로 도구 인자를 정할 수 없으므로 분류하지 않고 LLM에 넘깁니다.
+        """
+        self._stats["requests"] += 1
+        if follow_up:
+            decision = RouteDecision(None, None, None, "fallback", 0.0, "이전 대화가 있는 질문")
+        else:
+            decision = await self._route(question)
+        self._stats[decision.method] += 1
+        return decision
+
+    async def _route(self, question: str) -> RouteDecision:
+        matched = self.match_keywords(question)
+        intents = {intent.name: intent for intent in self.intents}
+        if len(matched) > 1:
+            # 도구가 여럿 필요할 수 있는 질문은 LLM이 도구 호출을 정합니다.
+            return RouteDecision(None, None, None, "fallback", 0.0, f"키워드 여러 의도 ({', '.join(sorted(matched))})")
+        keyword_intent = intents[next(iter(matched))] if matched else None
+        if keyword_intent is not None and set(matched[keyword_intent.name]) - set(keyword_intent.weak_keywords):
+            return self._decide(keyword_intent, question, "keyword", 1.0)
+
+        # 키워드가 없거나 약한 키워드만 있는 경우: 임베딩으로 판단 (약한 키워드는 같은 의도로 분류될 때만)
+        try:
+            result = await self._classify_embedding(question)
+        except Exception as e:
+            # 임베딩 실패는 요청 실패가 아니라 LLM 판단으로 처리합니다.
+            self._stats["embedding_errors"] += 1
+            print(f"[intent router] 질문 임베딩 실패, LLM으로 넘깁니다: {e}")
+            result = None
+        if result is None:
+            reason = f"약한 키워드만 있음 ({keyword_intent.name})" if keyword_intent else "키워드 없음"
+            return RouteDecision(None, None, None, "fallback", 0.0, reason)
+        intent, score, reason = result
+        if intent is None:
+            return RouteDecision(None, None, None, "fallback", score, reason)
+        if keyword_intent is not None and intent is not keyword_intent:
+            return RouteDecision(None, None, None, "fallback", score, f"키워드와 임베딩 의도 불일치 ({keyword_intent.name} != {intent.name})")
+        return self._decide(intent, question, "embedding", score)
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["routed_rate"] = (stats["keyword"] + stats["embedding"]) / stats["requests"] if stats["requests"] else 0.0
+        stats["embedding_ready"] = self._example_matrix is not None
+        return stats
+
+
+_router = None
+
+
+def get_intent_router() -> IntentRouter:
+    global _router
+    if _router is None:
+        _router = IntentRouter(
+            embeddings=embeddings if settings.INTENT_ROUTER_EMBEDDINGS else None,
+            threshold=settings.INTENT_ROUTER_THRESHOLD,
+            margin=settings.INTENT_ROUTER_MARGIN,
+        )
+    return _router
@@ -0,0 +1,185 @@
+# server/agent/sessions.py
+
+"""
+대화 세션 관리 (LangGraph 체크포인터 기반).
+
+같은 `session_id`로 들어온 요청은 체크포인터에 저장된 이전 대화 상태(messages)에 이어서 실행되므로,
+클라이언트가 대화 기록을 다시 보낼 필요가 없습니다.
+
+- 저장소: `SESSION_STORE=memory`(기본, 스레드마다 마지막 체크포인트만 보관) 또는
+  `sqlite`(`langgraph-checkpoint-sqlite` 필요, 프로세스 재시작 후에도 유지)
+- 정리: 마지막 사용 후 `SESSION_TTL`초가 지난 세션과, `SESSION_MAX_COUNT`를 넘는 오래된 세션을 삭제
+- 세션당 메시지 수는 `capped_messages` 리듀서가 `SESSION_MAX_MESSAGES` 안으로 유지
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import List
+
+from langchain_core.messages import BaseMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from server.core.config import settings
+
+
+def capped_messages(left: List[BaseMessage], right: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    AgentState.messages 리듀서. 새 메시지를 이어 붙이고, 최대 개수를 넘으면 오래된 대화 턴부터 버립니다.
+    HumanMessage 경계에서만 자르므로 도구 호출과 그 결과의 짝은 깨지지 않습니다.
+    """
+    merged = left + right
+    overflow = len(merged) - settings.SESSION_MAX_MESSAGES
+    if overflow <= 0:
+        return merged
+    for i in range(overflow, len(merged)):
+        if isinstance(merged[i], HumanMessage):
+            return merged[i:]
+    # 마지막 턴 하나가 최대 개수보다 길면 그대로 둡니다.
+    return merged
+
+
+class LatestCheckpointSaver(InMemorySaver):
+    """
+    스레드(세션)마다 마지막 체크포인트만 남기는 메모리 체크포인터.
+
+    기본 InMemorySaver는 그래프의 매 단계 체크포인트와 채널 값을 모두 보관해 대화가 길어질수록
+    메모리가 계속 늘어나고, `delete_thread`가 전체 저장소를 훑습니다. 대화를 이어가는 데는 마지막
+    상태만 필요하므로 이전 체크포인트/채널 값은 저장하는 즉시 지웁니다.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # {(thread_id, checkpoint_ns): {채널: 현재 버전}}
+        self._channel_versions = {}
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+
+        versions = self._channel_versions.setdefault((thread_id, checkpoint_ns), {})
+        for channel, version in new_versions.items():
+            previous = versions.get(channel)
+            if previous is not None and previous != version:
+                self.blobs.pop((thread_id, checkpoint_ns, channel, previous), None)
+            versions[channel] = version
+
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [cid for cid in checkpoints if cid != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        return result
+
+    def delete_thread(self, thread_id: str) -> None:
+        for checkpoint_ns, checkpoints in self.storage.pop(thread_id, {}).items():
+            for checkpoint_id in checkpoints:
+                self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+            for channel, version in self._channel_versions.pop((thread_id, checkpoint_ns), {}).items():
+                self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+
+
+def create_checkpointer(store: str):
+    if store == "memory":
+        return LatestCheckpointSaver()
+    if store == "sqlite":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise RuntimeError(
+                "SESSION_STORE=sqlite를 사용하려면 `pip install langgraph-checkpoint-sqlite`가 필요합니다."
+            ) from e
+        # 이벤트 루프 안에서 생성해야 하며, 연결은 첫 사용 시(setup) 시작됩니다.
+        os.makedirs(os.path.dirname(settings.SESSION_DB_PATH) or ".", exist_ok=True)
+        return AsyncSqliteSaver(aiosqlite.connect(settings.SESSION_DB_PATH))
+    raise ValueError(f"알 수 없는 SESSION_STORE입니다: '{store}' (memory | sqlite)")
+
+
+class SessionManager:
+    """
+    세션별 마지막 사용 시각을 LRU 순서로 관리하고, 만료되거나 개수를 넘은 세션을 체크포인터에서 지웁니다.
+    같은 세션의 요청은 잠금으로 순서대로 실행해 대화 상태가 엇갈리지 않게 합니다.
+
+    Args:
+        checkpointer: LangGraph 체크포인터.
+        ttl: 마지막 사용 후 세션을 보관하는 시간(초).
+        max_sessions: 동시에 보관하는 최대 세션 수.
+    """
+
+    def __init__(self, checkpointer, ttl: float = 1800.0, max_sessions: int = 10000):
+        self.checkpointer = checkpointer
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._last_used = OrderedDict()
+        self._locks = {}
+        self._stats = {"requests": 0, "created": 0, "expired": 0, "evicted": 0}
+
+    async def _delete(self, session_id: str):
+        self._locks.pop(session_id, None)
+        if hasattr(self.checkpointer, "adelete_thread"):
+            await self.checkpointer.adelete_thread(session_id)
+        else:
+            self.checkpointer.delete_thread(session_id)
+
+    async def _evict(self, now: float, keep: str = None):
+        """
+        만료된 세션과 최대 개수를 넘는 오래된 세션을 지웁니다. 실행 중인 세션과 `keep`은 건너뛰며,
+        목록을 한 번만 훑으므로 모든 세션이 실행 중이어도 바로 끝납니다. (잠시 최대 개수를 넘을 수 있음)
+        """
+        excess = len(self._last_used) - self.max_sessions
+        for session_id, last_used in list(self._last_used.items()):
+            if now - last_used > self.ttl:
+                reason = "expired"
+            elif excess > 0:
+                reason = "evicted"
+            else:
+                # LRU 순서이므로 이후 세션은 만료되지 않았습니다.
+                break
+            lock = self._locks.get(session_id)
+            if session_id == keep or (lock is not None and lock.locked()):
+                continue
+            if self._last_used.get(session_id) != last_used:
+                # 앞의 삭제를 기다리는 동안 다시 사용된 세션
+                continue
+            del self._last_used[session_id]
+            excess -= 1
+            self._stats[reason] += 1
+            await self._delete(session_id)
+
+    @asynccontextmanager
+    async def session(self, session_id: str):
+        """세션을 사용 중으로 표시하고, 같은 세션의 다른 요청이 끝날 때까지 기다립니다."""
+        now = time.monotonic()
+        self._stats["requests"] += 1
+        if session_id not in self._last_used:
+            self._stats["created"] += 1
+        self._last_used[session_id] = now
+        self._last_used.move_to_end(session_id)
+
+        # 잠금을 먼저 잡아야 정리 중에 이 세션이 유휴 세션으로 보여 지워지지 않습니다.
+        lock = self._locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            await self._evict(now, keep=session_id)
+            yield
+            self._last_used[session_id] = time.monotonic()
+            self._last_used.move_to_end(session_id)
+
+    def get_stats(self) -> dict:
+        return dict(self._stats, active_sessions=len(self._last_used), ttl=self.ttl, max_sessions=self.max_sessions)
+
+
+_session_manager = None
+
+
+def get_session_manager() -> SessionManager:
+    global _session_manager
+    if _session_manager is None:
+        _session_manager = SessionManager(
+            create_checkpointer(settings.SESSION_STORE),
+            ttl=settings.SESSION_TTL,
+            max_sessions=settings.SESSION_MAX_COUNT,
+        )
+    return _session_manager
@@ -0,0 +1,132 @@
+# server/agent/tool_executor.py
+
+"""
+도구 실행 노드.
+
+LLM이 한 번에 여러 도구를 호출하면(예: 일정 + 이메일 + 지식 검색) 각 도구를 동시에 실행합니다.
+도구별 제한 시간과 전체 시간 예산을 적용하고, 제한 시간을 넘긴 도구는 '시간 초과' 결과로
+대신 채워 나머지 결과만으로 답변을 이어갈 수 있게 합니다. 도구별 소요 시간은 통계로 기록합니다.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from server.core.tracing import span
+
+
+class ToolLatencyStats:
+    """도구별 호출 횟수/소요 시간/시간 초과/오류 횟수"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name: str, elapsed: float, status: str):
+        with self._lock:
+            stats = self._stats.setdefault(
+                name, {"calls": 0, "seconds_total": 0.0, "seconds_max": 0.0, "timeouts": 0, "errors": 0}
+            )
+            stats["calls"] += 1
+            stats["seconds_total"] += elapsed
+            stats["seconds_max"] = max(stats["seconds_max"], elapsed)
+            if status == "timeout":
+                stats["timeouts"] += 1
+            elif status == "error":
+                stats["errors"] += 1
+
+    def snapshot(self) -> list:
+        """누적 소요 시간이 큰 도구부터 정렬한 통계"""
+        with self._lock:
+            rows = [dict(stats, name=name) for name, stats in self._stats.items()]
+        for row in rows:
+            row["seconds_avg"] = row["seconds_total"] / row["calls"] if row["calls"] else 0.0
+        return sorted(rows, key=lambda row: row["seconds_total"], reverse=True)
+
+
+tool_latency_stats = ToolLatencyStats()
+
+
+class ParallelToolExecutor:
+    """
+    Args:
+        tools: 실행할 수 있는 도구 리스트.
+        default_timeout: 도구 하나의 기본 제한 시간(초).
+        timeouts: 도구 이름별 제한 시간. {"search_knowledge_base": 15.0}
+        total_budget: 한 턴의 모든 도구 실행에 허용하는 전체 시간(초).
+    """
+
+    def __init__(self, tools, default_timeout: float = 20.0, timeouts: Dict[str, float] = None, total_budget: float = 30.0):
+        self.tools_by_name = {t.name: t for t in tools}
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.total_budget = total_budget
+
+    async def _run_tool(self, call: dict, config: RunnableConfig) -> ToolMessage:
+        name = call["name"]
+        timeout = self.timeouts.get(name, self.default_timeout)
+        tool = self.tools_by_name.get(name)
+        start = time.perf_counter()
+        status = "success"
+        if tool is None:
+            status = "error"
+            content = f"Error: {name}은(는) 사용할 수 없는 도구입니다. 사용 가능한 도구: {', '.join(self.tools_by_name)}"
+        else:
+            try:
+                with span("tool", name):
+                    result = await asyncio.wait_for(tool.ainvoke(call["args"], config), timeout=timeout)
+                content = result if isinstance(result, str) else str(result)
+            except asyncio.TimeoutError:
+                status = "timeout"
+                content = f"[시간 초과] `{name}` 도구가 {timeout:g}초 안에 응답하지 않았습니다. 이 도구의 결과 없이 답변해 주세요."
+            except Exception as e:
+                status = "error"
+                content = f"Error: {e!r}\n Please fix your mistakes."
+
+        tool_latency_stats.record(name, time.perf_counter() - start, status)
+        return ToolMessage(
+            content=content,
+            name=name,
+            tool_call_id=call["id"],
+            status="success" if status == "success" else "error",
+        )
+
+    async def __call__(self, state: dict, config: RunnableConfig) -> dict:
+        tool_calls = state["messages"][-1].tool_calls
+        with span("node", "tool_executor"):
+            tasks = [asyncio.create_task(self._run_tool(call, config)) for call in tool_calls]
+            done, pending = await asyncio.wait(tasks, timeout=self.total_budget)
+            for task in pending:
+                task.cancel()
+            # 취소된 도구의 정리 코드가 노드가 끝난 뒤 span 밖에서 실행되지 않도록 끝날 때까지 기다립니다.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        messages = []
+        for task, call in zip(tasks, tool_calls):
+            if task in done:
+                messages.append(task.result())
+                continue
+            tool_latency_stats.record(call["name"], self.total_budget, "timeout")
+            messages.append(
+                ToolMessage(
+                    content=f"[시간 초과] 전체 도구 실행 시간({self.total_budget:g}초)을 넘겨 `{call['name']}` 도구 실행을 중단했습니다.",
+                    name=call["name"],
+                    tool_call_id=call["id"],
+                    status="error",
+                )
+            )
+        return {"messages": messages}
+
+
+def parse_tool_timeouts(value: str) -> Dict[str, float]:
+    """"search_knowledge_base=15,get_schedule=5" 형식의 설정 문자열을 파싱합니다."""
+    timeouts = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
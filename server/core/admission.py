@@ -0,0 +1,164 @@
+# server/core/admission.py
+
+"""
+워커 프로세스당 동시에 실행하는 에이전트 수를 제한하는 입장 제어(admission control).
+
+부하가 몰릴 때 모든 요청을 받아 동시에 실행하면 LLM/도구 호출이 서로 자원을 나눠 쓰면서
+모든 요청의 지연 시간이 함께 늘어납니다. 여기서는
+
+1. 실행 중인 요청이 `max_in_flight`개 미만이면 바로 실행하고,
+2. 아니면 최대 `max_queue`개까지 도착 순서대로 대기시키며 (슬롯이 비면 대기 중인 요청에 바로 넘김),
+3. 대기열이 가득 찼거나 `queue_timeout`초 안에 슬롯을 받지 못하면 거절합니다.
+
+거절 시 함께 주는 `retry_after`(초)는 최근 실행 시간의 이동 평균과 대기열 길이로 추정합니다.
+이벤트 루프 안에서만 사용하므로 별도의 락이 필요 없습니다.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Optional
+
+from server.core.config import settings
+from server.core.tracing import admission_rejections, admission_wait
+
+
+class AdmissionRejected(Exception):
+    """입장 거절. reason: queue_full | timeout"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"admission rejected ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """실행 슬롯. `release()`는 여러 번 불러도 한 번만 반영됩니다."""
+
+    def __init__(self, controller: Optional["AdmissionController"]):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        if self._controller is not None:
+            self._controller._release(time.monotonic() - self._started)
+
+    def transfer(self) -> "AdmissionTicket":
+        """슬롯을 새 티켓으로 넘깁니다. 이후 이 티켓의 `release()`는 슬롯을 반환하지 않습니다."""
+        ticket = AdmissionTicket(None if self._released else self._controller)
+        ticket._started = self._started
+        self._released = True
+        return ticket
+
+
+class AdmissionController:
+    """
+    Args:
+        max_in_flight: 동시에 실행할 수 있는 최대 요청 수. 0 이하이면 제한하지 않습니다.
+        max_queue: 슬롯을 기다릴 수 있는 최대 요청 수.
+        queue_timeout: 슬롯을 기다리는 최대 시간(초).
+    """
+
+    # 실행 시간 이동 평균(EWMA)의 가중치와 초기값(초)
+    _alpha = 0.2
+    _initial_run_seconds = 2.0
+
+    def __init__(self, max_in_flight: int, max_queue: int = 32, queue_timeout: float = 10.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters = deque()
+        self._avg_run_seconds = self._initial_run_seconds
+        self._stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    def retry_after(self) -> int:
+        """지금 대기열이 빠지는 데 걸릴 시간의 추정치(초, 1~60)"""
+        waves = (len(self._waiters) + 1) / max(1, self.max_in_flight)
+        return min(60, max(1, math.ceil(self._avg_run_seconds * waves)))
+
+    def _reject(self, reason: str):
+        self._stats[f"rejected_{reason}"] += 1
+        admission_rejections.inc(reason)
+        raise AdmissionRejected(reason, self.retry_after())
+
+    async def acquire(self) -> AdmissionTicket:
+        """실행 슬롯을 받을 때까지 기다립니다. 받을 수 없으면 `AdmissionRejected`를 발생시킵니다."""
+        if not self.enabled:
+            return AdmissionTicket(None)
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            self._stats["admitted"] += 1
+            admission_wait.observe(0.0)
+            return AdmissionTicket(self)
+        if len(self._waiters) >= self.max_queue:
+            self._reject("queue_full")
+
+        self._stats["queued"] += 1
+        start = time.monotonic()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # 제한 시간과 동시에 슬롯을 넘겨받은 경우: 취소면 슬롯을 돌려주고, 시간 초과면 그대로 실행합니다.
+                if isinstance(e, asyncio.CancelledError):
+                    self._release(None)
+                    raise
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self._reject("timeout")
+        # 슬롯은 `_release`에서 in_flight를 줄이지 않고 그대로 넘겨받습니다.
+        self._stats["admitted"] += 1
+        admission_wait.observe(time.monotonic() - start)
+        return AdmissionTicket(self)
+
+    def _release(self, run_seconds: Optional[float]):
+        if run_seconds is not None:
+            self._avg_run_seconds += self._alpha * (run_seconds - self._avg_run_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats.update(
+            enabled=self.enabled,
+            max_in_flight=self.max_in_flight,
+            max_queue=self.max_queue,
+            in_flight=self._in_flight,
+            queued_now=len(self._waiters),
+            avg_run_seconds=self._avg_run_seconds,
+            retry_after=self.retry_after(),
+        )
+        return stats
+
+
+_controller = None
+
+
+def get_admission_controller() -> AdmissionController:
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController(
+            settings.ADMISSION_MAX_IN_FLIGHT,
+            max_queue=settings.ADMISSION_MAX_QUEUE,
+            queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT,
+        )
+    return _controller
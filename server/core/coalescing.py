@@ -0,0 +1,136 @@
+# server/core/coalescing.py
+
+"""
+같은 질문이 동시에 들어오면 에이전트를 한 번만 실행하고 결과 스트림을 나눠 주는 요청 합치기(single-flight).
+
+예시 질문 버튼이나 공지 직후처럼 여러 사용자가 같은 질문을 거의 동시에 보내면, 질문마다 그래프를
+따로 실행해 LLM 호출이 사용자 수만큼 늘어납니다. 여기서는
+
+1. 정규화한 질문(`normalize_query`)이 같은 요청이 이미 실행 중이면 새로 실행하지 않고 그 실행에 합류하고,
+2. 실행 결과 이벤트는 버퍼에 쌓아 두었다가, 늦게 합류한 요청에는 지금까지의 이벤트를 먼저 재생한 뒤
+   이후 이벤트를 실시간으로 전달합니다.
+3. 실행은 첫 요청과 분리된 태스크에서 진행되므로 첫 요청이 연결을 끊어도 다른 요청은 계속 받고,
+   구독하는 요청이 모두 떠나면 실행을 취소합니다. 구독은 스트림을 실제로 읽기 시작할 때 등록되므로,
+   응답을 시작하지 못한 요청이 구독자로 남아 실행을 붙잡지 않습니다.
+
+실행이 끝나면 바로 목록에서 빠지므로, 끝난 뒤에 들어온 같은 질문은 새로 실행합니다. (결과 재사용은 시맨틱 캐시의 역할)
+이전 대화에 따라 답이 달라지는 세션 요청에는 사용하지 않습니다.
+"""
+
+import asyncio
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+from server.core.config import settings
+from server.core.retrieval_cache import normalize_query
+from server.core.tracing import coalesced_requests
+
+Event = Tuple[str, dict]
+
+
+class _Flight:
+    """실행 하나의 이벤트 버퍼와 구독자 수"""
+
+    def __init__(self):
+        self.events = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+
+class RequestCoalescer:
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"flights": 0, "joined": 0, "replayed_events": 0, "cancelled": 0, "max_subscribers": 0}
+
+    @staticmethod
+    def make_key(message: str) -> str:
+        return normalize_query(message)
+
+    def join(self, key: str) -> Optional[AsyncIterator[Event]]:
+        """같은 질문이 실행 중이면 그 결과 스트림을, 아니면 None을 반환합니다."""
+        flight = self._flights.get(key)
+        if flight is None:
+            return None
+        self.stats["joined"] += 1
+        coalesced_requests.inc()
+        return self._iterate(flight, replay_notice=True)
+
+    def stream(
+        self, key: str, factory: Callable[[], AsyncIterator[Event]], on_finish: Callable[[], None] = None
+    ) -> AsyncIterator[Event]:
+        """
+        같은 질문이 실행 중이면 합류하고, 아니면 `factory()`의 이벤트 스트림을 새로 실행해 공유합니다.
+
+        Args:
+            on_finish: 실행 태스크가 끝나면(취소 포함) 부르는 콜백. 실행 슬롯처럼 요청이 아니라 실행에 묶인
+                자원을 반환하는 데 사용합니다. 새로 실행하지 않고 합류한 경우에는 바로 부릅니다.
+        """
+        joined = self.join(key)
+        if joined is not None:
+            if on_finish is not None:
+                on_finish()
+            return joined
+        flight = self._flights[key] = _Flight()
+        self.stats["flights"] += 1
+        flight.task = asyncio.create_task(self._run(key, flight, factory()))
+        if on_finish is not None:
+            # 시작 전에 취소된 태스크는 코루틴의 finally를 실행하지 않으므로 완료 콜백으로 부릅니다.
+            flight.task.add_done_callback(lambda _: on_finish())
+        return self._iterate(flight, replay_notice=False)
+
+    async def _run(self, key: str, flight: _Flight, events: AsyncIterator[Event]):
+        try:
+            async for item in events:
+                async with flight.changed:
+                    flight.events.append(item)
+                    flight.changed.notify_all()
+        except Exception as e:
+            flight.error = e
+        except asyncio.CancelledError:
+            # 취소 직전에 합류해 아직 읽기 전이던 요청은 잘린 답변 대신 오류를 받습니다.
+            flight.error = RuntimeError("같은 질문의 실행이 취소되었습니다. 다시 시도해 주세요.")
+            raise
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            flight.done = True
+            async with flight.changed:
+                flight.changed.notify_all()
+
+    async def _iterate(self, flight: _Flight, replay_notice: bool) -> AsyncIterator[Event]:
+        # 구독자는 스트림을 처음 읽을 때 등록합니다. 읽지 않고 버려진 스트림은 finally도 실행되지 않기 때문입니다.
+        flight.subscribers += 1
+        self.stats["max_subscribers"] = max(self.stats["max_subscribers"], flight.subscribers)
+        try:
+            if replay_notice:
+                self.stats["replayed_events"] += len(flight.events)
+                yield "coalesced", {"replayed": len(flight.events)}
+            index = 0
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(lambda: index < len(flight.events) or flight.done)
+                while index < len(flight.events):
+                    yield flight.events[index]
+                    index += 1
+                if flight.done:
+                    break
+            if flight.error is not None:
+                raise flight.error
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done and flight.task is not None:
+                # 모든 요청이 연결을 끊었으면 아무도 받지 않는 실행을 멈춥니다.
+                self.stats["cancelled"] += 1
+                flight.task.cancel()
+
+    def get_stats(self) -> dict:
+        return dict(self.stats, in_flight=len(self._flights))
+
+
+def create_request_coalescer() -> Optional[RequestCoalescer]:
+    """설정에서 요청 합치기가 켜져 있으면 RequestCoalescer를, 아니면 None을 반환합니다."""
+    if not settings.REQUEST_COALESCING_ENABLED:
+        return None
+    return RequestCoalescer()
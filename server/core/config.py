@@ -17,7 +17,141 @@ class Settings:
     # Google AI
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
 
+    # Fake LLM/Embeddings (오프라인 벤치마크/테스트용, 지연 시간 주입)
+    FAKE_LLM: bool = os.getenv("FAKE_LLM", "false").lower() == "true"
+    FAKE_LLM_LATENCY: float = float(os.getenv("FAKE_LLM_LATENCY", "0.5"))
+    FAKE_LLM_TOKEN_LATENCY: float = float(os.getenv("FAKE_LLM_TOKEN_LATENCY", "0.02"))
+    FAKE_LLM_TOOL: str = os.getenv("FAKE_LLM_TOOL", "search_knowledge_base")
+    FAKE_EMBEDDING_LATENCY: float = float(os.getenv("FAKE_EMBEDDING_LATENCY", "0.05"))
+    # 가짜 LLM 장애 주입: 첫 토큰 전에 실패할 확률, 첫 토큰이 FAKE_LLM_SLOW_LATENCY초 늦어질 확률
+    FAKE_LLM_FAILURE_RATE: float = float(os.getenv("FAKE_LLM_FAILURE_RATE", "0"))
+    FAKE_LLM_SLOW_RATE: float = float(os.getenv("FAKE_LLM_SLOW_RATE", "0"))
+    FAKE_LLM_SLOW_LATENCY: float = float(os.getenv("FAKE_LLM_SLOW_LATENCY", "5"))
+
+    # LLM/Embedding Provider (google | azure | fake | fake_backup). 클라이언트는 처음 사용할 때 생성
+    LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "fake" if FAKE_LLM else "google").lower()
+    EMBEDDING_PROVIDER: str = os.getenv("EMBEDDING_PROVIDER", LLM_PROVIDER).lower()
+    # 서버 시작 시(lifespan) 클라이언트와 에이전트 그래프를 미리 생성
+    PREWARM_PROVIDERS: bool = os.getenv("PREWARM_PROVIDERS", "true").lower() == "true"
+
+    # LLM Routing: 대체 공급자 목록 (쉼표 구분, 예: "azure"). 비어 있으면 LLM_PROVIDER 하나만 사용
+    LLM_FALLBACK_PROVIDERS: str = os.getenv("LLM_FALLBACK_PROVIDERS", "")
+    # 첫 토큰이 최근 첫 토큰 지연의 p{PERCENTILE}보다 늦으면 다음 공급자에게 같은 요청을 하나 더 보냄.
+    # 지연 표본이 부족할 때는 INITIAL_DELAY(초)를 사용하고, 헤지 요청은 전체 요청의 MAX_RATIO 이하로 제한
+    LLM_HEDGE_ENABLED: bool = os.getenv("LLM_HEDGE_ENABLED", "true").lower() == "true"
+    LLM_HEDGE_PERCENTILE: float = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+    LLM_HEDGE_INITIAL_DELAY: float = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "2.0"))
+    LLM_HEDGE_MAX_RATIO: float = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+    # 공급자별 회로 차단기: 최근 WINDOW개 호출(MIN_CALLS 이상) 중 오류율이 ERROR_RATE 이상이면 COOLDOWN초 동안 건너뜀
+    LLM_BREAKER_WINDOW: int = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+    LLM_BREAKER_MIN_CALLS: int = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+    LLM_BREAKER_ERROR_RATE: float = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+    LLM_BREAKER_COOLDOWN: float = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
     # Vector DB Path
     CHROMA_PATH: str = "db"
+    # 디스크의 Vector DB 변경 여부를 확인하는 최소 간격(초)
+    VECTORSTORE_RELOAD_INTERVAL: float = float(os.getenv("VECTORSTORE_RELOAD_INTERVAL", "5"))
+    # Hybrid Search (BM25 + Vector, Reciprocal Rank Fusion)
+    HYBRID_SEARCH_ENABLED: bool = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+    HYBRID_CANDIDATES: int = int(os.getenv("HYBRID_CANDIDATES", "20"))
+    HYBRID_RRF_K: int = int(os.getenv("HYBRID_RRF_K", "60"))
+    # Dense 검색 방식 (chroma | mmap | faiss). mmap은 인제스트 시 만든 벡터 파일을 워커들이 메모리 매핑해 공유,
+    # faiss는 양자화 인덱스(faiss-cpu 필요)로 후보를 뽑고 원본 벡터로 재정렬
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma").lower()
+    # FAISS 인덱스 종류 (sq8 | ivfpq | binary). NLIST/PQ_M=0이면 벡터 수/차원에 맞춰 자동
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "sq8").lower()
+    FAISS_NLIST: int = int(os.getenv("FAISS_NLIST", "0"))
+    FAISS_PQ_M: int = int(os.getenv("FAISS_PQ_M", "0"))
+    FAISS_NPROBE: int = int(os.getenv("FAISS_NPROBE", "16"))
+    # k의 몇 배만큼 후보를 뽑아 원본 벡터로 재정렬할지 (0이면 재정렬 안 함)
+    FAISS_RERANK: int = int(os.getenv("FAISS_RERANK", "4"))
+    # search_knowledge_base가 가져오는 청크 수와, 출처 라벨을 포함한 도구 결과의 최대 토큰 수
+    SEARCH_TOP_K: int = int(os.getenv("SEARCH_TOP_K", "3"))
+    SEARCH_CONTEXT_MAX_TOKENS: int = int(os.getenv("SEARCH_CONTEXT_MAX_TOKENS", "1500"))
+
+    # Retrieval Result Cache (질문 + k + 코퍼스 버전이 같은 검색 결과 재사용)
+    RETRIEVAL_CACHE_ENABLED: bool = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+    RETRIEVAL_CACHE_TTL: float = float(os.getenv("RETRIEVAL_CACHE_TTL", "600"))
+    RETRIEVAL_CACHE_MAX_ENTRIES: int = int(os.getenv("RETRIEVAL_CACHE_MAX_ENTRIES", "1000"))
+    # 지정하면 이 SQLite 파일로 여러 워커가 검색 결과를 공유 (예: cache/retrieval.sqlite3)
+    RETRIEVAL_CACHE_PATH: str = os.getenv("RETRIEVAL_CACHE_PATH", "")
+
+    # Embedding Cache
+    EMBEDDING_CACHE_ENABLED: bool = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+    EMBEDDING_CACHE_HOT_SIZE: int = int(os.getenv("EMBEDDING_CACHE_HOT_SIZE", "2048"))
+
+    # Chunking (recursive | token | section), CHUNK_SIZE=0이면 전략별 기본값 사용
+    CHUNK_STRATEGY: str = os.getenv("CHUNK_STRATEGY", "section")
+    CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "0"))
+
+    # Ingestion (배치 임베딩)
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))
+    EMBEDDING_MAX_CONCURRENCY: int = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+    # Ingestion (스트리밍 파이프라인): 문서 디렉토리, 로딩/분할 워커 프로세스 수(0이면 단일 프로세스),
+    # 한 번에 임베딩/저장하는 청크 수 (메모리에 올라가는 청크/벡터 수의 상한)
+    INGEST_DOCS_DIR: str = os.getenv("INGEST_DOCS_DIR", "docs")
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+
+    # Semantic Response Cache (유사한 질문의 답변 재사용)
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+    SEMANTIC_CACHE_TTL: float = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+    # 결과가 시시각각 바뀌는 도구를 사용한 답변은 캐시하지 않음
+    SEMANTIC_CACHE_SKIP_TOOLS: str = os.getenv("SEMANTIC_CACHE_SKIP_TOOLS", "get_email_summary,get_schedule")
+
+    # Request Coalescing (동시에 들어온 같은 질문은 에이전트를 한 번만 실행하고 결과 스트림을 공유)
+    REQUEST_COALESCING_ENABLED: bool = os.getenv("REQUEST_COALESCING_ENABLED", "true").lower() == "true"
+
+    # Intent Router (의도가 분명한 질문은 LLM의 도구 선택 없이 바로 도구 실행)
+    INTENT_ROUTER_ENABLED: bool = os.getenv("INTENT_ROUTER_ENABLED", "true").lower() == "true"
+    # 키워드로 정할 수 없을 때 의도별 예시 질문과의 임베딩 유사도로 판단 (false면 키워드만 사용)
+    INTENT_ROUTER_EMBEDDINGS: bool = os.getenv("INTENT_ROUTER_EMBEDDINGS", "true").lower() == "true"
+    INTENT_ROUTER_THRESHOLD: float = float(os.getenv("INTENT_ROUTER_THRESHOLD", "0.75"))
+    INTENT_ROUTER_MARGIN: float = float(os.getenv("INTENT_ROUTER_MARGIN", "0.05"))
+
+    # Tool Execution (도구 동시 실행 제한 시간)
+    TOOL_TIMEOUT: float = float(os.getenv("TOOL_TIMEOUT", "20"))
+    # 도구별 제한 시간. 예) "search_knowledge_base=15,get_schedule=5"
+    TOOL_TIMEOUTS: str = os.getenv("TOOL_TIMEOUTS", "")
+    TOOL_TOTAL_BUDGET: float = float(os.getenv("TOOL_TOTAL_BUDGET", "30"))
+
+    # Conversation Sessions (session_id로 대화를 이어가는 서버 측 상태 저장)
+    SESSION_STORE: str = os.getenv("SESSION_STORE", "memory")  # memory | sqlite
+    SESSION_DB_PATH: str = os.getenv("SESSION_DB_PATH", "cache/sessions.sqlite3")
+    # 마지막 사용 후 세션을 보관하는 시간(초)과 최대 세션 수
+    SESSION_TTL: float = float(os.getenv("SESSION_TTL", "1800"))
+    SESSION_MAX_COUNT: int = int(os.getenv("SESSION_MAX_COUNT", "10000"))
+    # 세션당 보관하는 최대 메시지 수 (초과 시 오래된 대화 턴부터 삭제)
+    SESSION_MAX_MESSAGES: int = int(os.getenv("SESSION_MAX_MESSAGES", "40"))
+
+    # Context Budget (LLM에 보내는 대화 기록 토큰 예산, 시스템 프롬프트 제외)
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", "8000"))
+    CONTEXT_TOOL_RESULT_TOKENS: int = int(os.getenv("CONTEXT_TOOL_RESULT_TOKENS", "1000"))
+
+    # Serving (python -m server.scripts.serve)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8001"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+    # Admission Control (워커 프로세스당 동시에 실행하는 에이전트 수, 0이면 제한 없음)
+    ADMISSION_MAX_IN_FLIGHT: int = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "0"))
+    # 실행 슬롯을 기다릴 수 있는 최대 요청 수와 대기 시간(초). 넘으면 429 + Retry-After로 거절
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+
+    # 동기 작업(Vector DB 검색, 동기 SDK 호출 등)을 실행할 스레드 수
+    SYNC_WORKER_THREADS: int = int(os.getenv("SYNC_WORKER_THREADS", "16"))
+
+    # Tracing / Metrics
+    # 요청마다 구간별 소요 시간 요약을 출력
+    TRACE_LOG_REQUESTS: bool = os.getenv("TRACE_LOG_REQUESTS", "false").lower() == "true"
+    LANGFUSE_ENABLED: bool = os.getenv("LANGFUSE_ENABLED", "false").lower() == "true"
+    LANGFUSE_PUBLIC_KEY: str = os.getenv("LANGFUSE_PUBLIC_KEY")
+    LANGFUSE_SECRET_KEY: str = os.getenv("LANGFUSE_SECRET_KEY")
+    LANGFUSE_HOST: str = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
 
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,100 @@
+# server/core/dense_index.py
+
+"""
+Dense 벡터 인덱스 (Vector DB와 함께 인제스트 시 생성, 조회 시 mmap으로 읽음)
+
+uvicorn 워커를 여러 개 띄우면 Chroma는 워커마다 HNSW 인덱스를 메모리에 따로 올립니다.
+이 인덱스는 임베딩을 float32 행렬 파일 하나로 저장하고 `np.memmap`(읽기 전용)으로 열기 때문에,
+같은 인덱스 디렉토리를 여는 워커들은 OS 페이지 캐시의 같은 페이지를 공유하고 워커별 복사본이 생기지 않습니다.
+
+검색은 전체 행렬과의 내적으로 하는 정확(exact) 검색이며, Chroma 기본 거리(L2)와 같은 순위를 냅니다.
+    ||q - v||^2 = ||q||^2 + ||v||^2 - 2 q·v  ->  ||v||^2 - 2 q·v 가 작은 순서
+
+인덱스 디렉토리 안의 `dense/` 구성
+- meta.json    : 차원, 벡터 수, 거리 방식, 청크 ID 목록
+- vectors.f32  : (벡터 수, 차원) float32 행 우선 배열  <- mmap
+- norms.f32    : 행별 ||v||^2 float32 배열              <- mmap
+"""
+
+import json
+import os
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+DENSE_DIR = "dense"
+
+
+def build_dense_index(index_path: str, vectors: Iterable[Tuple[str, list]]):
+    """
+    (청크 ID, 벡터) 이터레이터로 Dense 인덱스를 만들어 `index_path/dense/`에 저장합니다.
+    벡터는 받는 즉시 파일에 이어 쓰므로 전체 행렬을 메모리에 올리지 않습니다.
+    """
+    dense_path = os.path.join(index_path, DENSE_DIR)
+    os.makedirs(dense_path, exist_ok=True)
+
+    ids = []
+    dim = None
+    with open(os.path.join(dense_path, "vectors.f32"), "wb") as vf, open(os.path.join(dense_path, "norms.f32"), "wb") as nf:
+        for chunk_id, vector in vectors:
+            row = np.asarray(vector, dtype=np.float32)
+            if dim is None:
+                dim = row.shape[0]
+            elif row.shape[0] != dim:
+                raise ValueError(f"벡터 차원이 다릅니다: {chunk_id} ({row.shape[0]} != {dim})")
+            ids.append(chunk_id)
+            vf.write(row.tobytes())
+            nf.write(np.float32(row @ row).tobytes())
+
+    meta = {"dim": dim or 0, "count": len(ids), "metric": "l2", "ids": ids}
+    with open(os.path.join(dense_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+class DenseIndex:
+    """mmap으로 연 읽기 전용 Dense 인덱스. 여러 스레드/프로세스에서 동시에 검색해도 안전합니다."""
+
+    backend = "mmap"
+    # 한 번에 내적을 계산하는 행 수 (임시 배열 크기를 제한)
+    block_rows = 65536
+
+    def __init__(self, dense_path: str):
+        with open(os.path.join(dense_path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.dim = meta["dim"]
+        self.count = meta["count"]
+        self.metric = meta["metric"]
+        self.ids = meta["ids"]
+        if self.count:
+            self._vectors = np.memmap(os.path.join(dense_path, "vectors.f32"), dtype=np.float32, mode="r", shape=(self.count, self.dim))
+            self._norms = np.memmap(os.path.join(dense_path, "norms.f32"), dtype=np.float32, mode="r", shape=(self.count,))
+        else:
+            self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+            self._norms = np.zeros((0,), dtype=np.float32)
+
+    @classmethod
+    def open(cls, index_path: str):
+        """인덱스 디렉토리에 Dense 인덱스가 있으면 열고, 없으면 None을 반환합니다."""
+        dense_path = os.path.join(index_path, DENSE_DIR)
+        if not os.path.exists(os.path.join(dense_path, "meta.json")):
+            return None
+        return cls(dense_path)
+
+    @property
+    def nbytes(self) -> int:
+        return self.count * (self.dim + 1) * 4
+
+    def search(self, vector, k: int = 10) -> List[Tuple[str, float]]:
+        """쿼리 벡터와 L2 거리가 가까운 순서로 (청크 ID, 거리^2)를 반환합니다."""
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        distances = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, self.block_rows):
+            end = min(start + self.block_rows, self.count)
+            distances[start:end] = self._norms[start:end] - 2.0 * (self._vectors[start:end] @ query)
+        top = np.argpartition(distances, k - 1)[:k] if k < self.count else np.arange(self.count)
+        top = top[np.argsort(distances[top], kind="stable")]
+        query_norm = float(query @ query)
+        return [(self.ids[i], float(distances[i]) + query_norm) for i in top]
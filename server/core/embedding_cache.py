@@ -0,0 +1,210 @@
+# server/core/embedding_cache.py
+
+"""
+임베딩 결과를 디스크(SQLite)에 저장해 같은 텍스트를 다시 임베딩하지 않도록 하는 래퍼.
+
+- 키: 모델 이름 + 용도(query/document) + 텍스트 해시 (sha256)
+- 메모리: 최근 사용한 벡터를 LRU로 보관하는 핫 캐시
+- 디스크: float32 바이트로 저장하는 SQLite 테이블 (여러 프로세스가 공유 가능)
+
+Google/Azure 등 LangChain `Embeddings` 구현이라면 어떤 객체든 감쌀 수 있습니다.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from server.core.config import settings
+from server.core.executor import run_sync
+
+# SQLite 한 번의 IN 쿼리에 넣을 최대 키 개수
+_SQL_BATCH = 500
+
+# 생성된 모든 캐시 (통계 조회용)
+_caches = []
+
+
+class CachedEmbeddings(Embeddings):
+    """`Embeddings` 객체를 감싸 디스크 + 메모리(LRU) 2단 캐시를 제공합니다."""
+
+    def __init__(self, underlying: Embeddings, model_name: str, cache_path: str, hot_size: int = 2048):
+        self.underlying = underlying
+        self.model_name = model_name
+        self.cache_path = cache_path
+        self.hot_size = hot_size
+
+        self._hot = OrderedDict()
+        self._hot_lock = threading.Lock()
+
+        cache_dir = os.path.dirname(cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False, timeout=30)
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        _caches.append(self)
+
+    def __getattr__(self, name):
+        # 감싼 객체의 나머지 속성(model, client 등)은 그대로 노출합니다.
+        if name == "underlying":
+            raise AttributeError(name)
+        return getattr(self.underlying, name)
+
+    # --- 키/직렬화 ---
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    # --- 캐시 조회/저장 ---
+    def _hot_get(self, key: str):
+        with self._hot_lock:
+            vector = self._hot.get(key)
+            if vector is not None:
+                self._hot.move_to_end(key)
+            return vector
+
+    def _hot_put(self, key: str, vector: List[float]):
+        with self._hot_lock:
+            self._hot[key] = vector
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_size:
+                self._hot.popitem(last=False)
+
+    def _disk_get_many(self, keys: List[str]) -> dict:
+        found = {}
+        with self._db_lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = self._decode(blob)
+        return found
+
+    def _disk_put_many(self, items: dict):
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, self._encode(vector)) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def _lookup(self, kind: str, texts: List[str]):
+        """캐시에서 찾은 벡터와, 새로 임베딩해야 하는 (키, 텍스트) 목록을 반환합니다."""
+        keys = [self._key(kind, text) for text in texts]
+        vectors = {}
+        memory_hits = 0
+        for key in keys:
+            if key in vectors:
+                continue
+            vector = self._hot_get(key)
+            if vector is not None:
+                vectors[key] = vector
+                memory_hits += 1
+
+        pending = list(dict.fromkeys(key for key in keys if key not in vectors))
+        disk_found = self._disk_get_many(pending) if pending else {}
+        for key, vector in disk_found.items():
+            self._hot_put(key, vector)
+        vectors.update(disk_found)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing[key] = text
+
+        with self._stats_lock:
+            self._stats["memory_hits"] += memory_hits
+            self._stats["disk_hits"] += len(disk_found)
+            self._stats["misses"] += len(missing)
+        return keys, vectors, missing
+
+    def _store(self, vectors: dict, missing_keys: List[str], embedded: List[List[float]]):
+        new_items = dict(zip(missing_keys, embedded))
+        for key, vector in new_items.items():
+            self._hot_put(key, vector)
+        if new_items:
+            self._disk_put_many(new_items)
+        vectors.update(new_items)
+
+    # --- Embeddings 인터페이스 ---
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, missing = self._lookup("document", texts)
+        if missing:
+            embedded = self.underlying.embed_documents(list(missing.values()))
+            self._store(vectors, list(missing.keys()), embedded)
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = self._lookup("query", [text])
+        if missing:
+            self._store(vectors, keys, [self.underlying.embed_query(text)])
+        return vectors[keys[0]]
+
+    # 비동기 경로에서는 SQLite 조회/저장(디스크 읽기, WAL 쓰기, busy 대기)이 이벤트 루프를 막지 않도록 스레드 풀에서 실행합니다.
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, vectors, missing = await run_sync(self._lookup, "document", texts)
+        if missing:
+            embedded = await self.underlying.aembed_documents(list(missing.values()))
+            await run_sync(self._store, vectors, list(missing.keys()), embedded)
+        return [vectors[key] for key in keys]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, vectors, missing = await run_sync(self._lookup, "query", [text])
+        if missing:
+            await run_sync(self._store, vectors, keys, [await self.underlying.aembed_query(text)])
+        return vectors[keys[0]]
+
+    # --- 통계 ---
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        with self._hot_lock:
+            stats["hot_entries"] = len(self._hot)
+        stats["model"] = self.model_name
+        return stats
+
+
+def cached_embeddings(underlying: Embeddings, model_name: str) -> Embeddings:
+    """설정에 따라 임베딩 객체를 캐시로 감싸서 반환합니다."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return underlying
+    return CachedEmbeddings(
+        underlying,
+        model_name=model_name,
+        cache_path=settings.EMBEDDING_CACHE_PATH,
+        hot_size=settings.EMBEDDING_CACHE_HOT_SIZE,
+    )
+
+
+def get_cache_stats() -> list:
+    """현재 프로세스에서 사용 중인 모든 임베딩 캐시의 통계"""
+    return [cache.get_stats() for cache in _caches]
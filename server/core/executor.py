@@ -0,0 +1,36 @@
+# server/core/executor.py
+
+"""
+동기(블로킹) 함수를 이벤트 루프 밖에서 실행하기 위한 공용 스레드 풀.
+
+Chroma 검색, 동기 SDK 호출처럼 async로 바꿀 수 없는 작업은 `run_sync`로 실행해
+이벤트 루프가 막히지 않게 합니다. 스레드 수를 제한해 동시 요청이 몰려도
+스레드가 무한정 늘어나지 않습니다.
+"""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from server.core.config import settings
+
+sync_executor = ThreadPoolExecutor(
+    max_workers=settings.SYNC_WORKER_THREADS,
+    thread_name_prefix="sync-worker",
+)
+
+
+async def run_sync(func, *args, **kwargs):
+    """동기 함수를 공용 스레드 풀에서 실행하고 결과를 기다립니다. (contextvars 유지)"""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(sync_executor, functools.partial(ctx.run, func, *args, **kwargs))
+
+
+def install_default_executor():
+    """
+    현재 이벤트 루프의 기본 executor를 공용 스레드 풀로 교체합니다.
+    LangChain이 동기 도구/모델을 `run_in_executor(None, ...)`로 실행할 때도 같은 풀을 쓰게 됩니다.
+    """
+    asyncio.get_running_loop().set_default_executor(sync_executor)
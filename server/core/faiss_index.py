@@ -0,0 +1,220 @@
+# server/core/faiss_index.py
+
+"""
+양자화한 FAISS 벡터 인덱스 (VECTOR_BACKEND=faiss, `faiss-cpu` 필요)
+
+`text-embedding-3-large`(3072차원) 벡터를 float32로 두면 청크 하나에 12KB가 들어, 코퍼스가 커질수록
+인덱스 크기와 메모리 사용량이 커집니다. 여기서는 인제스트 시 만든 mmap Dense 인덱스(`dense/`)의 벡터로
+양자화 인덱스를 만들어 메모리에는 압축된 코드만 올리고, 후보를 넉넉히 뽑은 뒤 상위 후보만 원본 float32
+벡터(mmap, 필요한 행만 읽음)로 정확한 거리를 다시 계산해 순위를 정합니다.
+
+인덱스 종류 (청크당 메모리, 3072차원 기준)
+- sq8    : 차원별 int8 스칼라 양자화 (3KB, 1/4). 재정렬 없이도 순위가 거의 같습니다.
+- ivfpq  : IVF 클러스터 + Product Quantization (차원 16개당 1byte, 192B). 후보만 탐색하므로 가장 빠르지만 근사 오차가 커서 재정렬이 필요합니다.
+- binary : 부호 비트만 남긴 해밍 거리 (384B, 1/32). 재정렬 전제로 후보를 빠르게 거르는 용도입니다.
+
+인덱스 디렉토리 안의 `faiss/` 구성
+- meta.json   : 인덱스 종류(요청한 종류 포함), 차원, 벡터 수, 파라미터, 인덱스 크기
+- index.faiss : FAISS 인덱스 (행 번호 = `dense/` 벡터 순서)
+"""
+
+import json
+import os
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from server.core.dense_index import DenseIndex
+
+FAISS_DIR = "faiss"
+INDEX_TYPES = ("sq8", "ivfpq", "binary")
+
+# 학습에 사용하는 최대 벡터 수 (무작위 표본)
+_MAX_TRAIN_ROWS = 100_000
+# PQ 코드북(256개 중심)을 학습하기 위한 최소 벡터 수. 이보다 적으면 sq8로 만듭니다.
+_MIN_PQ_ROWS = 4096
+
+
+def _import_faiss():
+    try:
+        import faiss
+    except ImportError as e:
+        raise ImportError("VECTOR_BACKEND=faiss를 사용하려면 `pip install faiss-cpu`가 필요합니다.") from e
+    return faiss
+
+
+def default_nlist(count: int) -> int:
+    """IVF 클러스터 수: 약 4 * sqrt(n), 클러스터당 학습 벡터가 39개 이상이 되도록 제한"""
+    return max(1, min(int(4 * count ** 0.5), count // 39))
+
+
+def default_pq_m(dim: int) -> int:
+    """PQ 부분 벡터 수: 차원 16개당 1byte에 가장 가까운, 차원의 약수"""
+    target = max(1, dim // 16)
+    return max(m for m in range(1, target + 1) if dim % m == 0)
+
+
+def _blocks(vectors, block_rows: int = 65536):
+    for start in range(0, vectors.shape[0], block_rows):
+        yield np.ascontiguousarray(vectors[start:start + block_rows], dtype=np.float32)
+
+
+def _train_sample(vectors, rows: int) -> np.ndarray:
+    if vectors.shape[0] <= rows:
+        return np.ascontiguousarray(vectors, dtype=np.float32)
+    picked = np.sort(np.random.default_rng(0).choice(vectors.shape[0], rows, replace=False))
+    return np.ascontiguousarray(vectors[picked], dtype=np.float32)
+
+
+def build_faiss_index(index_path: str, index_type: str = "sq8", nlist: int = 0, pq_m: int = 0) -> dict:
+    """
+    `index_path/dense/`의 벡터로 FAISS 인덱스를 만들어 `index_path/faiss/`에 저장하고 meta를 반환합니다.
+    벡터는 블록 단위로 추가하므로 원본 행렬 전체를 메모리에 올리지 않습니다. (학습 표본만 복사)
+
+    Args:
+        index_type: sq8 | ivfpq | binary
+        nlist: IVF 클러스터 수 (ivfpq). 0이면 벡터 수에 맞춰 자동으로 정합니다.
+        pq_m: PQ 부분 벡터 수 (ivfpq). 0이면 차원 16개당 하나.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"알 수 없는 FAISS 인덱스 종류입니다: '{index_type}' ({' | '.join(INDEX_TYPES)})")
+    faiss = _import_faiss()
+    dense = DenseIndex.open(index_path)
+    if dense is None:
+        raise FileNotFoundError(f"'{index_path}'에 Dense 인덱스가 없습니다. FAISS 인덱스는 Dense 인덱스로 만듭니다.")
+    vectors, dim, count = dense._vectors, dense.dim, dense.count
+    requested = {"type": index_type, "nlist": nlist, "pq_m": pq_m}
+
+    if index_type == "ivfpq" and count < _MIN_PQ_ROWS:
+        print(f"벡터가 {count}개로 PQ를 학습하기에 적어 sq8 인덱스로 만듭니다. (최소 {_MIN_PQ_ROWS}개)")
+        index_type = "sq8"
+    if index_type == "binary" and dim % 8:
+        raise ValueError(f"binary 인덱스는 차원이 8의 배수여야 합니다. (차원 {dim})")
+
+    start = time.perf_counter()
+    params = {}
+    if index_type == "binary":
+        index = faiss.IndexBinaryFlat(dim)
+        for block in _blocks(vectors):
+            index.add(np.packbits(block > 0, axis=1))
+    else:
+        if index_type == "sq8":
+            index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+            train_rows = min(count, _MAX_TRAIN_ROWS)
+        else:
+            nlist = nlist or default_nlist(count)
+            pq_m = pq_m or default_pq_m(dim)
+            params = {"nlist": nlist, "pq_m": pq_m}
+            index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, pq_m, 8)
+            train_rows = min(count, _MAX_TRAIN_ROWS, max(nlist * 64, 256 * 64))
+        if count:
+            index.train(_train_sample(vectors, train_rows))
+            for block in _blocks(vectors):
+                index.add(block)
+
+    faiss_path = os.path.join(index_path, FAISS_DIR)
+    os.makedirs(faiss_path, exist_ok=True)
+    index_file = os.path.join(faiss_path, "index.faiss")
+    if index_type == "binary":
+        faiss.write_index_binary(index, index_file)
+    else:
+        faiss.write_index(index, index_file)
+    meta = {
+        "type": index_type,
+        "dim": dim,
+        "count": count,
+        "params": params,
+        # 벡터가 적어 다른 종류로 만든 경우에도 설정이 바뀌었는지 비교할 수 있도록 요청한 값을 남깁니다.
+        "requested": requested,
+        "index_bytes": os.path.getsize(index_file),
+        "build_seconds": time.perf_counter() - start,
+    }
+    with open(os.path.join(faiss_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+
+def faiss_index_is_current(index_path: str, index_type: str, nlist: int = 0, pq_m: int = 0) -> bool:
+    """
+    `index_path`의 FAISS 인덱스가 지금 설정(종류/파라미터)과 Dense 인덱스의 벡터 수에 맞는지 확인합니다.
+    인덱스가 없거나 요청한 설정이 기록되지 않은 예전 인덱스면 False입니다.
+    """
+    meta_file = os.path.join(index_path, FAISS_DIR, "meta.json")
+    if not os.path.exists(meta_file):
+        return False
+    with open(meta_file, encoding="utf-8") as f:
+        meta = json.load(f)
+    dense = DenseIndex.open(index_path)
+    if dense is None or meta["count"] != dense.count:
+        return False
+    return meta.get("requested") == {"type": index_type, "nlist": nlist, "pq_m": pq_m}
+
+
+class FaissIndex:
+    """
+    양자화 인덱스로 후보를 뽑고, mmap Dense 인덱스의 원본 벡터로 재정렬하는 읽기 전용 인덱스.
+    `DenseIndex`와 같은 `search(vector, k)` 인터페이스를 가집니다.
+
+    Args:
+        dense_index: 같은 인덱스 디렉토리의 DenseIndex (청크 ID와 재정렬용 원본 벡터).
+        nprobe: 검색할 IVF 클러스터 수 (ivfpq).
+        rerank: k의 몇 배만큼 후보를 뽑아 원본 벡터로 재정렬할지. 0이면 양자화 거리 순위를 그대로 사용합니다.
+    """
+
+    def __init__(self, faiss_path: str, dense_index: DenseIndex, nprobe: int = 16, rerank: int = 4):
+        faiss = _import_faiss()
+        with open(os.path.join(faiss_path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["count"] != dense_index.count:
+            raise ValueError(f"FAISS 인덱스({meta['count']}개)와 Dense 인덱스({dense_index.count}개)의 벡터 수가 다릅니다.")
+        self.index_type = meta["type"]
+        self.backend = f"faiss-{self.index_type}"
+        self.count = meta["count"]
+        self.nbytes = meta["index_bytes"]
+        self.dense_index = dense_index
+        self.rerank = rerank
+
+        index_file = os.path.join(faiss_path, "index.faiss")
+        if self.index_type == "binary":
+            self._index = faiss.read_index_binary(index_file)
+        else:
+            # IVF 역리스트(코드)는 파일을 mmap해 워커들이 페이지 캐시를 공유합니다.
+            self._index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            if self.index_type == "ivfpq":
+                self._index.nprobe = nprobe
+        # 질문 하나씩 검색하므로 OpenMP 스레드를 늘려도 이득이 없고, 동시 요청 스레드와 경합만 생깁니다.
+        faiss.omp_set_num_threads(1)
+
+    @classmethod
+    def open(cls, index_path: str, dense_index: DenseIndex, nprobe: int = 16, rerank: int = 4) -> Optional["FaissIndex"]:
+        """인덱스 디렉토리에 FAISS 인덱스가 있으면 열고, 없으면 None을 반환합니다."""
+        faiss_path = os.path.join(index_path, FAISS_DIR)
+        if not os.path.exists(os.path.join(faiss_path, "meta.json")):
+            return None
+        return cls(faiss_path, dense_index, nprobe=nprobe, rerank=rerank)
+
+    def _candidates(self, query: np.ndarray, n: int) -> np.ndarray:
+        if self.index_type == "binary":
+            _, labels = self._index.search(np.packbits(query > 0)[None, :], n)
+        else:
+            _, labels = self._index.search(query[None, :], n)
+        labels = labels[0]
+        return labels[labels >= 0]
+
+    def search(self, vector, k: int = 10) -> List[Tuple[str, float]]:
+        """(재정렬 후) L2 거리가 가까운 순서로 (청크 ID, 거리^2)를 반환합니다."""
+        k = min(k, self.count)
+        if k <= 0:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        labels = self._candidates(query, min(self.count, k * max(1, self.rerank)))
+        # 후보 행만 원본 float32 벡터에서 읽어 정확한 거리로 순위를 다시 매깁니다.
+        rows = np.sort(labels)
+        distances = self.dense_index._norms[rows] - 2.0 * (self.dense_index._vectors[rows] @ query) + float(query @ query)
+        if self.rerank:
+            order = np.argsort(distances, kind="stable")[:k]
+        else:
+            # 재정렬하지 않으면 양자화 거리 순위(labels 순서)를 그대로 사용합니다.
+            order = np.searchsorted(rows, labels)[:k]
+        return [(self.dense_index.ids[rows[i]], float(distances[i])) for i in order]
@@ -0,0 +1,226 @@
+# server/core/fake_llm.py
+
+"""
+네트워크 없이 실행/테스트하기 위한 가짜(Fake) 모델 모음.
+
+같은 입력에는 항상 같은 결과를 돌려주며, 지연 시간과 실패(429, 5xx 등)를 주입할 수 있습니다.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeRateLimitError(Exception):
+    """공급자의 429 Too Many Requests 응답을 흉내 내는 예외"""
+
+    status_code = 429
+
+    def __init__(self, message: str = "429 Too Many Requests (fake)", retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FakeProviderError(Exception):
+    """공급자의 5xx 응답(일시 장애)을 흉내 내는 예외"""
+
+    status_code = 503
+
+    def __init__(self, message: str = "503 Service Unavailable (fake)"):
+        super().__init__(message)
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    텍스트 해시로 결정적인 단위 벡터를 만드는 가짜 임베딩.
+
+    Args:
+        size: 벡터 차원 수.
+        latency: 호출 1회당 지연 시간(초).
+        rate_limit_rate: 호출이 FakeRateLimitError로 실패할 확률 (0~1).
+        max_batch_size: 한 번에 받을 수 있는 최대 텍스트 수. 초과하면 ValueError.
+        seed: 실패 주입에 사용할 난수 시드.
+    """
+
+    def __init__(
+        self,
+        size: int = 256,
+        latency: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        max_batch_size: int = None,
+        seed: int = 0,
+    ):
+        self.size = size
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.max_batch_size = max_batch_size
+        self.model = f"fake-embedding-{size}"
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _vector(self, text: str) -> List[float]:
+        values = []
+        counter = 0
+        while len(values) < self.size:
+            digest = hashlib.sha256(f"{counter}\0{text}".encode("utf-8")).digest()
+            values.extend((b - 127.5) / 127.5 for b in digest)
+            counter += 1
+        values = values[:self.size]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def _before_call(self, texts: List[str]):
+        if self.max_batch_size is not None and len(texts) > self.max_batch_size:
+            raise ValueError(f"배치 크기 {len(texts)}가 최대값 {self.max_batch_size}를 초과했습니다.")
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.rate_limit_rate
+        if failed:
+            raise FakeRateLimitError()
+        with self._lock:
+            self.texts_embedded += len(texts)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        self._before_call(texts)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self._before_call(texts)
+        return [self._vector(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self.aembed_documents([text]))[0]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    도구 호출 흐름을 흉내 내는 가짜 채팅 모델.
+
+    - 마지막 사용자 질문 뒤에 도구 실행 결과가 없으면 `tool_name` 도구를 호출하는 응답을,
+      있으면 도구 결과를 인용한 최종 답변을 돌려줍니다. (`tool_name`이 None이면 바로 답변)
+      `question_arg`를 지정하면 사용자 질문을 해당 이름의 도구 인자로 넘깁니다.
+    - 첫 토큰까지 `latency`, 이후 토큰마다 `token_latency`만큼 지연됩니다. 스트리밍 여부와 관계없이
+      전체 응답 시간은 같습니다.
+    - `blocking=True`이면 async 호출에서도 time.sleep으로 이벤트 루프를 막아
+      동기 호출(invoke)을 쓰던 이전 동작을 재현합니다.
+    - 호출마다 `failure_rate` 확률로 첫 토큰 전에 FakeProviderError로 실패하고, `slow_rate` 확률로
+      첫 토큰이 `latency` 대신 `slow_latency`만큼 늦어집니다. (`seed`로 재현 가능)
+    """
+
+    latency: float = 0.0
+    token_latency: float = 0.0
+    blocking: bool = False
+    tool_name: Optional[str] = "get_schedule"
+    tool_args: dict = {}
+    question_arg: Optional[str] = None
+    failure_rate: float = 0.0
+    slow_rate: float = 0.0
+    slow_latency: float = 0.0
+    seed: int = 0
+
+    _random: random.Random = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any):
+        self._random = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last_human = max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=-1)
+        tool_results = [m for m in messages[last_human + 1:] if isinstance(m, ToolMessage)]
+        question = messages[last_human].content if last_human >= 0 else ""
+
+        if self.tool_name and not tool_results:
+            call_id = "call_" + hashlib.sha256(f"{question}\0{len(messages)}".encode("utf-8")).hexdigest()[:12]
+            args = dict(self.tool_args)
+            if self.question_arg:
+                args[self.question_arg] = question
+            return AIMessage(content="", tool_calls=[{"name": self.tool_name, "args": args, "id": call_id}])
+
+        context = "\n".join(str(m.content) for m in tool_results)
+        return AIMessage(content=f"**[질문]**\n{question}\n\n**[답변]**\n{context or '가짜 모델의 답변입니다.'}")
+
+    def _first_token_delay(self) -> Tuple[float, bool]:
+        """이번 호출의 첫 토큰 지연. 실패하도록 뽑힌 호출은 지연 후 FakeProviderError를 던집니다."""
+        with self._lock:
+            failed = self._random.random() < self.failure_rate
+            slow = self._random.random() < self.slow_rate
+        return self.slow_latency if slow else self.latency, failed
+
+    @staticmethod
+    def _tokens(text: str) -> List[str]:
+        return re.findall(r"\S+\s*|\s+", text)
+
+    async def _asleep(self, seconds: float):
+        if not seconds:
+            return
+        if self.blocking:
+            time.sleep(seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        delay, failed = self._first_token_delay()
+        time.sleep(delay)
+        if failed:
+            raise FakeProviderError()
+        time.sleep(self.token_latency * len(self._tokens(message.content)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        message = self._respond(messages)
+        delay, failed = self._first_token_delay()
+        await self._asleep(delay)
+        if failed:
+            raise FakeProviderError()
+        await self._asleep(self.token_latency * len(self._tokens(message.content)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._respond(messages)
+        delay, failed = self._first_token_delay()
+        await self._asleep(delay)
+        if failed:
+            raise FakeProviderError()
+        if message.tool_calls:
+            tool_call_chunks = [
+                {"name": tc["name"], "args": json.dumps(tc["args"]), "id": tc["id"], "index": i}
+                for i, tc in enumerate(message.tool_calls)
+            ]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=tool_call_chunks))
+            return
+        for i, token in enumerate(self._tokens(message.content)):
+            if i:
+                await self._asleep(self.token_latency)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
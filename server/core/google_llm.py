@@ -1,35 +1,37 @@
 # server/core/google_llm.py
 
-from langchain_google_genai import (
-    ChatGoogleGenerativeAI,
-    GoogleGenerativeAIEmbeddings,
-)
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+"""
+Google LLM/임베딩 (하위 호환용 모듈)
 
+클라이언트 생성은 `server.core.providers`가 담당합니다. 이 모듈의 `llm`, `embeddings`, `chain`은
+처음 접근할 때 Google 공급자(FAKE_LLM=true이면 fake 공급자)로 생성되므로, 임포트만으로는
+Google SDK를 불러오지 않습니다.
+"""
+
+from server.core import providers
 from server.core.config import settings
 
-# Google LLM 초기화
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash-latest",
-    google_api_key=settings.GOOGLE_API_KEY,
-    temperature=0,
-)
-
-# Google Embeddings 초기화
-embeddings = GoogleGenerativeAIEmbeddings(
-    model="models/embedding-001",
-    google_api_key=settings.GOOGLE_API_KEY
-)
-
-# LLM에 Tool을 바인딩 (기존 llm.py 구조와 유사하게)
-# 참고: Google LLM은 tool_choice를 직접 지원하지 않으므로, 필요 시 별도 로직 구현 필요
-# 여기서는 기본적인 LLM 기능에 초점을 맞춥니다.
-llm_with_tools = llm
-
-# 간단한 체인 예시 (기존 구조와 호환성을 위해)
-chain = (
-    ChatPromptTemplate.from_template("{input}")
-    | llm_with_tools
-    | StrOutputParser()
-)
+_PROVIDER = "fake" if settings.FAKE_LLM else "google"
+_chain = None
+
+
+def _build_chain():
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import ChatPromptTemplate
+
+    # 간단한 체인 예시 (기존 구조와 호환성을 위해)
+    return ChatPromptTemplate.from_template("{input}") | providers.get_chat_model(_PROVIDER) | StrOutputParser()
+
+
+def __getattr__(name):
+    global _chain
+    # 참고: Google LLM은 tool_choice를 직접 지원하지 않으므로 llm_with_tools는 llm과 같습니다.
+    if name in ("llm", "llm_with_tools"):
+        return providers.get_chat_model(_PROVIDER)
+    if name == "embeddings":
+        return providers.get_embeddings(_PROVIDER)
+    if name == "chain":
+        if _chain is None:
+            _chain = _build_chain()
+        return _chain
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
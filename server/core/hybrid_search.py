@@ -0,0 +1,90 @@
+# server/core/hybrid_search.py
+
+"""
+Dense(Chroma) + Lexical(BM25) 하이브리드 검색.
+
+두 검색기의 순위를 Reciprocal Rank Fusion(RRF)으로 합칩니다.
+점수 스케일이 다른 두 검색 결과를 정규화 없이 순위만으로 합칠 수 있습니다.
+`dense_index`(mmap Dense 인덱스)를 넘기면 Dense 검색은 Chroma HNSW 대신 그 인덱스로 하고,
+Chroma에서는 ID로 본문/메타데이터만 가져옵니다.
+"""
+
+from typing import Dict, List
+
+from langchain_core.documents import Document
+
+from server.core.tracing import span
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], rrf_k: int = 60) -> List[str]:
+    """여러 순위 리스트를 RRF 점수(sum 1 / (rrf_k + rank))로 합친 ID 순위를 반환합니다."""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _to_documents(ids, documents, metadatas) -> Dict[str, Document]:
+    return {
+        doc_id: Document(id=doc_id, page_content=text, metadata=metadata or {})
+        for doc_id, text, metadata in zip(ids, documents, metadatas)
+    }
+
+
+def _get_documents(vectorstore, ids: List[str]) -> Dict[str, Document]:
+    """청크 ID로 본문/메타데이터를 가져옵니다. (HNSW 인덱스를 사용하지 않는 sqlite 조회)"""
+    if not ids:
+        return {}
+    with span("vector_query", "chroma_get"):
+        result = vectorstore._collection.get(ids=ids, include=["documents", "metadatas"])
+    return _to_documents(result["ids"], result["documents"], result["metadatas"])
+
+
+def _embed_query(vectorstore, query: str):
+    with span("embedding", "query"):
+        return vectorstore._embedding_function.embed_query(query)
+
+
+def _mmap_search(dense_index, embedding, k: int) -> List[str]:
+    with span("vector_query", "mmap"):
+        return [doc_id for doc_id, _ in dense_index.search(embedding, k)]
+
+
+def dense_search(vectorstore, query: str, k: int, dense_index=None) -> Dict[str, Document]:
+    """유사도 검색 결과를 {청크 ID: Document} (유사도 순서)로 반환합니다."""
+    embedding = _embed_query(vectorstore, query)
+    if dense_index is not None:
+        ids = _mmap_search(dense_index, embedding, k)
+        found = _get_documents(vectorstore, ids)
+        return {doc_id: found[doc_id] for doc_id in ids if doc_id in found}
+    with span("vector_query", "chroma"):
+        result = vectorstore._collection.query(
+            query_embeddings=[embedding],
+            n_results=k,
+            include=["documents", "metadatas"],
+        )
+    return _to_documents(result["ids"][0], result["documents"][0], result["metadatas"][0])
+
+
+def hybrid_search(
+    vectorstore, lexical_index, query: str, k: int = 3, candidates: int = 20, rrf_k: int = 60, dense_index=None
+) -> List[Document]:
+    """
+    Dense/BM25 각각 상위 `candidates`개를 뽑아 RRF로 합친 뒤 상위 k개의 Document를 반환합니다.
+    """
+    if dense_index is not None:
+        # mmap 인덱스는 ID만 돌려주므로, 본문은 합친 뒤의 상위 k개만 가져옵니다.
+        dense_ids = _mmap_search(dense_index, _embed_query(vectorstore, query), candidates)
+        dense = {}
+    else:
+        dense = dense_search(vectorstore, query, candidates)
+        dense_ids = list(dense)
+    with span("lexical_query", "bm25"):
+        lexical_ids = [doc_id for doc_id, _ in lexical_index.search(query, candidates)]
+    fused = reciprocal_rank_fusion([dense_ids, lexical_ids], rrf_k=rrf_k)[:k]
+
+    # Dense 결과에 본문이 없는 청크(BM25에서만 찾은 청크 등)는 본문을 Chroma에서 가져옵니다.
+    missing = [doc_id for doc_id in fused if doc_id not in dense]
+    dense.update(_get_documents(vectorstore, missing))
+    return [dense[doc_id] for doc_id in fused if doc_id in dense]
@@ -0,0 +1,87 @@
+# server/core/index_paths.py
+
+"""
+Vector DB 디렉토리 구성
+
+    db/
+      CURRENT                  <- 현재 서비스 중인 인덱스 디렉토리 이름
+      index-20250710T120000/   <- 인덱스 버전별 디렉토리 (Chroma DB + manifest.json)
+      index-20250711T093000/
+
+인제스트는 항상 새 인덱스 디렉토리를 만든 뒤 `CURRENT`를 원자적으로 교체하므로,
+서버는 작성 중인 DB를 절대 보지 않습니다. `CURRENT`가 없으면 이전 방식대로
+`db/` 자체를 Chroma 디렉토리로 사용합니다.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+CURRENT_FILE = "CURRENT"
+INDEX_PREFIX = "index-"
+MANIFEST_FILE = "manifest.json"
+
+
+def get_active_index_path(root: str) -> str:
+    """현재 서비스 중인 인덱스 디렉토리 경로를 반환합니다."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+    except FileNotFoundError:
+        return root
+    return os.path.join(root, name) if name else root
+
+
+def get_index_version(root: str) -> str:
+    """현재 인덱스 버전 문자열. 인제스트로 인덱스가 교체될 때마다 바뀝니다."""
+    return os.path.basename(get_active_index_path(root)) if os.path.exists(os.path.join(root, CURRENT_FILE)) else "legacy"
+
+
+def read_corpus_version(index_path: str) -> str:
+    """
+    인제스트가 매니페스트에 기록한 코퍼스 버전(청크 내용 + 임베딩 모델 해시).
+    기록이 없는 예전 인덱스는 디렉토리 이름을 버전으로 사용합니다.
+    """
+    try:
+        with open(os.path.join(index_path, MANIFEST_FILE), encoding="utf-8") as f:
+            version = json.load(f).get("corpus_version")
+    except (FileNotFoundError, ValueError):
+        version = None
+    return version or os.path.basename(os.path.normpath(index_path))
+
+
+def new_index_path(root: str) -> str:
+    """새 인덱스를 작성할 디렉토리 경로를 만듭니다. (아직 생성하지 않음)"""
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    return os.path.join(root, f"{INDEX_PREFIX}{stamp}")
+
+
+def activate_index(root: str, index_path: str):
+    """`CURRENT` 포인터를 새 인덱스로 원자적으로 교체합니다."""
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, f"{CURRENT_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(index_path))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(root, CURRENT_FILE))
+
+
+def cleanup_old_indexes(root: str, keep: int = 2):
+    """
+    오래된 인덱스 디렉토리를 삭제합니다.
+    교체 직전까지 서버가 읽고 있던 인덱스를 위해 현재 인덱스를 포함해 `keep`개를 남깁니다.
+    """
+    if not os.path.isdir(root):
+        return
+    active = os.path.basename(get_active_index_path(root))
+    others = sorted(
+        (
+            n for n in os.listdir(root)
+            if n.startswith(INDEX_PREFIX) and n != active and os.path.isdir(os.path.join(root, n))
+        ),
+        reverse=True,
+    )
+    for name in others[max(keep - 1, 0):]:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
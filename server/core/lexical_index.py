@@ -0,0 +1,137 @@
+# server/core/lexical_index.py
+
+"""
+BM25 역색인 (Vector DB와 함께 인제스트 시 생성, 조회 시 mmap으로 읽음)
+
+날짜("7월10일")나 고유명사("프로젝트 A")처럼 정확히 일치해야 하는 검색어는 임베딩 유사도만으로는
+놓치기 쉬워, 어휘 기반 BM25 점수를 함께 사용합니다.
+
+인덱스 디렉토리 안의 `lexical/` 구성
+- meta.json     : BM25 파라미터, 문서 수, 평균 길이, 청크 ID 목록
+- terms.json    : {토큰: [postings 시작 위치, 문서 빈도]}
+- postings.u32  : (문서 번호, 토큰 빈도) uint32 쌍의 연속 배열  <- mmap
+- doclens.u32   : 문서별 토큰 수 uint32 배열                     <- mmap
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+from array import array
+from collections import Counter, defaultdict
+from typing import Iterable, List, Tuple
+
+LEXICAL_DIR = "lexical"
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z]+|[0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어를 포함한 텍스트를 BM25용 토큰으로 나눕니다.
+
+    한글은 형태소 분석기 없이도 조사/어미 변화에 강하도록 어절 전체와 글자 bigram을 함께 사용하고,
+    영문/숫자는 연속 구간 단위로 나눕니다. 예) "7월10일 회의록을" ->
+    ["7", "월", "10", "일", "회의록을", "회의", "의록", "록을"]
+    """
+    tokens = []
+    for run in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(run)
+        if len(run) > 2 and "가" <= run[0] <= "힣":
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def build_lexical_index(index_path: str, documents: Iterable[Tuple[str, str]], k1: float = 1.5, b: float = 0.75):
+    """
+    (청크 ID, 텍스트) 이터레이터로 BM25 역색인을 만들어 `index_path/lexical/`에 저장합니다.
+    텍스트는 토큰 빈도만 세고 바로 버리며, postings는 용어별 uint32 배열로 보관합니다.
+    """
+    lexical_path = os.path.join(index_path, LEXICAL_DIR)
+    os.makedirs(lexical_path, exist_ok=True)
+
+    ids = []
+    postings = defaultdict(lambda: array("I"))  # 용어 -> [문서 번호, 토큰 빈도, ...]
+    doclens = array("I")
+    for doc_idx, (chunk_id, text) in enumerate(documents):
+        ids.append(chunk_id)
+        counts = Counter(tokenize(text))
+        doclens.append(sum(counts.values()))
+        for term, tf in counts.items():
+            postings[term].extend((doc_idx, tf))
+
+    terms = {}
+    flat = array("I")
+    for term in sorted(postings):
+        term_postings = postings.pop(term)
+        terms[term] = [len(flat) // 2, len(term_postings) // 2]
+        flat.extend(term_postings)
+
+    with open(os.path.join(lexical_path, "postings.u32"), "wb") as f:
+        flat.tofile(f)
+    with open(os.path.join(lexical_path, "doclens.u32"), "wb") as f:
+        doclens.tofile(f)
+    with open(os.path.join(lexical_path, "terms.json"), "w", encoding="utf-8") as f:
+        json.dump(terms, f, ensure_ascii=False)
+    meta = {
+        "k1": k1,
+        "b": b,
+        "doc_count": len(ids),
+        "avgdl": (sum(doclens) / len(doclens)) if doclens else 0.0,
+        "ids": list(ids),
+    }
+    with open(os.path.join(lexical_path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+class LexicalIndex:
+    """mmap으로 연 읽기 전용 BM25 인덱스. 여러 스레드에서 동시에 검색해도 안전합니다."""
+
+    def __init__(self, lexical_path: str):
+        with open(os.path.join(lexical_path, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(os.path.join(lexical_path, "terms.json"), encoding="utf-8") as f:
+            self.terms = json.load(f)
+        self.k1 = meta["k1"]
+        self.b = meta["b"]
+        self.doc_count = meta["doc_count"]
+        self.avgdl = meta["avgdl"] or 1.0
+        self.ids = meta["ids"]
+
+        self._files = []
+        self._postings = self._map(os.path.join(lexical_path, "postings.u32"))
+        self._doclens = self._map(os.path.join(lexical_path, "doclens.u32"))
+
+    def _map(self, path: str):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return memoryview(b"").cast("I")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._files.append(mapped)
+        return memoryview(mapped).cast("I")
+
+    @classmethod
+    def open(cls, index_path: str):
+        """인덱스 디렉토리에 BM25 인덱스가 있으면 열고, 없으면 None을 반환합니다."""
+        lexical_path = os.path.join(index_path, LEXICAL_DIR)
+        if not os.path.exists(os.path.join(lexical_path, "meta.json")):
+            return None
+        return cls(lexical_path)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[str, float]]:
+        """BM25 점수가 높은 순서로 (청크 ID, 점수)를 반환합니다."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            entry = self.terms.get(term)
+            if entry is None:
+                continue
+            offset, df = entry
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            for i in range(offset * 2, (offset + df) * 2, 2):
+                doc_idx, tf = self._postings[i], self._postings[i + 1]
+                norm = self.k1 * (1 - self.b + self.b * self._doclens[doc_idx] / self.avgdl)
+                scores[doc_idx] += idf * tf * (self.k1 + 1) / (tf + norm)
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.ids[doc_idx], score) for doc_idx, score in top]
@@ -1,24 +1,27 @@
-from langchain_openai import AzureChatOpenAI, AzureOpenAIEmbeddings
-from server.core.config import settings
-
-"""GPT-4o-mini 채팅 모델"""
-llm = AzureChatOpenAI(
-        azure_endpoint=settings.AOAI_ENDPOINT,
-        api_key=settings.AOAI_API_KEY,
-        api_version=settings.AOAI_API_VERSION,
-        azure_deployment=settings.AOAI_GPT4O_MINI,
-        temperature=0,
-        streaming=True
-)
+# server/core/llm.py
+
+"""
+Azure OpenAI 채팅/임베딩 모델 (하위 호환용 모듈)
+
+클라이언트 생성은 `server.core.providers`가 담당하며, `llm`/`embeddings`는 처음 접근할 때 생성됩니다.
+"""
+
+from server.core import providers
+
+
 def get_chat_model():
-    return llm
-
-"""text-embedding-3-large 임베딩 모델"""
-embeddings = AzureOpenAIEmbeddings(
-        azure_endpoint=settings.AOAI_ENDPOINT,
-        api_key=settings.AOAI_API_KEY,
-        api_version=settings.AOAI_API_VERSION,
-        azure_deployment=settings.AOAI_EMBED_LARGE
-    )
+    """GPT-4o-mini 채팅 모델"""
+    return providers.get_chat_model("azure")
+
+
 def get_embedding_model():
-    return embeddings
\ No newline at end of file
+    """text-embedding-3-large 임베딩 모델 (디스크/메모리 캐시 적용)"""
+    return providers.get_embeddings("azure")
+
+
+def __getattr__(name):
+    if name == "llm":
+        return get_chat_model()
+    if name == "embeddings":
+        return get_embedding_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
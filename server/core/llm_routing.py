@@ -0,0 +1,363 @@
+# server/core/llm_routing.py
+
+"""
+여러 LLM 공급자를 묶어 꼬리 지연(tail latency)과 장애를 줄이는 라우팅 채팅 모델.
+
+공급자 하나가 느려지거나 실패하면 그 지연/오류가 그대로 사용자 응답의 p99가 됩니다. `RoutingChatModel`은
+
+1. 대체(fallback): 첫 공급자가 첫 토큰 전에 실패하면 바로 다음 공급자로 다시 요청합니다.
+2. 헤지(hedge): 첫 토큰이 최근 첫 토큰 지연의 p{percentile}보다 늦으면 다음 공급자에게 같은 요청을 하나 더 보내고,
+   먼저 첫 토큰을 보낸 쪽의 스트림을 사용합니다. (진 쪽은 취소) 헤지 요청 비율은 `hedge_max_ratio`로 제한해
+   공급자 전체가 느려졌을 때 요청이 두 배로 늘지 않게 합니다.
+3. 회로 차단기(circuit breaker): 공급자별 최근 결과의 오류율이 기준을 넘으면 `cooldown`초 동안 그 공급자를
+   건너뛰고, 이후 요청 하나로 회복 여부를 확인합니다.
+
+첫 토큰 이후의 오류는 이미 답변 일부가 전달되었으므로 다른 공급자로 넘기지 않고 그대로 전달합니다.
+각 공급자에는 `bind(tools=...)`로 받은 인자를 그대로 넘기므로 OpenAI 형식 도구를 받는 공급자끼리 묶어야 합니다.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel, agenerate_from_stream
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from server.core.tracing import llm_hedged_requests, llm_provider_calls
+
+# 공급자 호출은 라우팅 모델 하나의 실행으로 기록되도록, 내부 호출에는 상위 콜백을 전달하지 않습니다.
+# (전달하면 astream_events에 같은 토큰이 두 번 나타납니다)
+_INNER_CONFIG = {"callbacks": []}
+
+
+class ProviderUnavailableError(Exception):
+    """모든 공급자가 실패했거나 회로가 열려 있어 요청을 보낼 수 없음"""
+
+
+class CircuitBreaker:
+    """
+    최근 `window`개 결과의 오류율로 여닫는 회로 차단기. (closed -> open -> half_open -> closed)
+
+    Args:
+        window: 오류율을 계산할 최근 결과 수.
+        min_calls: 회로를 열기 위한 최소 결과 수.
+        error_rate: 회로를 여는 오류율 (0~1).
+        cooldown: 열린 뒤 회복 확인 요청을 보내기까지의 시간(초).
+    """
+
+    def __init__(self, window: int = 20, min_calls: int = 5, error_rate: float = 0.5, cooldown: float = 30.0, clock=time.monotonic):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.trips = 0
+        self._clock = clock
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """요청을 보내도 되는지. half_open에서는 회복 확인 요청 하나만 허용합니다."""
+        with self._lock:
+            if self.state == "open" and self._clock() - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "closed":
+                return True
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record(self, success: bool):
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+                if success:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            self._outcomes.append(success)
+            if self.state == "closed" and len(self._outcomes) >= self.min_calls:
+                errors = sum(1 for ok in self._outcomes if not ok)
+                if errors / len(self._outcomes) >= self.error_rate:
+                    self._open()
+
+    def release(self):
+        """결과 없이 끝난 요청(헤지에서 져서 취소됨)의 회복 확인 슬롯을 돌려줍니다."""
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = self._clock()
+        self.trips += 1
+
+    def error_ratio(self) -> float:
+        with self._lock:
+            return sum(1 for ok in self._outcomes if not ok) / len(self._outcomes) if self._outcomes else 0.0
+
+
+class _Provider:
+    def __init__(self, name: str, model: BaseChatModel, breaker: CircuitBreaker):
+        self.name = name
+        self.model = model
+        self.breaker = breaker
+        # 최근 첫 토큰 지연(초)
+        self.latencies = deque(maxlen=200)
+        self.stats = {"calls": 0, "success": 0, "error": 0, "cancelled": 0, "rejected": 0}
+        # 동기 호출(_generate)은 여러 스레드에서 동시에 불리므로 통계와 지연 표본은 락으로 보호합니다.
+        self._lock = threading.Lock()
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    def samples(self) -> int:
+        with self._lock:
+            return len(self.latencies)
+
+    def add_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def start_call(self):
+        with self._lock:
+            self.stats["calls"] += 1
+
+    def count(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+        llm_provider_calls.inc(self.name, outcome)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+class RoutingChatModel(BaseChatModel):
+    """
+    Args:
+        providers: (이름, 채팅 모델) 목록. 앞의 공급자를 우선 사용합니다.
+        hedge: 헤지 요청 사용 여부.
+        hedge_percentile: 이 백분위수의 첫 토큰 지연을 넘기면 헤지 요청을 보냅니다.
+        hedge_min_samples: 백분위수를 계산하기 위한 최소 지연 표본 수. 그 전에는 `hedge_initial_delay`를 사용합니다.
+        hedge_initial_delay: 표본이 부족할 때의 헤지 대기 시간(초).
+        hedge_max_ratio: 전체 요청 중 헤지 요청을 보낼 수 있는 최대 비율.
+        breaker_*: 공급자별 회로 차단기 설정 (`CircuitBreaker` 참고).
+    """
+
+    providers: List[Tuple[str, Any]]
+    hedge: bool = True
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    hedge_initial_delay: float = 2.0
+    hedge_max_ratio: float = 0.1
+    breaker_window: int = 20
+    breaker_min_calls: int = 5
+    breaker_error_rate: float = 0.5
+    breaker_cooldown: float = 30.0
+
+    _entries: List[_Provider] = PrivateAttr(default_factory=list)
+    _stats: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any):
+        self._entries = [
+            _Provider(
+                name,
+                model,
+                CircuitBreaker(self.breaker_window, self.breaker_min_calls, self.breaker_error_rate, self.breaker_cooldown),
+            )
+            for name, model in self.providers
+        ]
+        self._stats = {"requests": 0, "hedged": 0, "hedge_wins": 0, "fallbacks": 0, "unavailable": 0}
+
+    @property
+    def _llm_type(self) -> str:
+        return "routing-chat"
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    # --- 헤지 ---
+    def _hedge_delay(self, entry: _Provider) -> float:
+        if entry.samples() < self.hedge_min_samples:
+            return self.hedge_initial_delay
+        return entry.percentile(self.hedge_percentile)
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            return self._hedge_allowed()
+
+    def _hedge_allowed(self) -> bool:
+        return self.hedge and self._stats["hedged"] < max(1.0, self.hedge_max_ratio * self._stats["requests"])
+
+    def _reserve_hedge(self) -> bool:
+        """헤지 한도 안이면 헤지 1회를 예약합니다. 확인과 증가를 한 번에 해야 동시에 대기하던 요청들이 함께 한도를 넘지 않습니다."""
+        with self._lock:
+            if not self._hedge_allowed():
+                return False
+            self._stats["hedged"] += 1
+            return True
+
+    # --- 스트리밍 ---
+    async def _astream(
+        self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self._count("requests")
+        queue = list(self._entries)
+        pending = {}  # 첫 청크 대기 태스크 -> (공급자, 스트림, 시작 시각)
+        errors = []
+
+        def launch() -> Optional[_Provider]:
+            # 회로가 열린 공급자는 건너뜁니다.
+            while queue:
+                entry = queue.pop(0)
+                if not entry.breaker.allow():
+                    entry.count("rejected")
+                    continue
+                entry.start_call()
+                stream = entry.model.astream(messages, config=_INNER_CONFIG, stop=stop, **kwargs).__aiter__()
+                pending[asyncio.ensure_future(stream.__anext__())] = (entry, stream, time.monotonic())
+                return entry
+            return None
+
+        async def cancel_pending():
+            tasks = list(pending)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for entry, stream, _ in pending.values():
+                entry.breaker.release()
+                entry.count("cancelled")
+                await stream.aclose()
+            pending.clear()
+
+        # 헤지 대기 시간은 지금 기다리는 공급자(대체 후에는 대체 공급자)의 지연 분포와 요청 시각으로 계산합니다.
+        current = launch()
+        if current is None:
+            self._count("unavailable")
+            raise ProviderUnavailableError("모든 LLM 공급자의 회로가 열려 있습니다.")
+        started = time.monotonic()
+        hedge_tried = hedged = False
+        winner = None
+        try:
+            while winner is None:
+                if not pending:
+                    self._count("unavailable")
+                    raise ProviderUnavailableError("모든 LLM 공급자 호출이 실패했습니다: " + "; ".join(errors))
+                timeout = None
+                if not hedge_tried and queue and self._may_hedge():
+                    timeout = max(0.0, self._hedge_delay(current) - (time.monotonic() - started))
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 첫 토큰이 늦어지고 있으므로 다음 공급자에게 같은 요청을 하나 더 보냅니다.
+                    hedge_tried = True
+                    if self._reserve_hedge():
+                        hedged = launch() is not None
+                        if not hedged:
+                            self._count("hedged", -1)
+                    continue
+                for task in done:
+                    entry, stream, attempt_started = pending.pop(task)
+                    try:
+                        first = task.result()
+                    except StopAsyncIteration:
+                        first = None
+                    except Exception as e:
+                        entry.breaker.record(False)
+                        entry.count("error")
+                        errors.append(f"{entry.name}: {e!r}")
+                        if not pending and queue:
+                            # 첫 토큰 전에 실패했으므로 다음 공급자로 바로 다시 요청하고, 헤지 대기도 새로 시작합니다.
+                            fallback = launch()
+                            if fallback is not None:
+                                self._count("fallbacks")
+                                current, started = fallback, time.monotonic()
+                        continue
+                    if winner is not None:
+                        # 같은 순간에 둘 다 첫 토큰을 보낸 경우: 먼저 고른 쪽을 사용합니다.
+                        pending[task] = (entry, stream, attempt_started)
+                        continue
+                    entry.add_latency(time.monotonic() - attempt_started)
+                    winner = (entry, stream, first)
+        finally:
+            # 이긴 공급자가 정해졌거나 요청이 취소되면 나머지 요청은 취소합니다.
+            await cancel_pending()
+
+        entry, stream, first = winner
+        if hedged:
+            self._count("hedge_wins", int(entry is not current))
+            llm_hedged_requests.inc(entry.name)
+        try:
+            if first is not None:
+                yield ChatGenerationChunk(message=first, generation_info={"llm_provider": entry.name})
+            async for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+        except Exception:
+            entry.breaker.record(False)
+            entry.count("error")
+            raise
+        else:
+            entry.breaker.record(True)
+            entry.count("success")
+        finally:
+            await stream.aclose()
+
+    async def _agenerate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        return await agenerate_from_stream(self._astream(messages, stop=stop, **kwargs))
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        """동기 호출은 헤지 없이 순서대로 대체 공급자를 시도합니다."""
+        self._count("requests")
+        errors = []
+        for entry in self._entries:
+            if not entry.breaker.allow():
+                entry.count("rejected")
+                continue
+            entry.start_call()
+            start = time.monotonic()
+            try:
+                message = entry.model.invoke(messages, config=_INNER_CONFIG, stop=stop, **kwargs)
+            except Exception as e:
+                entry.breaker.record(False)
+                entry.count("error")
+                errors.append(f"{entry.name}: {e!r}")
+                continue
+            entry.add_latency(time.monotonic() - start)
+            entry.breaker.record(True)
+            entry.count("success")
+            return ChatResult(generations=[ChatGeneration(message=message, generation_info={"llm_provider": entry.name})])
+        self._count("unavailable")
+        raise ProviderUnavailableError("사용할 수 있는 LLM 공급자가 없습니다: " + "; ".join(errors))
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["hedge_ratio"] = stats["hedged"] / stats["requests"] if stats["requests"] else 0.0
+        stats["providers"] = {
+            entry.name: dict(
+                entry.snapshot(),
+                breaker=entry.breaker.state,
+                breaker_trips=entry.breaker.trips,
+                error_ratio=entry.breaker.error_ratio(),
+                first_token_p50=entry.percentile(50),
+                first_token_p95=entry.percentile(95),
+                hedge_delay=self._hedge_delay(entry),
+            )
+            for entry in self._entries
+        }
+        return stats
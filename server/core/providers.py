@@ -0,0 +1,210 @@
+# server/core/providers.py
+
+"""
+LLM/임베딩 공급자 레지스트리.
+
+`LLM_PROVIDER` / `EMBEDDING_PROVIDER` 설정(google | azure | fake)으로 사용할 공급자를 고르고,
+`LLM_FALLBACK_PROVIDERS`를 지정하면 채팅 모델은 대체/헤지 요청을 하는 라우팅 모델(`llm_routing`)로 묶습니다.
+클라이언트는 처음 사용할 때 한 번만 생성합니다. 공급자 SDK(langchain_google_genai,
+langchain_openai 등)도 이때 임포트하므로, 사용하지 않는 공급자의 임포트/생성 비용은 들지 않습니다.
+서버는 lifespan에서 `prewarm()`을 호출해 첫 요청 전에 미리 생성합니다.
+"""
+
+import threading
+from typing import Callable, Dict, List
+
+from langchain_core.embeddings import Embeddings
+
+from server.core.config import settings
+from server.core.embedding_cache import cached_embeddings
+
+
+# --- 공급자별 생성 함수 (SDK는 함수 안에서 임포트) ---
+def _google_chat_model():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model="gemini-1.5-flash-latest",
+        google_api_key=settings.GOOGLE_API_KEY,
+        temperature=0,
+    )
+
+
+def _google_embeddings():
+    from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+    return cached_embeddings(
+        GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=settings.GOOGLE_API_KEY),
+        model_name="google/models/embedding-001",
+    )
+
+
+def _azure_chat_model():
+    from langchain_openai import AzureChatOpenAI
+
+    return AzureChatOpenAI(
+        azure_endpoint=settings.AOAI_ENDPOINT,
+        api_key=settings.AOAI_API_KEY,
+        api_version=settings.AOAI_API_VERSION,
+        azure_deployment=settings.AOAI_GPT4O_MINI,
+        temperature=0,
+        streaming=True,
+    )
+
+
+def _azure_embeddings():
+    from langchain_openai import AzureOpenAIEmbeddings
+
+    return cached_embeddings(
+        AzureOpenAIEmbeddings(
+            azure_endpoint=settings.AOAI_ENDPOINT,
+            api_key=settings.AOAI_API_KEY,
+            api_version=settings.AOAI_API_VERSION,
+            azure_deployment=settings.AOAI_EMBED_LARGE,
+        ),
+        model_name=f"azure/{settings.AOAI_EMBED_LARGE}",
+    )
+
+
+def _fake_chat_model():
+    # 오프라인 벤치마크/테스트: 네트워크 없이 지연 시간만 흉내 내는 가짜 모델
+    from server.core.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        latency=settings.FAKE_LLM_LATENCY,
+        token_latency=settings.FAKE_LLM_TOKEN_LATENCY,
+        tool_name=settings.FAKE_LLM_TOOL or None,
+        question_arg="query" if settings.FAKE_LLM_TOOL == "search_knowledge_base" else None,
+        failure_rate=settings.FAKE_LLM_FAILURE_RATE,
+        slow_rate=settings.FAKE_LLM_SLOW_RATE,
+        slow_latency=settings.FAKE_LLM_SLOW_LATENCY,
+    )
+
+
+def _fake_backup_chat_model():
+    # 라우팅 테스트용 두 번째 가짜 공급자: 같은 응답, 장애 주입 없음
+    from server.core.fake_llm import FakeChatModel
+
+    return FakeChatModel(
+        latency=settings.FAKE_LLM_LATENCY,
+        token_latency=settings.FAKE_LLM_TOKEN_LATENCY,
+        tool_name=settings.FAKE_LLM_TOOL or None,
+        question_arg="query" if settings.FAKE_LLM_TOOL == "search_knowledge_base" else None,
+        seed=1,
+    )
+
+
+def _routing_chat_model():
+    # LLM_PROVIDER를 우선 사용하고, 실패/지연 시 LLM_FALLBACK_PROVIDERS 순서로 대체
+    from server.core.llm_routing import RoutingChatModel
+
+    names = [settings.LLM_PROVIDER]
+    for name in settings.LLM_FALLBACK_PROVIDERS.split(","):
+        name = name.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return RoutingChatModel(
+        providers=[(name, get_chat_model(name)) for name in names],
+        hedge=settings.LLM_HEDGE_ENABLED,
+        hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+        hedge_initial_delay=settings.LLM_HEDGE_INITIAL_DELAY,
+        hedge_max_ratio=settings.LLM_HEDGE_MAX_RATIO,
+        breaker_window=settings.LLM_BREAKER_WINDOW,
+        breaker_min_calls=settings.LLM_BREAKER_MIN_CALLS,
+        breaker_error_rate=settings.LLM_BREAKER_ERROR_RATE,
+        breaker_cooldown=settings.LLM_BREAKER_COOLDOWN,
+    )
+
+
+def _fake_embeddings():
+    from server.core.fake_llm import FakeEmbeddings
+
+    return cached_embeddings(FakeEmbeddings(latency=settings.FAKE_EMBEDDING_LATENCY), model_name="fake/embedding-256")
+
+
+CHAT_MODEL_PROVIDERS: Dict[str, Callable] = {
+    "google": _google_chat_model,
+    "azure": _azure_chat_model,
+    "fake": _fake_chat_model,
+    "fake_backup": _fake_backup_chat_model,
+    "routing": _routing_chat_model,
+}
+EMBEDDING_PROVIDERS: Dict[str, Callable] = {
+    "google": _google_embeddings,
+    "azure": _azure_embeddings,
+    "fake": _fake_embeddings,
+}
+
+
+# --- 지연 생성 ---
+# 라우팅 모델은 생성 중에 공급자별 모델을 만들므로 재진입 가능한 잠금을 사용합니다.
+_lock = threading.RLock()
+_instances = {}
+
+
+def _get_or_create(kind: str, name: str, registry: Dict[str, Callable]):
+    key = (kind, name)
+    instance = _instances.get(key)
+    if instance is not None:
+        return instance
+    with _lock:
+        instance = _instances.get(key)
+        if instance is None:
+            if name not in registry:
+                raise ValueError(f"알 수 없는 {kind} 공급자입니다: '{name}' (사용 가능: {', '.join(registry)})")
+            instance = _instances[key] = registry[name]()
+    return instance
+
+
+def get_chat_model(provider: str = None):
+    """
+    설정된(또는 지정한) 공급자의 채팅 모델. 처음 호출할 때 생성합니다.
+    공급자를 지정하지 않았고 `LLM_FALLBACK_PROVIDERS`가 있으면 라우팅 모델을 반환합니다.
+    """
+    if provider is None and settings.LLM_FALLBACK_PROVIDERS.strip():
+        provider = "routing"
+    return _get_or_create("chat", provider or settings.LLM_PROVIDER, CHAT_MODEL_PROVIDERS)
+
+
+def get_embeddings(provider: str = None) -> Embeddings:
+    """설정된(또는 지정한) 공급자의 임베딩 모델(캐시 적용). 처음 호출할 때 생성합니다."""
+    return _get_or_create("embedding", provider or settings.EMBEDDING_PROVIDER, EMBEDDING_PROVIDERS)
+
+
+class LazyEmbeddings(Embeddings):
+    """
+    첫 임베딩 호출 시 `get_embeddings()`로 실제 모델을 만드는 프록시.
+    벡터스토어/시맨틱 캐시처럼 임포트 시점에 임베딩 객체가 필요한 곳에 넘겨줍니다.
+    """
+
+    def __init__(self, provider: str = None):
+        self.provider = provider
+
+    def _target(self) -> Embeddings:
+        return get_embeddings(self.provider)
+
+    def __getattr__(self, name):
+        if name == "provider":
+            raise AttributeError(name)
+        return getattr(self._target(), name)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._target().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._target().embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self._target().aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self._target().aembed_query(text)
+
+
+embeddings = LazyEmbeddings()
+
+
+def prewarm():
+    """채팅/임베딩 클라이언트를 미리 생성합니다. (서버 시작 시 lifespan에서 호출)"""
+    get_chat_model()
+    get_embeddings()
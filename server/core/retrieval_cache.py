@@ -0,0 +1,166 @@
+# server/core/retrieval_cache.py
+
+"""
+검색 결과 캐시.
+
+에이전트가 한 그래프 루프 안에서 같은 질문으로 `search_knowledge_base`를 다시 호출하거나,
+여러 사용자가 같은 질문을 하면 임베딩 + Dense/BM25 검색 + RRF 결과가 그대로 반복됩니다.
+(정규화한 질문, k, 코퍼스 버전)을 키로 검색 결과 Document 목록을 저장해 재사용합니다.
+
+- 메모리: 프로세스 안의 LRU + TTL
+- 공유(선택): `RETRIEVAL_CACHE_PATH`를 지정하면 SQLite 파일을 통해 여러 워커가 결과를 공유
+- 코퍼스 버전은 `ingest_data.py`가 매니페스트에 기록하므로, 인덱스 내용이 바뀌면 키가 달라져
+  이전 결과는 더 이상 조회되지 않고 TTL/LRU로 정리됩니다.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from server.core.config import settings
+
+# 공유 캐시에서 만료된 행을 정리하는 주기 (저장 횟수 기준)
+_PURGE_EVERY = 200
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 전각/반각, 공백 차이만 있는 질문은 같은 키가 되도록 정규화합니다."""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+def _encode(docs: List[Document]) -> str:
+    return json.dumps(
+        [{"id": doc.id, "page_content": doc.page_content, "metadata": doc.metadata} for doc in docs],
+        ensure_ascii=False,
+    )
+
+
+def _decode(payload: str) -> List[Document]:
+    return [Document(id=item["id"], page_content=item["page_content"], metadata=item["metadata"]) for item in json.loads(payload)]
+
+
+class RetrievalCache:
+    """
+    Args:
+        ttl: 결과를 재사용하는 시간(초).
+        max_entries: 메모리에 보관하는 최대 결과 수.
+        shared_path: 워커 간 공유용 SQLite 파일 경로. None이면 메모리 캐시만 사용합니다.
+    """
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 1000, shared_path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared_path = shared_path
+
+        self._lock = threading.Lock()
+        # key -> (저장 시각, payload)
+        self._entries = OrderedDict()
+        self._stats = {"memory_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+        self._conn = None
+        self._db_lock = threading.Lock()
+        self._puts_since_purge = 0
+        if shared_path:
+            cache_dir = os.path.dirname(shared_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            self._conn = sqlite3.connect(shared_path, check_same_thread=False, timeout=30)
+            with self._db_lock:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS retrieval_cache "
+                    "(key TEXT PRIMARY KEY, created_at REAL NOT NULL, payload TEXT NOT NULL)"
+                )
+                self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, k: int, corpus_version: str) -> str:
+        return hashlib.sha256(f"{corpus_version}\0{k}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    # --- 조회/저장 ---
+    def get(self, query: str, k: int, corpus_version: str) -> Optional[List[Document]]:
+        key = self.make_key(query, k, corpus_version)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return _decode(entry[1])
+                del self._entries[key]
+
+        if self._conn is not None:
+            with self._db_lock:
+                row = self._conn.execute(
+                    "SELECT created_at, payload FROM retrieval_cache WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl),
+                ).fetchone()
+            if row is not None:
+                self._put_memory(key, row[0], row[1])
+                self._count("shared_hits")
+                return _decode(row[1])
+
+        self._count("misses")
+        return None
+
+    def _put_memory(self, key: str, created_at: float, payload: str):
+        with self._lock:
+            self._entries[key] = (created_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def put(self, query: str, k: int, corpus_version: str, docs: List[Document]):
+        key = self.make_key(query, k, corpus_version)
+        now = time.time()
+        payload = _encode(docs)
+        self._put_memory(key, now, payload)
+        self._count("stores")
+
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO retrieval_cache (key, created_at, payload) VALUES (?, ?, ?)",
+                    (key, now, payload),
+                )
+                self._puts_since_purge += 1
+                if self._puts_since_purge >= _PURGE_EVERY:
+                    self._puts_since_purge = 0
+                    self._conn.execute("DELETE FROM retrieval_cache WHERE created_at < ?", (now - self.ttl,))
+                self._conn.commit()
+
+    # --- 통계 ---
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["shared_hits"] + stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = (stats["memory_hits"] + stats["shared_hits"]) / lookups if lookups else 0.0
+        stats["shared"] = self._conn is not None
+        return stats
+
+
+def create_retrieval_cache() -> Optional[RetrievalCache]:
+    """설정에 따라 검색 결과 캐시를 만듭니다. 비활성화 상태면 None을 반환합니다."""
+    if not settings.RETRIEVAL_CACHE_ENABLED:
+        return None
+    return RetrievalCache(
+        ttl=settings.RETRIEVAL_CACHE_TTL,
+        max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES,
+        shared_path=settings.RETRIEVAL_CACHE_PATH or None,
+    )
@@ -0,0 +1,166 @@
+# server/core/semantic_cache.py
+
+"""
+에이전트 앞단의 시맨틱 응답 캐시.
+
+질문 임베딩이 이전 질문과 충분히 비슷하면(코사인 유사도 >= threshold) 그래프를 실행하지 않고
+저장해 둔 답변 토큰을 같은 SSE 스트림 형식으로 다시 보내 줍니다.
+
+- TTL이 지난 항목과 용량을 넘는 오래된 항목(LRU)은 제거합니다.
+- Vector DB가 다시 인제스트되거나 날짜가 바뀌면 캐시 전체를 비웁니다.
+"""
+
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import AsyncIterator, List, Tuple
+
+import numpy as np
+
+from server.core.config import settings
+from server.core.index_paths import get_index_version
+
+
+class SemanticCache:
+    def __init__(
+        self,
+        embedding_function,
+        threshold: float = 0.95,
+        ttl: float = 3600,
+        max_entries: int = 1000,
+        skip_tools=(),
+        index_root: str = None,
+    ):
+        self.embedding_function = embedding_function
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.skip_tools = set(skip_tools)
+        self.index_root = index_root or settings.CHROMA_PATH
+
+        # key -> {"vector": np.ndarray, "tokens": [...], "created_at": float, "query": str}
+        self._entries = OrderedDict()
+        self._next_key = 0
+        self._version = self._current_version()
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0, "lookup_errors": 0}
+
+    def _current_version(self) -> tuple:
+        # 답변은 문서와 프롬프트의 '오늘 날짜'에 의존하므로 둘 중 하나라도 바뀌면 무효화합니다.
+        return get_index_version(self.index_root), date.today().isoformat()
+
+    def _check_version(self):
+        version = self._current_version()
+        if version != self._version:
+            self._version = version
+            if self._entries:
+                self._entries.clear()
+                self.stats["invalidations"] += 1
+
+    def _expire(self):
+        now = time.time()
+        expired = [key for key, entry in self._entries.items() if now - entry["created_at"] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        self.stats["evictions"] += len(expired)
+
+    async def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(await self.embedding_function.aembed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _best_match(self, vector: np.ndarray):
+        if not self._entries:
+            return None, 0.0
+        keys = list(self._entries.keys())
+        matrix = np.stack([self._entries[key]["vector"] for key in keys])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return keys[best], float(scores[best])
+
+    async def lookup(self, query: str) -> Tuple[List[str], float, np.ndarray]:
+        """
+        유사한 질문의 캐시된 답변 토큰을 찾습니다.
+
+        Returns:
+            (토큰 리스트 또는 None, 유사도, 질문 벡터) — 질문 벡터는 store()에서 재사용합니다.
+        """
+        vector = await self._embed(query)
+        self._check_version()
+        self._expire()
+
+        key, score = self._best_match(vector)
+        if key is not None and score >= self.threshold:
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._entries[key]["tokens"], score, vector
+        self.stats["misses"] += 1
+        return None, score, vector
+
+    def store(self, query: str, vector: np.ndarray, tokens: List[str]):
+        self._check_version()
+        self._entries[self._next_key] = {
+            "vector": vector,
+            "tokens": list(tokens),
+            "created_at": time.time(),
+            "query": query,
+        }
+        self._next_key += 1
+        self.stats["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def wrap(self, query: str, events: AsyncIterator[Tuple[str, dict]]) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        에이전트 이벤트 스트림 앞에 캐시를 둡니다.
+        적중하면 저장된 토큰을 재생하고, 아니면 원래 스트림을 그대로 전달하면서 답변을 저장합니다.
+        임베딩 장애 등으로 조회에 실패하면 캐시 없이 원래 스트림을 전달합니다.
+        """
+        try:
+            tokens, score, vector = await self.lookup(query)
+        except Exception as e:
+            self.stats["lookup_errors"] += 1
+            print(f"[semantic cache] 캐시 조회에 실패해 캐시 없이 답변합니다: {e!r}")
+            async for item in events:
+                yield item
+            return
+        if tokens is not None:
+            yield "cache", {"hit": True, "similarity": round(score, 4)}
+            for text in tokens:
+                yield "token", {"text": text}
+            return
+
+        collected = []
+        cacheable = True
+        async for event, data in events:
+            if event == "token":
+                collected.append(data["text"])
+            elif event == "tool_start" and data.get("name") in self.skip_tools:
+                cacheable = False
+            yield event, data
+
+        # 스트림이 예외 없이 끝까지 전달된 경우에만 저장합니다.
+        if cacheable and collected:
+            self.store(query, vector, collected)
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return dict(
+            self.stats,
+            entries=len(self._entries),
+            hit_rate=self.stats["hits"] / lookups if lookups else 0.0,
+            threshold=self.threshold,
+        )
+
+
+def create_semantic_cache(embedding_function):
+    """설정에서 캐시가 켜져 있으면 SemanticCache를, 아니면 None을 반환합니다."""
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+    return SemanticCache(
+        embedding_function,
+        threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+        ttl=settings.SEMANTIC_CACHE_TTL,
+        max_entries=settings.SEMANTIC_CACHE_MAX_ENTRIES,
+        skip_tools=[name.strip() for name in settings.SEMANTIC_CACHE_SKIP_TOOLS.split(",") if name.strip()],
+    )
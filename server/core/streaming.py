@@ -0,0 +1,61 @@
+# server/core/streaming.py
+
+"""
+에이전트 실행 과정을 SSE(Server-Sent Events)로 스트리밍하기 위한 도우미.
+
+이벤트 종류
+- token      : LLM이 생성한 답변 토큰        {"text": "..."}
+- tool_start : 도구 실행 시작               {"name": "...", "input": {...}}
+- tool_end   : 도구 실행 완료               {"name": "..."}
+- cache      : 시맨틱 캐시 적중(답변 재생)   {"hit": true, "similarity": 0.97}
+- coalesced  : 실행 중인 같은 질문에 합류    {"replayed": 12}  (이미 나온 이벤트 수, 이어서 재생)
+- error      : 처리 중 오류                 {"message": "..."}
+- done       : 스트림 종료                  {}
+"""
+
+import json
+from typing import AsyncIterator, Tuple
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # 프록시(nginx 등)가 응답을 모아서 보내지 않도록 버퍼링 해제
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(event: str, data: dict) -> str:
+    """SSE 프레임 하나를 만듭니다. 데이터는 줄바꿈이 안전하도록 JSON으로 인코딩합니다."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _chunk_text(content) -> str:
+    """모델별로 문자열 또는 content block 리스트로 오는 토큰 내용을 문자열로 변환합니다."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str) else block.get("text", "")
+            for block in content
+            if isinstance(block, (str, dict))
+        )
+    return ""
+
+
+async def stream_agent_events(graph, input_data: dict, config: dict = None) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    LangGraph 그래프를 실행하면서 (이벤트 이름, 데이터)를 토큰 단위로 내보냅니다.
+    `agent` 노드의 LLM 토큰만 답변으로 전달하고, 도구 실행은 진행 상황 이벤트로 알립니다.
+    """
+    async for event in graph.astream_events(input_data, config=config, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            if event.get("metadata", {}).get("langgraph_node") != "agent":
+                continue
+            text = _chunk_text(event["data"]["chunk"].content)
+            if text:
+                yield "token", {"text": text}
+        elif kind == "on_tool_start":
+            tool_input = event["data"].get("input")
+            yield "tool_start", {"name": event["name"], "input": tool_input if isinstance(tool_input, dict) else str(tool_input)}
+        elif kind == "on_tool_end":
+            yield "tool_end", {"name": event["name"]}
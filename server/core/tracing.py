@@ -0,0 +1,273 @@
+# server/core/tracing.py
+
+"""
+요청 단위 트레이싱과 Prometheus 지표.
+
+- `request_trace()`로 요청 하나의 트레이스를 시작하면, 그 안에서 실행되는 `span()`이
+  (다른 태스크/스레드 풀로 넘어가더라도 contextvars를 통해) 같은 트레이스에 기록됩니다.
+- 모든 span의 소요 시간은 종류(kind)/이름(name)별 히스토그램에 누적되어 `/metrics`에서
+  Prometheus 텍스트 형식으로 노출됩니다.
+- `LANGFUSE_ENABLED=true`이고 키가 설정되어 있으면 LangChain 콜백으로 Langfuse에도 보냅니다.
+  비활성화 상태에서는 콜백을 전혀 등록하지 않으므로 추가 비용이 없습니다.
+
+span 종류: node(그래프 노드), llm, tool, retrieval, embedding, vector_query, lexical_query
+"""
+
+import bisect
+import contextvars
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+from server.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+# --- 지표 ---
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Histogram:
+    """레이블별 누적 버킷 히스토그램 (thread-safe)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # {레이블 값 튜플: [버킷별 개수..., +Inf 개수, 합계]}
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in sorted(items):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {series[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    """레이블별 누적 카운터 (thread-safe)"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+span_duration = Histogram(
+    "agent_span_duration_seconds", "그래프 노드/LLM/도구/임베딩/벡터 검색 구간별 소요 시간", ("kind", "name")
+)
+span_errors = Counter("agent_span_errors_total", "예외로 끝난 구간 수", ("kind", "name"))
+request_duration = Histogram("chat_request_duration_seconds", "채팅 요청 전체 소요 시간 (스트림 종료까지)", ("endpoint",))
+time_to_first_token = Histogram("chat_time_to_first_token_seconds", "요청 시작부터 첫 답변 토큰까지의 시간", ("endpoint",))
+request_errors = Counter("chat_request_errors_total", "오류로 끝난 채팅 요청 수", ("endpoint",))
+router_decisions = Counter(
+    "agent_router_decisions_total", "의도 라우터 결정 수 (method: keyword | embedding | fallback)", ("method", "intent")
+)
+admission_wait = Histogram("chat_admission_wait_seconds", "에이전트 실행 슬롯을 받기까지 기다린 시간")
+admission_rejections = Counter(
+    "chat_admission_rejections_total", "실행 슬롯을 받지 못해 429로 거절한 요청 수 (reason: queue_full | timeout)", ("reason",)
+)
+coalesced_requests = Counter("chat_coalesced_requests_total", "실행 중인 같은 질문에 합류해 결과 스트림을 공유받은 요청 수")
+llm_provider_calls = Counter(
+    "llm_provider_calls_total",
+    "라우팅 모델의 공급자별 호출 결과 수 (outcome: success | error | cancelled | rejected)",
+    ("provider", "outcome"),
+)
+llm_hedged_requests = Counter("llm_hedged_requests_total", "헤지 요청을 보낸 LLM 호출 수 (winner: 응답을 사용한 공급자)", ("winner",))
+
+_metrics = [
+    span_duration,
+    span_errors,
+    request_duration,
+    time_to_first_token,
+    request_errors,
+    router_decisions,
+    admission_wait,
+    admission_rejections,
+    coalesced_requests,
+    llm_provider_calls,
+    llm_hedged_requests,
+]
+
+
+def render_metrics() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환합니다."""
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- 트레이스 ---
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Trace:
+    """요청 하나에서 기록된 span 목록"""
+
+    def __init__(self, endpoint: str, request_id: str = None):
+        self.endpoint = endpoint
+        self.request_id = request_id or new_request_id()
+        self.start = time.perf_counter()
+        self.first_token_at = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add_span(self, kind: str, name: str, start: float, elapsed: float, error: bool):
+        with self._lock:
+            self.spans.append(
+                {
+                    "kind": kind,
+                    "name": name,
+                    "start_ms": round((start - self.start) * 1000, 1),
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "error": error,
+                }
+            )
+
+    def mark_error(self):
+        request_errors.inc(self.endpoint)
+
+    def mark_first_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            time_to_first_token.observe(self.first_token_at - self.start, self.endpoint)
+
+    def summary(self) -> str:
+        total = (time.perf_counter() - self.start) * 1000
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        parts = ", ".join(f"{s['kind']}:{s['name']} {s['duration_ms']:.0f}ms" for s in spans)
+        return f"[trace {self.request_id}] {self.endpoint} {total:.0f}ms | {parts}"
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("current_trace", default=None)
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+@contextmanager
+def span(kind: str, name: str):
+    """
+    구간 소요 시간을 측정합니다. 동기/비동기 코드 모두에서 `with span(...)`으로 사용합니다.
+    활성 트레이스가 없어도 히스토그램에는 기록됩니다.
+    """
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        span_duration.observe(elapsed, kind, name)
+        if error:
+            span_errors.inc(kind, name)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_span(kind, name, start, elapsed, error)
+
+
+@contextmanager
+def request_trace(endpoint: str, request_id: str = None):
+    """요청 하나의 트레이스를 시작합니다. 종료 시 요청 지표를 기록하고, 설정 시 요약을 출력합니다."""
+    trace = Trace(endpoint, request_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    except Exception:
+        trace.mark_error()
+        raise
+    finally:
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            # 스트리밍 응답이 다른 컨텍스트에서 정리(aclose)되는 경우
+            pass
+        request_duration.observe(time.perf_counter() - trace.start, endpoint)
+        if settings.TRACE_LOG_REQUESTS:
+            print(trace.summary())
+
+
+# --- Langfuse ---
+_langfuse_handler = None
+_langfuse_checked = False
+
+
+def get_langfuse_handler():
+    """Langfuse가 활성화되어 있으면 LangChain 콜백 핸들러를, 아니면 None을 반환합니다."""
+    global _langfuse_handler, _langfuse_checked
+    if _langfuse_checked:
+        return _langfuse_handler
+    _langfuse_checked = True
+    if not (settings.LANGFUSE_ENABLED and settings.LANGFUSE_PUBLIC_KEY and settings.LANGFUSE_SECRET_KEY):
+        return None
+    try:
+        from langfuse.callback import CallbackHandler
+    except ImportError:
+        print("langfuse 패키지가 없어 Langfuse 트레이싱을 사용하지 않습니다.")
+        return None
+    _langfuse_handler = CallbackHandler(
+        public_key=settings.LANGFUSE_PUBLIC_KEY,
+        secret_key=settings.LANGFUSE_SECRET_KEY,
+        host=settings.LANGFUSE_HOST,
+    )
+    print(f"Langfuse 트레이싱을 사용합니다. ({settings.LANGFUSE_HOST})")
+    return _langfuse_handler
+
+
+def trace_config(trace: Trace) -> dict:
+    """그래프 실행 config. Langfuse가 꺼져 있으면 콜백 없이 run 이름/메타데이터만 담습니다."""
+    config = {"run_name": trace.endpoint, "metadata": {"request_id": trace.request_id}}
+    handler = get_langfuse_handler()
+    if handler is not None:
+        config["callbacks"] = [handler]
+    return config
@@ -0,0 +1,245 @@
+# server/core/vectorstore.py
+
+import os
+import threading
+import time
+
+from server.core.config import settings
+from server.core.executor import run_sync
+from server.core.faiss_index import FaissIndex
+from server.core.dense_index import DenseIndex
+from server.core.hybrid_search import dense_search, hybrid_search
+from server.core.index_paths import CURRENT_FILE, get_active_index_path, read_corpus_version
+from server.core.lexical_index import LexicalIndex
+from server.core.providers import embeddings
+from server.core.retrieval_cache import create_retrieval_cache
+from server.core.tracing import span
+
+
+class VectorStoreProvider:
+    """
+    프로세스 전체에서 하나의 Chroma 벡터스토어와 리트리버를 공유하는 관리자.
+
+    - 서버 시작 시 `open()`으로 한 번만 DB를 열고, 이후 요청은 같은 핸들을 재사용합니다.
+    - `CURRENT` 포인터나 DB 파일이 바뀌면(재인덱싱 등) 다음 조회 시 자동으로 다시 엽니다.
+    - 인덱스에 BM25 역색인이 있으면 Dense + BM25 하이브리드 검색을 사용합니다.
+    - `vector_backend="mmap"`이면 Dense 검색은 Chroma HNSW 대신 mmap Dense 인덱스로 합니다.
+      여러 워커가 같은 인덱스 파일을 페이지 캐시로 공유하고, Chroma에서는 본문만 ID로 가져옵니다.
+    - `vector_backend="faiss"`이면 양자화한 FAISS 인덱스로 후보를 뽑고 mmap 원본 벡터로 재정렬합니다.
+    - `retrieval_cache`가 있으면 (질문, k, 코퍼스 버전)이 같은 검색 결과를 재사용합니다.
+    - DB 열기/검색 소요 시간을 카운터로 기록합니다.
+    """
+
+    def __init__(
+        self,
+        root_directory: str,
+        embedding_function,
+        reload_interval: float = 5.0,
+        hybrid: bool = True,
+        hybrid_candidates: int = 20,
+        rrf_k: int = 60,
+        retrieval_cache=None,
+        vector_backend: str = "chroma",
+        faiss_nprobe: int = 16,
+        faiss_rerank: int = 4,
+    ):
+        self.root_directory = root_directory
+        self.persist_directory = get_active_index_path(root_directory)
+        self.embedding_function = embedding_function
+        self.reload_interval = reload_interval
+        self.hybrid = hybrid
+        self.hybrid_candidates = hybrid_candidates
+        self.rrf_k = rrf_k
+        self.retrieval_cache = retrieval_cache
+        self.vector_backend = vector_backend
+        self.faiss_nprobe = faiss_nprobe
+        self.faiss_rerank = faiss_rerank
+        self.corpus_version = None
+
+        self._lock = threading.RLock()
+        self._vectorstore = None
+        self._lexical_index = None
+        self._dense_index = None
+        self._retrievers = {}
+        self._signature = None
+        self._last_check = 0.0
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "open_count": 0,
+            "open_seconds_total": 0.0,
+            "last_open_seconds": 0.0,
+            "query_count": 0,
+            "query_seconds_total": 0.0,
+            "query_seconds_max": 0.0,
+        }
+
+    # --- 디렉토리 변경 감지 ---
+    def _directory_signature(self):
+        """`CURRENT` 포인터와 현재 인덱스 sqlite 파일의 inode/mtime으로 변경 여부를 판단합니다."""
+        persist_directory = get_active_index_path(self.root_directory)
+        signature = [persist_directory]
+        for path in (os.path.join(self.root_directory, CURRENT_FILE), os.path.join(persist_directory, "chroma.sqlite3")):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_ino, st.st_mtime_ns))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _load(self):
+        # chromadb 임포트 비용을 서버 시작(lifespan) 시점으로 미룹니다.
+        from langchain_community.vectorstores import Chroma
+
+        start = time.perf_counter()
+        # 인제스트는 항상 새 인덱스 디렉토리를 만들므로 재로딩은 새 경로를 여는 것과 같습니다.
+        persist_directory = get_active_index_path(self.root_directory)
+        vectorstore = Chroma(
+            persist_directory=persist_directory,
+            embedding_function=self.embedding_function,
+        )
+        lexical_index = LexicalIndex.open(persist_directory) if self.hybrid else None
+        dense_index = DenseIndex.open(persist_directory) if self.vector_backend in ("mmap", "faiss") else None
+        if self.vector_backend in ("mmap", "faiss") and dense_index is None:
+            print(f"'{persist_directory}'에 mmap Dense 인덱스가 없어 Chroma로 검색합니다. (인제스트를 다시 실행하세요)")
+        if self.vector_backend == "faiss" and dense_index is not None:
+            faiss_index = FaissIndex.open(persist_directory, dense_index, nprobe=self.faiss_nprobe, rerank=self.faiss_rerank)
+            if faiss_index is None:
+                print(f"'{persist_directory}'에 FAISS 인덱스가 없어 mmap Dense 인덱스로 정확 검색합니다.")
+            else:
+                dense_index = faiss_index
+        elapsed = time.perf_counter() - start
+
+        self._vectorstore = vectorstore
+        self._lexical_index = lexical_index
+        self._dense_index = dense_index
+        self.persist_directory = persist_directory
+        self.corpus_version = read_corpus_version(persist_directory)
+        self._retrievers = {}
+        # Chroma가 열면서 sqlite 파일을 갱신할 수 있으므로 서명은 연 뒤에 기록합니다.
+        self._signature = self._directory_signature()
+        self._last_check = time.monotonic()
+
+        with self._stats_lock:
+            self._stats["open_count"] += 1
+            self._stats["open_seconds_total"] += elapsed
+            self._stats["last_open_seconds"] = elapsed
+        print(f"Vector DB '{self.persist_directory}'를 열었습니다. ({elapsed * 1000:.1f}ms)")
+
+    def open(self):
+        """벡터스토어를 엽니다. 이미 열려 있다면 아무 작업도 하지 않습니다."""
+        with self._lock:
+            if self._vectorstore is None:
+                self._load()
+        return self._vectorstore
+
+    def reload(self):
+        """디스크 상태와 관계없이 벡터스토어를 다시 엽니다."""
+        with self._lock:
+            self._load()
+        return self._vectorstore
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        with self._lock:
+            if now - self._last_check < self.reload_interval:
+                return
+            self._last_check = now
+            if self._directory_signature() != self._signature:
+                print(f"Vector DB '{self.root_directory}' 변경을 감지하여 다시 엽니다.")
+                self._load()
+
+    # --- 조회 API ---
+    def get_vectorstore(self):
+        if self._vectorstore is None:
+            return self.open()
+        self._maybe_reload()
+        return self._vectorstore
+
+    def get_retriever(self, k: int = 3):
+        self.get_vectorstore()
+        with self._lock:
+            # 재로딩 시 리트리버 캐시도 비워지므로 항상 현재 벡터스토어 기준으로 만듭니다.
+            retriever = self._retrievers.get(k)
+            if retriever is None:
+                retriever = self._vectorstore.as_retriever(search_kwargs={"k": k})
+                self._retrievers[k] = retriever
+        return retriever
+
+    def search(self, query: str, k: int = 3):
+        """
+        질문과 가장 관련 있는 k개의 문서를 검색하고 소요 시간을 기록합니다.
+        BM25 인덱스가 있으면 하이브리드 검색, 없으면 Dense 검색만 사용합니다.
+        """
+        self.get_vectorstore()
+        with self._lock:
+            vectorstore, lexical_index, dense_index = self._vectorstore, self._lexical_index, self._dense_index
+            corpus_version = self.corpus_version
+        if self.retrieval_cache is not None:
+            docs = self.retrieval_cache.get(query, k, corpus_version)
+            if docs is not None:
+                return docs
+
+        start = time.perf_counter()
+        if lexical_index is not None:
+            with span("retrieval", "hybrid"):
+                docs = hybrid_search(
+                    vectorstore,
+                    lexical_index,
+                    query,
+                    k=k,
+                    candidates=max(k, self.hybrid_candidates),
+                    rrf_k=self.rrf_k,
+                    dense_index=dense_index,
+                )
+        elif dense_index is not None:
+            with span("retrieval", "dense"):
+                docs = list(dense_search(vectorstore, query, k, dense_index=dense_index).values())
+        else:
+            retriever = self.get_retriever(k)
+            with span("retrieval", "dense"):
+                docs = retriever.invoke(query)
+        self._record_query(time.perf_counter() - start)
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.put(query, k, corpus_version, docs)
+        return docs
+
+    async def asearch(self, query: str, k: int = 3):
+        """`search`의 비동기 버전. Chroma 검색은 동기 API이므로 공용 스레드 풀에서 실행합니다."""
+        return await run_sync(self.search, query, k)
+
+    def _record_query(self, elapsed: float):
+        with self._stats_lock:
+            self._stats["query_count"] += 1
+            self._stats["query_seconds_total"] += elapsed
+            self._stats["query_seconds_max"] = max(self._stats["query_seconds_max"], elapsed)
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["open_seconds_avg"] = stats["open_seconds_total"] / stats["open_count"] if stats["open_count"] else 0.0
+        stats["query_seconds_avg"] = stats["query_seconds_total"] / stats["query_count"] if stats["query_count"] else 0.0
+        stats["persist_directory"] = self.persist_directory
+        stats["hybrid"] = self._lexical_index is not None
+        stats["vector_backend"] = self._dense_index.backend if self._dense_index is not None else "chroma"
+        stats["dense_index_bytes"] = self._dense_index.nbytes if self._dense_index is not None else 0
+        stats["pid"] = os.getpid()
+        stats["corpus_version"] = self.corpus_version
+        stats["retrieval_cache"] = self.retrieval_cache.get_stats() if self.retrieval_cache is not None else {"enabled": False}
+        return stats
+
+
+vectorstore_provider = VectorStoreProvider(
+    root_directory=settings.CHROMA_PATH,
+    embedding_function=embeddings,
+    reload_interval=settings.VECTORSTORE_RELOAD_INTERVAL,
+    hybrid=settings.HYBRID_SEARCH_ENABLED,
+    hybrid_candidates=settings.HYBRID_CANDIDATES,
+    rrf_k=settings.HYBRID_RRF_K,
+    retrieval_cache=create_retrieval_cache(),
+    vector_backend=settings.VECTOR_BACKEND,
+    faiss_nprobe=settings.FAISS_NPROBE,
+    faiss_rerank=settings.FAISS_RERANK,
+)
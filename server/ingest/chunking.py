@@ -0,0 +1,199 @@
+# server/ingest/chunking.py
+
+"""
+인제스트 청크 분할 전략.
+
+- recursive : 글자 수 기준 고정 크기 + 겹침 (기존 방식, 1000자 / 200자 겹침)
+- token     : 토큰 수 기준 고정 크기 + 작은 겹침
+- section   : 제목/안건/번호 목록 같은 구조를 경계로 나누고, 긴 섹션만 토큰 수 기준으로 다시 나눔 (겹침 없음)
+
+모든 전략은 청크 metadata에 다음 값을 기록합니다.
+- source      : 원본 파일 경로
+- section     : 청크가 속한 섹션 제목 (없으면 "")
+- start_index : 원본 파일에서 청크가 시작하는 글자 위치
+- end_index   : 원본 파일에서 청크가 끝나는 글자 위치 (미포함)
+- chunk_index : 파일 안에서의 청크 순서
+"""
+
+import re
+from typing import Callable, Dict, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from server.agent.context_budget import count_tokens
+
+# 섹션 제목으로 보는 줄: 마크다운 제목, "1. 제목", "1.2 제목", "안건 1: ...", "[제목]", "제1장 ..."
+_HEADING_PATTERNS = [
+    re.compile(r"^#{1,6}\s+\S"),
+    re.compile(r"^\d+(\.\d+)*\.?\s+\S.{0,60}$"),
+    re.compile(r"^(안건|항목|섹션)\s*\d+\s*[:.)]"),
+    re.compile(r"^\[[^\]]{1,40}\]$"),
+    re.compile(r"^제\s*\d+\s*(장|절|조)"),
+]
+# 문서 첫 줄이 이 길이 이하이고 문장 부호로 끝나지 않으면 문서 제목으로 봅니다.
+_TITLE_MAX_CHARS = 40
+
+
+def is_heading(line: str, is_first_line: bool = False) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 80:
+        return False
+    if any(pattern.match(stripped) for pattern in _HEADING_PATTERNS):
+        return True
+    return is_first_line and len(stripped) <= _TITLE_MAX_CHARS and not stripped.endswith((".", "다", "요", ",", ":"))
+
+
+def split_sections(text: str) -> List[Tuple[str, int, int]]:
+    """텍스트를 (섹션 제목, 시작 위치, 끝 위치) 목록으로 나눕니다. 제목 줄은 섹션 본문에 포함됩니다."""
+    boundaries = []
+    position = 0
+    first_line = True
+    for line in text.splitlines(keepends=True):
+        if line.strip():
+            if is_heading(line, first_line):
+                boundaries.append((line.strip().lstrip("#").strip(), position))
+            first_line = False
+        position += len(line)
+
+    if not boundaries or boundaries[0][1] > 0 and text[:boundaries[0][1]].strip():
+        boundaries.insert(0, ("", 0))
+    sections = []
+    for i, (title, start) in enumerate(boundaries):
+        end = boundaries[i + 1][1] if i + 1 < len(boundaries) else len(text)
+        sections.append((title, start, end))
+    return sections
+
+
+def _trimmed_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """앞뒤 공백을 제외한 [start, end) 구간"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+class _BaseSplitter:
+    name = ""
+
+    def _split_text(self, text: str) -> List[Tuple[str, int, int]]:
+        """텍스트를 (섹션 제목, 시작 위치, 끝 위치) 청크 목록으로 나눕니다."""
+        raise NotImplementedError
+
+    def config(self) -> dict:
+        """인덱스 매니페스트에 기록할 설정. 설정이 바뀌면 전체 문서를 다시 분할합니다."""
+        return {"strategy": self.name}
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        chunks = []
+        for doc in documents:
+            for index, (section, start, end) in enumerate(self._split_text(doc.page_content)):
+                metadata = dict(
+                    doc.metadata,
+                    section=section,
+                    start_index=start,
+                    end_index=end,
+                    chunk_index=index,
+                )
+                chunks.append(Document(page_content=doc.page_content[start:end], metadata=metadata))
+        return chunks
+
+
+class _WindowSplitter(_BaseSplitter):
+    """RecursiveCharacterTextSplitter 기반 고정 크기 분할 (겹침 포함)"""
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, length_function: Callable[[str], int] = len):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            length_function=length_function,
+            add_start_index=True,
+        )
+
+    def config(self) -> dict:
+        return dict(super().config(), chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap)
+
+    def _split_text(self, text: str) -> List[Tuple[str, int, int]]:
+        spans = []
+        for doc in self._splitter.create_documents([text]):
+            start = doc.metadata["start_index"]
+            if start < 0:  # 위치를 찾지 못한 경우 (중복 텍스트)
+                start = text.find(doc.page_content)
+            spans.append(("", start, start + len(doc.page_content)))
+        return spans
+
+
+class RecursiveSplitter(_WindowSplitter):
+    name = "recursive"
+
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        super().__init__(chunk_size, chunk_overlap)
+
+
+class TokenSplitter(_WindowSplitter):
+    name = "token"
+
+    def __init__(self, chunk_size: int = 300, chunk_overlap: int = 30):
+        super().__init__(chunk_size, chunk_overlap, length_function=count_tokens)
+
+
+class SectionSplitter(_BaseSplitter):
+    """
+    섹션 제목을 경계로 나눕니다. 섹션이 chunk_size 토큰보다 길면 문단/문장 경계에서 겹침 없이 다시 나누고,
+    min_size 토큰보다 짧은 섹션은 같은 섹션 제목이 없는 경우 바로 앞 청크에 붙입니다.
+    """
+
+    name = "section"
+
+    def __init__(self, chunk_size: int = 300, min_size: int = 20):
+        self.chunk_size = chunk_size
+        self.min_size = min_size
+        self._subsplitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=0,
+            length_function=count_tokens,
+            separators=["\n\n", "\n", ". ", "다. ", " ", ""],
+            add_start_index=True,
+        )
+
+    def config(self) -> dict:
+        return dict(super().config(), chunk_size=self.chunk_size, min_size=self.min_size)
+
+    def _split_text(self, text: str) -> List[Tuple[str, int, int]]:
+        spans = []
+        for title, start, end in split_sections(text):
+            start, end = _trimmed_span(text, start, end)
+            if start >= end:
+                continue
+            body = text[start:end]
+            if count_tokens(body) <= self.chunk_size:
+                if spans and not title and count_tokens(body) < self.min_size:
+                    # 제목 없는 짧은 조각(예: 문서 머리말 한 줄)은 앞 청크에 합칩니다.
+                    prev_title, prev_start, _ = spans[-1]
+                    spans[-1] = (prev_title, prev_start, end)
+                else:
+                    spans.append((title, start, end))
+                continue
+            for doc in self._subsplitter.create_documents([body]):
+                sub_start = start + max(doc.metadata["start_index"], 0)
+                spans.append((title, *_trimmed_span(text, sub_start, sub_start + len(doc.page_content))))
+        return spans
+
+
+SPLITTERS: Dict[str, type] = {
+    RecursiveSplitter.name: RecursiveSplitter,
+    TokenSplitter.name: TokenSplitter,
+    SectionSplitter.name: SectionSplitter,
+}
+
+
+def create_splitter(strategy: str, chunk_size: int = None, **kwargs) -> _BaseSplitter:
+    """전략 이름으로 분할기를 만듭니다. chunk_size를 생략하면 전략별 기본값을 사용합니다."""
+    if strategy not in SPLITTERS:
+        raise ValueError(f"알 수 없는 청크 분할 전략입니다: '{strategy}' (사용 가능: {', '.join(SPLITTERS)})")
+    if chunk_size:
+        kwargs["chunk_size"] = chunk_size
+    return SPLITTERS[strategy](**kwargs)
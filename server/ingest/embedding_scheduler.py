@@ -0,0 +1,241 @@
+# server/ingest/embedding_scheduler.py
+
+"""
+인제스트용 배치 임베딩 스케줄러.
+
+- 청크를 공급자의 최대 배치 크기로 묶어 여러 배치를 asyncio로 동시에 임베딩합니다.
+- 429(요청 한도 초과)를 받으면 동시 실행 수를 절반으로 줄이고 지수 백오프 후 재시도하며,
+  성공이 이어지면 동시 실행 수를 다시 한 단계씩 늘립니다. (AIMD)
+  조정한 동시 실행 수는 스케줄러에 유지되므로 `embed`를 배치마다 호출해도 다시 최대값에서 시작하지 않습니다.
+- 완료된 배치는 체크포인트 파일에 기록해, 중단된 인제스트를 다시 실행하면 이어서 진행합니다.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from typing import Dict, List
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """
+    공급자별 429/쿼터 초과 예외를 판별합니다. 메시지에 "429"가 들어 있는 것만으로는 판단하지 않고
+    상태 코드 속성과 예외 타입으로 확인하며, 감싼 예외는 원인(__cause__)까지 확인합니다.
+    """
+    for attr in ("status_code", "code", "http_status"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    name = type(exc).__name__
+    if "RateLimit" in name or "ResourceExhausted" in name or "TooManyRequests" in name:
+        return True
+    cause = exc.__cause__
+    return cause is not None and cause is not exc and is_rate_limit_error(cause)
+
+
+def _retry_after(exc: BaseException):
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+        retry_after = headers.get("retry-after") if hasattr(headers, "get") else None
+    try:
+        return float(retry_after) if retry_after is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class _AdaptiveLimiter:
+    """동시 실행 상한을 실행 중에 늘리고 줄일 수 있는 세마포어"""
+
+    def __init__(self, limit: int, max_limit: int):
+        self.limit = limit
+        self.max_limit = max_limit
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def __aexit__(self, *exc_info):
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    async def on_success(self):
+        async with self._cond:
+            self._successes += 1
+            if self.limit < self.max_limit and self._successes >= self.limit:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    async def on_rate_limit(self):
+        async with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+
+class EmbeddingCheckpoint:
+    """완료된 배치의 (청크 ID, 벡터)를 JSON Lines로 누적 기록하는 체크포인트"""
+
+    def __init__(self, path: str, model_name: str):
+        self.path = path
+        self.model_name = model_name
+
+    def load(self) -> Dict[str, List[float]]:
+        vectors = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중단 시점에 잘린 마지막 줄은 무시합니다.
+                        continue
+                    if record.get("model") != self.model_name:
+                        continue
+                    vectors.update(zip(record["ids"], record["vectors"]))
+        except FileNotFoundError:
+            pass
+        return vectors
+
+    def append(self, ids: List[str], vectors: List[List[float]]):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        record = {"model": self.model_name, "ids": ids, "vectors": vectors}
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class EmbeddingScheduler:
+    """
+    Args:
+        embeddings: LangChain `Embeddings` 객체.
+        batch_size: 한 번의 요청에 넣을 최대 청크 수 (공급자의 최대 배치 크기).
+        max_concurrency: 동시에 실행할 최대 배치 수.
+        max_retries: 배치 하나당 429 재시도 횟수.
+        base_delay / max_delay: 지수 백오프의 시작/최대 대기 시간(초).
+        checkpoint: 완료된 배치를 기록할 EmbeddingCheckpoint. None이면 기록하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_retries: int = 8,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        checkpoint: EmbeddingCheckpoint = None,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.checkpoint = checkpoint
+        # 스케줄러를 만든 뒤의 누적 통계
+        self.stats = {
+            "resumed": 0,
+            "embedded": 0,
+            "batches": 0,
+            "rate_limited": 0,
+            "seconds": 0.0,
+            "final_concurrency": max_concurrency,
+        }
+        # 429로 줄인 동시 실행 수를 다음 호출에도 이어서 사용합니다. (이벤트 루프 안에서 처음 만듭니다)
+        self._limiter = None
+        # 체크포인트는 처음 한 번만 읽고, 사용한 벡터는 꺼내서 버립니다. (배치마다 다시 읽지 않음)
+        self._resumable = None
+        # 배치마다 `embed`를 호출해도 같은 이벤트 루프를 사용해 공급자 클라이언트의 연결을 재사용합니다.
+        self._loop = None
+
+    async def _embed_batch(self, limiter: _AdaptiveLimiter, ids: List[str], texts: List[str], results: dict):
+        attempt = 0
+        while True:
+            async with limiter:
+                try:
+                    vectors = await self.embeddings.aembed_documents(texts)
+                    error = None
+                except Exception as exc:
+                    if not is_rate_limit_error(exc) or attempt >= self.max_retries:
+                        raise
+                    error = exc
+
+            if error is None:
+                await limiter.on_success()
+                break
+
+            attempt += 1
+            self.stats["rate_limited"] += 1
+            await limiter.on_rate_limit()
+            delay = _retry_after(error)
+            if delay is None:
+                delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+                delay *= random.uniform(0.5, 1.0)
+            await asyncio.sleep(delay)
+
+        if self.checkpoint is not None:
+            self.checkpoint.append(ids, vectors)
+        results.update(zip(ids, vectors))
+        self.stats["batches"] += 1
+        self.stats["embedded"] += len(ids)
+
+    async def aembed(self, ids: List[str], texts: List[str]) -> Dict[str, List[float]]:
+        """청크 ID와 텍스트를 받아 {청크 ID: 벡터}를 반환합니다."""
+        start = time.perf_counter()
+        if self._resumable is None:
+            self._resumable = self.checkpoint.load() if self.checkpoint is not None else {}
+        results = {cid: self._resumable.pop(cid) for cid in ids if cid in self._resumable}
+        self.stats["resumed"] += len(results)
+
+        pending = [(cid, text) for cid, text in zip(ids, texts) if cid not in results]
+        if self._limiter is None:
+            self._limiter = _AdaptiveLimiter(self.max_concurrency, self.max_concurrency)
+        limiter = self._limiter
+        tasks = []
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i:i + self.batch_size]
+            tasks.append(
+                asyncio.create_task(
+                    self._embed_batch(limiter, [cid for cid, _ in batch], [text for _, text in batch], results)
+                )
+            )
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        self.stats["seconds"] += time.perf_counter() - start
+        self.stats["final_concurrency"] = limiter.limit
+        return results
+
+    def embed(self, ids: List[str], texts: List[str]) -> Dict[str, List[float]]:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(self.aembed(ids, texts))
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+            self._loop = None
@@ -0,0 +1,117 @@
+# server/ingest/manifest.py
+
+"""
+증분 인제스트용 매니페스트.
+
+인덱스 디렉토리마다 `manifest.json`을 두고 파일별 내용 해시와 그 파일에서 만들어진
+청크 ID(청크 내용 해시) 목록을 기록합니다. 다음 인제스트에서는 이 정보를 비교해
+추가/변경된 청크만 임베딩하고, 삭제된 파일이나 바뀐 청크만 인덱스에서 제거합니다.
+(내용이 같은 파일은 분할하지 않습니다.)
+청크 분할 설정(`chunking`)과 임베딩 모델/차원(`embedding`)도 함께 기록해, 둘 중 하나라도 바뀌면
+기존 청크를 재사용하지 않고 전체를 다시 인제스트합니다.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import List
+
+from server.core.index_paths import MANIFEST_FILE
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(source: str, text: str) -> str:
+    """같은 파일 안에서 같은 내용의 청크는 같은 ID를 갖습니다."""
+    return content_hash(f"{source}\0{text}")
+
+
+def corpus_version(manifest: dict, model_name: str) -> str:
+    """
+    인덱스에 들어 있는 청크 집합과 임베딩 모델로 정한 코퍼스 버전.
+    내용이 같으면 다시 인제스트해도 같은 값이므로, 이 값을 키로 쓰는 검색 결과 캐시가 유지됩니다.
+    """
+    chunk_ids = sorted(cid for entry in manifest.get("files", {}).values() for cid in entry["chunks"])
+    return content_hash(model_name + "\0" + "\0".join(chunk_ids))[:16]
+
+
+def empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "files": {}}
+
+
+def load_manifest(index_path: str) -> dict:
+    """인덱스 디렉토리의 매니페스트를 읽습니다. 없으면 빈 매니페스트를 반환합니다."""
+    try:
+        with open(os.path.join(index_path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return empty_manifest()
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(index_path: str, manifest: dict):
+    manifest = dict(manifest, version=MANIFEST_VERSION, updated_at=datetime.now().isoformat())
+    tmp_path = os.path.join(index_path, f"{MANIFEST_FILE}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(index_path, MANIFEST_FILE))
+
+
+class IngestPlan:
+    """
+    이전 매니페스트와 현재 문서를 파일 단위로 비교한 결과.
+
+    파일을 하나씩 `add_unchanged` / `add_changed`로 넘기고, 모든 파일을 넘긴 뒤 `finish`를 호출하면
+    삭제된 파일이 계산됩니다. 청크 내용은 보관하지 않으므로 파일 수가 많아도 메모리 사용량은
+    (파일 경로 + 청크 ID) 크기로 유지됩니다.
+    """
+
+    def __init__(self, old_manifest: dict):
+        self.old_files = old_manifest.get("files", {})
+        self.new_manifest = empty_manifest()
+        self.changed_sources = []   # 추가되었거나 내용이 바뀐 파일
+        self.removed_sources = []   # 삭제된 파일
+        self.added_chunks = 0       # 새로 임베딩할 청크 수
+        self.updated_chunks = 0     # 바뀐 파일에 그대로 남아 메타데이터(위치)만 갱신할 청크 수
+        self.ids_to_delete = []     # 인덱스에서 제거할 청크 ID
+
+    def old_hash(self, source: str):
+        entry = self.old_files.get(source)
+        return entry.get("hash") if entry else None
+
+    def add_unchanged(self, source: str):
+        self.new_manifest["files"][source] = self.old_files[source]
+
+    def add_changed(self, source: str, file_hash: str, chunk_ids: List[str]) -> set:
+        """
+        내용이 바뀐(또는 새) 파일의 청크 ID 목록을 기록하고, 새로 임베딩해야 하는 청크 ID 집합을 반환합니다.
+        나머지 청크는 내용(ID)은 같지만 파일 안의 위치(start_index, chunk_index 등)가 바뀌었을 수 있으므로
+        호출하는 쪽에서 메타데이터를 갱신해야 합니다. 같은 파일 안에서 중복된 청크 ID는 미리 제거되어 있어야 합니다.
+        """
+        self.changed_sources.append(source)
+        old_entry = self.old_files.get(source)
+        old_ids = set(old_entry["chunks"]) if old_entry else set()
+        new_ids = set(chunk_ids) - old_ids
+        self.added_chunks += len(new_ids)
+        self.updated_chunks += len(chunk_ids) - len(new_ids)
+        self.ids_to_delete.extend(old_ids - set(chunk_ids))
+        self.new_manifest["files"][source] = {"hash": file_hash, "chunks": list(chunk_ids)}
+        return new_ids
+
+    def finish(self):
+        """현재 문서에 없는 이전 파일을 삭제 대상으로 기록합니다."""
+        for source, old_entry in self.old_files.items():
+            if source not in self.new_manifest["files"]:
+                self.removed_sources.append(source)
+                self.ids_to_delete.extend(old_entry["chunks"])
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added_chunks or self.ids_to_delete or self.removed_sources or self.changed_sources)
@@ -0,0 +1,160 @@
+# server/ingest/pipeline.py
+
+"""
+스트리밍 인제스트 파이프라인의 문서 로딩/분할 단계.
+
+`DirectoryLoader.load()`는 모든 파일을 메모리에 읽은 뒤에야 분할을 시작하므로, 파일이 수만 개가 되면
+메모리 사용량이 코퍼스 크기에 비례해 늘어납니다. 여기서는
+
+1. 디렉토리를 지연 탐색하며 파일 경로를 하나씩 내보내고 (`iter_source_files`)
+2. 파일 읽기 + 해시 + 청크 분할을 프로세스 풀에서 실행하되, 동시에 처리 중인 파일 수를 `window`개로
+   제한해 (`load_and_split_files`) 뒤 단계(임베딩/저장)가 느리면 앞 단계도 그만큼 기다립니다.
+3. 뒤 단계는 `batched`로 청크를 일정 개수씩 묶어 임베딩하고 바로 저장한 뒤 버립니다.
+
+따라서 한 번에 메모리에 올라가는 문서/청크/벡터는 (window개 파일 + 배치 하나) 정도로 유지됩니다.
+단계별 처리량은 `StageStats`로 집계합니다.
+"""
+
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from server.ingest.chunking import create_splitter
+from server.ingest.manifest import chunk_id, content_hash
+
+
+def iter_source_files(directory: str, suffix: str = ".txt") -> Iterator[str]:
+    """디렉토리를 정렬된 순서로 지연 탐색하며 `suffix`로 끝나는 파일 경로를 반환합니다."""
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except (FileNotFoundError, NotADirectoryError):
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_source_files(entry.path, suffix)
+        elif entry.is_file() and entry.name.endswith(suffix):
+            yield entry.path
+
+
+class FileResult:
+    """파일 하나를 읽고 분할한 결과. 내용이 바뀌지 않은 파일은 chunks가 None입니다."""
+
+    def __init__(self, source: str, file_hash: str, size: int, chunks: Optional[List[Tuple[str, str, dict]]], seconds: float):
+        self.source = source
+        self.file_hash = file_hash
+        self.size = size
+        self.chunks = chunks  # [(청크 ID, 텍스트, metadata), ...]
+        self.seconds = seconds
+
+
+# 워커 프로세스마다 분할기를 한 번만 만듭니다.
+_worker_splitters = {}
+
+
+def load_and_split(source: str, old_hash: Optional[str], splitter_config: dict) -> FileResult:
+    """파일을 읽어 해시를 계산하고, 이전 인덱스와 내용이 다르면 청크로 분할합니다. (워커 프로세스에서 실행)"""
+    start = time.perf_counter()
+    with open(source, encoding="utf-8") as f:
+        text = f.read()
+    file_hash = content_hash(text)
+    if file_hash == old_hash:
+        return FileResult(source, file_hash, len(text), None, time.perf_counter() - start)
+
+    key = tuple(sorted(splitter_config.items()))
+    splitter = _worker_splitters.get(key)
+    if splitter is None:
+        options = dict(splitter_config)
+        splitter = _worker_splitters[key] = create_splitter(options.pop("strategy"), **options)
+
+    chunks, seen = [], set()
+    for chunk in splitter.split_documents([Document(page_content=text, metadata={"source": source})]):
+        cid = chunk_id(source, chunk.page_content)
+        if cid in seen:
+            continue
+        seen.add(cid)
+        chunks.append((cid, chunk.page_content, chunk.metadata))
+    return FileResult(source, file_hash, len(text), chunks, time.perf_counter() - start)
+
+
+def load_and_split_files(
+    sources: Iterable[str],
+    old_hash: Callable[[str], Optional[str]],
+    splitter_config: dict,
+    workers: int = 4,
+    window: int = 0,
+) -> Iterator[FileResult]:
+    """
+    파일을 프로세스 풀에서 읽고 분할해 입력 순서대로 반환합니다.
+
+    Args:
+        sources: 파일 경로 이터레이터 (지연 평가).
+        old_hash: 파일 경로로 이전 인덱스의 파일 해시를 찾는 함수. 해시가 같으면 분할하지 않습니다.
+        splitter_config: `create_splitter`에 넘길 분할 설정 (`splitter.config()`).
+        workers: 워커 프로세스 수. 0이면 현재 프로세스에서 순서대로 처리합니다.
+        window: 동시에 처리 중일 수 있는 최대 파일 수. 0이면 workers * 4.
+    """
+    if workers <= 0:
+        for source in sources:
+            yield load_and_split(source, old_hash(source), splitter_config)
+        return
+
+    window = window or workers * 4
+    # 부모 프로세스는 Chroma/asyncio 스레드를 실행 중이므로 fork 대신 spawn으로 워커를 만듭니다.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        try:
+            for source in sources:
+                pending.append(pool.submit(load_and_split, source, old_hash(source), splitter_config))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StageStats:
+    """파이프라인 단계별 처리 개수와 소요 시간을 집계해 처리량을 보고합니다."""
+
+    def __init__(self):
+        self._stages = {}
+        self._started = time.perf_counter()
+
+    def add(self, stage: str, seconds: float, **counts):
+        entry = self._stages.setdefault(stage, {"seconds": 0.0})
+        entry["seconds"] += seconds
+        for name, value in counts.items():
+            entry[name] = entry.get(name, 0) + value
+
+    def get(self, stage: str) -> dict:
+        return dict(self._stages.get(stage, {"seconds": 0.0}))
+
+    def report(self) -> str:
+        lines = [f"[단계별 처리량] 전체 {time.perf_counter() - self._started:.1f}초"]
+        for stage, entry in self._stages.items():
+            seconds = entry["seconds"]
+            counts = ", ".join(
+                f"{name} {value:,}" + (f" ({value / seconds:,.0f}/s)" if seconds > 0 and value else "")
+                for name, value in entry.items()
+                if name != "seconds"
+            )
+            lines.append(f"  {stage:<12} {seconds:7.2f}초  {counts}")
+        return "\n".join(lines)
@@ -1,17 +1,48 @@
-from typing import Annotated
+from contextlib import asynccontextmanager
+from typing import Annotated, List, Optional
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from langchain_core.messages import AIMessage, HumanMessage
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from server.agent.logic import get_agent_graph, get_session_graph, prewarm_agent
+from server.agent.router import get_intent_router
+from server.agent.sessions import get_session_manager
+from server.agent.tool_executor import tool_latency_stats
+from server.core.admission import AdmissionRejected, AdmissionTicket, get_admission_controller
+from server.core.coalescing import create_request_coalescer
+from server.core.embedding_cache import get_cache_stats
+from server.core import providers
+from server.core.config import settings
+from server.core.executor import install_default_executor, run_sync
+from server.core.semantic_cache import create_semantic_cache
+from server.core.streaming import SSE_HEADERS, format_sse, stream_agent_events
+from server.core.tracing import new_request_id, render_metrics, request_trace, trace_config
+from server.core.vectorstore import vectorstore_provider
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 동기 도구/SDK 호출은 크기가 제한된 공용 스레드 풀에서 실행합니다.
+    install_default_executor()
+    # Vector DB는 서버 시작 시 한 번만 열고 모든 요청에서 공유합니다.
+    vectorstore_provider.open()
+    # 세션 체크포인터(SESSION_STORE=sqlite)는 이벤트 루프 안에서 만들어야 하므로 스레드로 넘기기 전에 생성합니다.
+    get_session_manager()
+    if settings.PREWARM_PROVIDERS:
+        # LLM/임베딩 클라이언트 생성과 그래프 컴파일을 첫 요청 전에 끝내 둡니다.
+        await run_sync(providers.prewarm)
+        await run_sync(prewarm_agent)
+    yield
 
-from server.agent.logic import app as agent_graph
 
 app = FastAPI(
     title="AI 업무 자동화 비서 API",
     description="LangGraph와 FastAPI를 이용한 AI 에이전트 API 서버입니다.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 origins = ["*"]
@@ -23,42 +54,198 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 유사 질문 답변 캐시 (SEMANTIC_CACHE_ENABLED=true일 때만 사용)
+semantic_cache = create_semantic_cache(providers.embeddings)
+# 동시에 들어온 같은 질문의 실행 공유 (REQUEST_COALESCING_ENABLED=true일 때만 사용)
+request_coalescer = create_request_coalescer()
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    스트림이 끝나거나 클라이언트가 연결을 끊으면(응답 태스크 취소 포함) 실행 슬롯을 반환하는 응답.
+    같은 질문 합치기로 슬롯을 실행 태스크에 넘긴 경우(`AdmissionTicket.transfer`)는 실행이 끝날 때 반환됩니다.
+    """
+
+    def __init__(self, ticket: AdmissionTicket, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticket = ticket
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.ticket.release()
+
+class ChatTurn(BaseModel):
+    question: str
+    answer: str
+
 class ChatRequest(BaseModel):
     message: str
+    # 같은 session_id로 보내면 서버에 저장된 이전 대화에 이어서 답변합니다. (없으면 단발성 질문)
+    session_id: Optional[str] = Field(default=None, pattern=r"^[A-Za-z0-9_-]{1,64}$")
+    # 서버에 아직(또는 만료되어) 세션이 없을 때 세션을 시작할 이전 대화. 세션이 있으면 무시합니다.
+    history: List[ChatTurn] = Field(default_factory=list, max_length=20)
 
 def get_messages(req: ChatRequest) -> dict:
     return {"messages": [HumanMessage(content=req.message)]}
 
+def get_session_id(req: ChatRequest) -> Optional[str]:
+    return req.session_id
+
+def get_history(req: ChatRequest) -> list:
+    messages = []
+    for turn in req.history:
+        messages += [HumanMessage(content=turn.question), AIMessage(content=turn.answer)]
+    return messages
+
+
+async def session_events(session_id: str, input_data: dict, config: dict, history: list = ()):
+    """세션 그래프로 이전 대화에 이어서 실행합니다. 같은 세션의 요청은 순서대로 처리됩니다."""
+    async with get_session_manager().session(session_id):
+        graph = get_session_graph()
+        config = dict(config, configurable={"thread_id": session_id})
+        if history and not (await graph.aget_state(config)).values.get("messages"):
+            # 새 세션: 클라이언트가 보낸 이전 대화로 시작합니다.
+            input_data = {"messages": list(history) + input_data["messages"]}
+        async for item in stream_agent_events(graph, input_data, config=config):
+            yield item
+
 
 @app.post("/chat/stream")
 async def stream(
     input_data: Annotated[dict, Depends(get_messages)],
+    session_id: Annotated[Optional[str], Depends(get_session_id)],
+    history: Annotated[list, Depends(get_history)],
 ):
-    """AI 로직의 중첩된 데이터 구조를 올바르게 처리하는 최종 API"""
-    stream = agent_graph.astream(input_data)
+    """에이전트 답변을 토큰 단위 SSE 이벤트(token/tool_start/tool_end/done)로 스트리밍하는 API"""
 
-    async def event_stream():
-        last_sent_content = ""
-        async for chunk in stream:
-            if "agent" in chunk:
-                # 'agent' 키 안에서 'messages'를 가져옴...
-                agent_output = chunk["agent"]
-                messages = agent_output.get("messages")
-                
-                if not messages:
-                    continue
+    request_id = new_request_id()
+    # 이전 대화와 무관한 질문은 같은 질문이 실행 중이면 그 결과 스트림을 함께 받습니다.
+    coalesce_key = None
+    if request_coalescer is not None and not session_id:
+        coalesce_key = request_coalescer.make_key(input_data["messages"][-1].content)
+    shared_events = request_coalescer.join(coalesce_key) if coalesce_key else None
 
-                last_message = messages[-1]
+    if shared_events is not None:
+        # 합류한 요청은 에이전트를 실행하지 않으므로 실행 슬롯이 필요 없습니다.
+        ticket = AdmissionTicket(None)
+    else:
+        # 동시에 실행 중인 에이전트가 많으면 슬롯이 빌 때까지 기다리고, 기다릴 수 없으면 429로 거절합니다.
+        try:
+            ticket = await get_admission_controller().acquire()
+        except AdmissionRejected as e:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": "서버가 요청을 처리하는 중입니다. 잠시 후 다시 시도해 주세요.", "reason": e.reason},
+                headers={"Retry-After": str(e.retry_after), "X-Request-ID": request_id},
+            )
 
-                if isinstance(last_message, AIMessage) and last_message.content:
-                    if last_message.content != last_sent_content:
-                        new_part = last_message.content[len(last_sent_content):]
-                        last_sent_content = last_message.content
-                        yield new_part
+    def agent_events(trace):
+        if session_id:
+            # 이전 대화에 따라 답이 달라지므로 세션 요청은 시맨틱 캐시를 사용하지 않습니다.
+            return session_events(session_id, input_data, trace_config(trace), history)
+        events = stream_agent_events(get_agent_graph(), input_data, config=trace_config(trace))
+        if semantic_cache is not None:
+            events = semantic_cache.wrap(input_data["messages"][-1].content, events)
+        return events
 
-    return StreamingResponse(event_stream(), media_type="text/plain")
+    async def event_stream():
+        # 노드/도구/임베딩/벡터 검색 구간이 이 요청의 트레이스에 기록됩니다.
+        with request_trace("chat_stream", request_id) as trace:
+            if shared_events is not None:
+                events = shared_events
+            elif coalesce_key:
+                # 실행 태스크는 이 요청의 트레이스 컨텍스트에서 시작되므로 구간 기록은 이 요청에 남습니다.
+                # 실행 슬롯은 이 요청이 아니라 실행 태스크가 가지고, 실행이 끝날 때 반환합니다.
+                # (이 요청이 먼저 연결을 끊어도 다른 요청을 위해 계속되는 실행이 슬롯 없이 돌지 않도록)
+                events = request_coalescer.stream(
+                    coalesce_key, lambda: agent_events(trace), on_finish=ticket.transfer().release
+                )
+            else:
+                events = agent_events(trace)
+            try:
+                async for event, data in events:
+                    if event == "token":
+                        trace.mark_first_token()
+                    yield format_sse(event, data)
+            except Exception as e:
+                trace.mark_error()
+                yield format_sse("error", {"message": str(e)})
+            yield format_sse("done", {})
+
+    headers = dict(SSE_HEADERS, **{"X-Request-ID": request_id})
+    return AdmittedStreamingResponse(ticket, event_stream(), media_type="text/event-stream", headers=headers)
 
 
 @app.get("/")
 async def read_root():
-    return {"message": "AI Agent Server is running."}
\ No newline at end of file
+    return {"message": "AI Agent Server is running."}
+
+
+@app.get("/stats/vectorstore")
+async def vectorstore_stats():
+    """Vector DB 열기/검색 소요 시간 카운터"""
+    return vectorstore_provider.get_stats()
+
+
+@app.get("/stats/embeddings")
+async def embedding_cache_stats():
+    """임베딩 캐시 적중률 통계"""
+    return get_cache_stats()
+
+
+@app.get("/stats/semantic-cache")
+async def semantic_cache_stats():
+    """시맨틱 응답 캐시 적중률 통계"""
+    if semantic_cache is None:
+        return {"enabled": False}
+    return dict(semantic_cache.get_stats(), enabled=True)
+
+
+@app.get("/stats/coalescing")
+async def coalescing_stats():
+    """같은 질문 실행 공유 통계 (새로 실행한 수, 합류한 요청 수)"""
+    if request_coalescer is None:
+        return {"enabled": False}
+    return dict(request_coalescer.get_stats(), enabled=True)
+
+
+@app.get("/stats/llm")
+async def llm_stats():
+    """LLM 공급자 라우팅 통계 (공급자별 호출 결과/회로 상태/첫 토큰 지연, 헤지 요청 수)"""
+    model = providers.get_chat_model()
+    if not hasattr(model, "get_stats"):
+        return {"routing": False, "provider": settings.LLM_PROVIDER}
+    return dict(model.get_stats(), routing=True)
+
+
+@app.get("/stats/admission")
+async def admission_stats():
+    """이 워커 프로세스의 입장 제어 통계 (실행 중/대기 중 요청 수, 거절 수)"""
+    return get_admission_controller().get_stats()
+
+
+@app.get("/stats/router")
+async def router_stats():
+    """의도 라우터 결정 통계 (LLM 도구 선택을 건너뛴 비율)"""
+    if not settings.INTENT_ROUTER_ENABLED:
+        return {"enabled": False}
+    return dict(get_intent_router().get_stats(), enabled=True)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """구간별 소요 시간 히스토그램 (Prometheus 텍스트 형식)"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/stats/sessions")
+async def session_stats():
+    """대화 세션 수/만료/삭제 통계"""
+    return get_session_manager().get_stats()
+
+
+@app.get("/stats/tools")
+async def tool_stats():
+    """도구별 소요 시간 통계 (누적 소요 시간이 큰 순서)"""
+    return tool_latency_stats.snapshot()
\ No newline at end of file
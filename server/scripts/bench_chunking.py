@@ -0,0 +1,86 @@
+# server/scripts/bench_chunking.py
+
+"""
+청크 분할 전략 비교 리포트 (오프라인)
+
+전략마다 `docs/` 문서로 임시 인덱스를 만들고 다음 값을 비교합니다.
+- 청크 수 / 인덱싱한 총 토큰 수 (겹침으로 인한 중복 포함) / 인덱스 디스크 크기
+- 검색 품질: 정답 문서가 정해진 질문 세트(bench_retrieval.QUERIES)의 recall@k (서버와 같은 검색 경로)
+- 답변당 프롬프트 토큰: search_knowledge_base가 LLM에 넘기는 상위 k개 청크의 토큰 수 평균
+
+    python -m server.scripts.bench_chunking --k 3
+    python -m server.scripts.bench_chunking --live   # 실제 임베딩 사용 (네트워크 필요)
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+
+# 서버 모듈을 임포트할 때 필요한 키가 없어도 되도록 오프라인용 더미 키를 지정합니다.
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from server.agent.context_budget import count_tokens  # noqa: E402
+from server.core.vectorstore import VectorStoreProvider  # noqa: E402
+from server.ingest.chunking import SPLITTERS  # noqa: E402
+from server.scripts.bench_retrieval import QUERIES  # noqa: E402
+from server.scripts.ingest_data import ingest_documents  # noqa: E402
+
+
+def _directory_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def evaluate(strategy: str, embedding_function, k: int) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        ingest_documents(full=True, embedding_function=embedding_function, root=root, chunk_strategy=strategy)
+        provider = VectorStoreProvider(root, embedding_function, reload_interval=3600)
+        provider.open()
+        everything = provider.get_vectorstore()._collection.get(include=["documents"])
+        chunk_tokens = [count_tokens(text) for text in everything["documents"]]
+
+        hits, prompt_tokens = 0, []
+        for query, expected in QUERIES:
+            docs = provider.search(query, k=k)
+            if expected in [os.path.basename(doc.metadata.get("source", "")) for doc in docs]:
+                hits += 1
+            prompt_tokens.append(count_tokens("\n\n".join(doc.page_content for doc in docs)))
+
+        return {
+            "chunks": len(chunk_tokens),
+            "avg_chunk_tokens": statistics.mean(chunk_tokens) if chunk_tokens else 0,
+            "indexed_tokens": sum(chunk_tokens),
+            "index_kb": _directory_size(provider.persist_directory) / 1024,
+            "recall": hits / len(QUERIES),
+            "prompt_tokens": statistics.mean(prompt_tokens),
+        }
+
+
+def main(k: int, live: bool, strategies):
+    if live:
+        from server.core.providers import get_embeddings
+
+        embedding_function = get_embeddings()
+    else:
+        from server.core.fake_llm import FakeEmbeddings
+
+        embedding_function = FakeEmbeddings()
+
+    results = {strategy: evaluate(strategy, embedding_function, k) for strategy in strategies}
+
+    print(f"\n질문 {len(QUERIES)}개, k={k}, 임베딩: {'실제' if live else 'FakeEmbeddings (Dense 순위는 의미 없음, BM25가 결정)'}")
+    print(f"{'전략':<10} {'청크':>5} {'평균 토큰':>9} {'인덱싱 토큰':>11} {'인덱스 KB':>10} {'recall@' + str(k):>9} {'답변당 프롬프트 토큰':>20}")
+    for strategy, r in results.items():
+        print(
+            f"{strategy:<10} {r['chunks']:>5} {r['avg_chunk_tokens']:>9.0f} {r['indexed_tokens']:>11} "
+            f"{r['index_kb']:>10.0f} {r['recall']:>9.2f} {r['prompt_tokens']:>20.0f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="청크 분할 전략별 인덱스 크기 / 검색 품질 / 프롬프트 토큰 비교")
+    parser.add_argument("--k", type=int, default=3, help="검색할 청크 수 (search_knowledge_base와 같은 값)")
+    parser.add_argument("--live", action="store_true", help="FakeEmbeddings 대신 실제 임베딩 사용 (네트워크 필요)")
+    parser.add_argument("--strategies", nargs="+", default=list(SPLITTERS), choices=list(SPLITTERS))
+    args = parser.parse_args()
+    main(args.k, args.live, args.strategies)
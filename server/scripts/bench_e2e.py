@@ -0,0 +1,230 @@
+# server/scripts/bench_e2e.py
+
+"""
+서빙 경로 전체(end-to-end) 오프라인 벤치마크
+
+`FAKE_LLM=true`로 Google LLM/임베딩을 지연 시간이 주입된 가짜 모델로 바꾸고, 임시 Vector DB를 만든 뒤
+실제 `agent_graph`와 `/chat/stream`(FastAPI 앱을 프로세스 안에서 ASGI로 직접 호출)을 여러 가상 사용자가
+동시에 호출합니다. 지연 시간 p50/p95/p99, 첫 바이트까지의 시간(TTFB), 처리량, 메모리를 보고합니다.
+
+    python -m server.scripts.bench_e2e --users 50 --requests 500 --mode both
+    python -m server.scripts.bench_e2e --llm-latency 0.8 --token-latency 0.01 --embed-latency 0.1
+    python -m server.scripts.bench_e2e --coalescing --intent-router   # 같은 질문 합치기/의도 라우터 포함
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+QUESTIONS = [
+    "오늘 오후 3시에 어떤 일정이 있어?",
+    "7월10일 진행한 'AI 도입 TF' 회의록 요약해줘.",
+    "프로젝트 A 보고서 초안으로 발표자료 목차 만들어줘.",
+    "RAG 검색 속도 저하 이슈 담당자는 누구야?",
+    "보험 산업에서 AI 비서 활용 사례 알려줘",
+    "Microsoft Copilot 문서 업무 자동화 내용 정리해줘",
+]
+
+
+def _configure_environment(args, workdir: str):
+    """서버 모듈을 임포트하기 전에 가짜 백엔드와 임시 경로를 설정합니다."""
+    os.environ["FAKE_LLM"] = "true"
+    os.environ["FAKE_LLM_LATENCY"] = str(args.llm_latency)
+    os.environ["FAKE_LLM_TOKEN_LATENCY"] = str(args.token_latency)
+    os.environ["FAKE_EMBEDDING_LATENCY"] = str(args.embed_latency)
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false" if args.no_embedding_cache else "true"
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(workdir, "embeddings.sqlite3")
+    # 이후에 추가된 기능(같은 질문 합치기, 의도 라우터)은 기본으로 끄고 측정해 이전 결과와 비교할 수 있게 합니다.
+    os.environ["REQUEST_COALESCING_ENABLED"] = "true" if args.coalescing else "false"
+    os.environ["INTENT_ROUTER_ENABLED"] = "true" if args.intent_router else "false"
+
+    from server.core.config import settings
+
+    settings.CHROMA_PATH = os.path.join(workdir, "db")
+
+
+def _rss_mb():
+    """현재 프로세스의 RSS(MB). /proc가 없는 환경에서는 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+# --- 요청 실행기 ---
+async def _graph_request(question: str):
+    """agent_graph를 직접 스트리밍 실행하고 (첫 토큰 시간, 전체 시간)을 반환합니다."""
+    from langchain_core.messages import HumanMessage
+
+    from server.agent.logic import get_agent_graph
+    from server.core.streaming import stream_agent_events
+
+    start = time.perf_counter()
+    first = None
+    async for event, _ in stream_agent_events(get_agent_graph(), {"messages": [HumanMessage(content=question)]}):
+        if event == "token" and first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def _http_request(question: str):
+    """FastAPI 앱에 ASGI로 POST /chat/stream 요청을 보내고 (첫 바이트 시간, 전체 시간)을 반환합니다."""
+    from server.main import app
+
+    body = json.dumps({"message": question}).encode("utf-8")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/chat/stream",
+        "raw_path": b"/chat/stream",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+    }
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # 클라이언트는 끊지 않고 응답을 끝까지 기다립니다.
+        await asyncio.Event().wait()
+
+    start = time.perf_counter()
+    first = None
+    status = None
+
+    async def send(message):
+        nonlocal first, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body") and first is None:
+            first = time.perf_counter() - start
+
+    await app(scope, receive, send)
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}")
+    return first, time.perf_counter() - start
+
+
+async def _run_load(request_fn, users: int, total_requests: int) -> dict:
+    counter = iter(range(total_requests))
+    ttfbs, latencies, errors = [], [], 0
+
+    async def user():
+        nonlocal errors
+        for i in counter:
+            try:
+                first, total = await request_fn(QUESTIONS[i % len(QUESTIONS)])
+            except Exception as e:
+                errors += 1
+                print(f"요청 실패: {e!r}")
+                continue
+            latencies.append(total)
+            if first is not None:
+                ttfbs.append(first)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    wall = time.perf_counter() - start
+    return {"wall": wall, "ttfbs": ttfbs, "latencies": latencies, "errors": errors}
+
+
+def _report(name: str, result: dict, users: int):
+    latencies, ttfbs = result["latencies"], result["ttfbs"]
+    print(f"\n[{name}] 동시 사용자 {users}명, 완료 {len(latencies)}건, 실패 {result['errors']}건, {result['wall']:.2f}초")
+    if not latencies:
+        return
+    print(
+        "  지연 시간  p50 {:.0f}ms / p95 {:.0f}ms / p99 {:.0f}ms / 평균 {:.0f}ms".format(
+            *(_percentile(latencies, p) * 1000 for p in (50, 95, 99)), statistics.mean(latencies) * 1000
+        )
+    )
+    if ttfbs:
+        print(
+            "  TTFB       p50 {:.0f}ms / p95 {:.0f}ms / p99 {:.0f}ms".format(
+                *(_percentile(ttfbs, p) * 1000 for p in (50, 95, 99))
+            )
+        )
+    print(f"  처리량     {len(latencies) / result['wall']:.1f} req/s")
+
+
+async def _main(args):
+    from server.core.executor import install_default_executor
+    from server.main import app
+
+    rss_before = _rss_mb()
+    async with app.router.lifespan_context(app):
+        install_default_executor()
+        modes = ("graph", "http") if args.mode == "both" else (args.mode,)
+        for mode in modes:
+            request_fn = _graph_request if mode == "graph" else _http_request
+            # 첫 요청의 초기화 비용(임포트, DB 열기 등)은 측정에서 제외합니다.
+            await request_fn(QUESTIONS[0])
+            result = await _run_load(request_fn, args.users, args.requests)
+            _report("agent_graph 직접 실행" if mode == "graph" else "POST /chat/stream", result, args.users)
+
+    rss_after, peak = _rss_mb(), _peak_rss_mb()
+    print("\n[메모리]")
+    if rss_before is not None and rss_after is not None:
+        print(f"  RSS {rss_before:.1f}MB → {rss_after:.1f}MB (+{rss_after - rss_before:.1f}MB)")
+    if peak is not None:
+        print(f"  최대 RSS {peak:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 LLM/임베딩으로 서빙 경로 전체를 부하 테스트합니다.")
+    parser.add_argument("--users", type=int, default=20, help="동시 가상 사용자 수")
+    parser.add_argument("--requests", type=int, default=200, help="모드별 전체 요청 수")
+    parser.add_argument("--mode", choices=["graph", "http", "both"], default="both")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="가짜 LLM 첫 토큰 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="가짜 LLM 토큰당 지연(초)")
+    parser.add_argument("--embed-latency", type=float, default=0.05, help="가짜 임베딩 호출당 지연(초)")
+    parser.add_argument("--no-embedding-cache", action="store_true", help="임베딩 캐시 없이 측정")
+    parser.add_argument("--coalescing", action="store_true", help="같은 질문 합치기(REQUEST_COALESCING_ENABLED)를 켜고 측정")
+    parser.add_argument("--intent-router", action="store_true", help="의도 라우터(INTENT_ROUTER_ENABLED)를 켜고 측정")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure_environment(args, workdir)
+
+        from server.scripts.ingest_data import ingest_documents
+
+        print("임시 Vector DB를 생성합니다...")
+        ingest_documents(full=True)
+        asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# server/scripts/bench_ingest.py
+
+"""
+인제스트 파이프라인 규모 테스트 (오프라인)
+
+`docs/` 문서를 복제해 파일 수가 다른 가짜 코퍼스를 만들고, 코퍼스마다 별도 프로세스에서
+가짜 임베딩으로 전체 인제스트를 실행해 소요 시간과 최대 메모리(RSS)를 비교합니다.
+스트리밍 파이프라인에서는 파일 수가 늘어도 파이프라인이 들고 있는 Python 힙(tracemalloc 최대값)은
+거의 일정해야 합니다. 최대 RSS에는 Chroma의 HNSW 인덱스(메모리 상주, 청크 수에 비례)가 포함됩니다.
+(워커 프로세스의 메모리는 포함하지 않습니다. 워커 하나는 파일 몇 개만 처리하므로 일정합니다.)
+
+    python -m server.scripts.bench_ingest --files 200 2000 10000 --workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def build_corpus(directory: str, files: int, per_dir: int = 500):
+    """docs/*.txt를 돌려 가며 복제하고, 파일마다 내용이 달라지도록 번호 줄을 붙입니다."""
+    templates = []
+    for name in sorted(os.listdir("docs")):
+        if name.endswith(".txt"):
+            with open(os.path.join("docs", name), encoding="utf-8") as f:
+                templates.append(f.read())
+    for i in range(files):
+        subdir = os.path.join(directory, f"part-{i // per_dir:04d}")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"doc-{i:06d}.txt"), "w", encoding="utf-8") as f:
+            f.write(templates[i % len(templates)] + f"\n\n문서 번호 {i}\n")
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(files: int, workers: int):
+    """하나의 코퍼스를 인제스트하고 결과를 JSON 한 줄로 출력합니다. (부모 프로세스가 실행)"""
+    os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+    os.environ["EMBEDDING_CACHE_ENABLED"] = "false"
+
+    from server.core.fake_llm import FakeEmbeddings
+    from server.scripts.ingest_data import ingest_documents
+
+    with tempfile.TemporaryDirectory() as workdir:
+        docs_dir = os.path.join(workdir, "docs")
+        build_corpus(docs_dir, files)
+        tracemalloc.start()
+        start = time.perf_counter()
+        ingest_documents(
+            full=True,
+            embedding_function=FakeEmbeddings(),
+            root=os.path.join(workdir, "db"),
+            docs_dir=docs_dir,
+            workers=workers,
+        )
+        seconds = time.perf_counter() - start
+        heap_peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    print(json.dumps({"files": files, "seconds": seconds, "peak_heap_mb": heap_peak, "peak_rss_mb": _peak_rss_mb()}))
+
+
+def main(sizes, workers: int):
+    rows = []
+    for files in sizes:
+        print(f"\n=== 파일 {files:,}개 인제스트 ===", flush=True)
+        proc = subprocess.run(
+            [sys.executable, "-m", "server.scripts.bench_ingest", "--child", str(files), "--workers", str(workers)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        lines = proc.stdout.strip().splitlines()
+        print("\n".join(line for line in lines[:-1] if line.startswith(("[", "  "))))
+        if proc.returncode != 0 or not lines:
+            print(f"실패 (종료 코드 {proc.returncode})")
+            continue
+        rows.append(json.loads(lines[-1]))
+
+    print(f"\n워커 {workers}개")
+    print(f"{'파일 수':>10} {'소요 시간':>10} {'파일/초':>10} {'Python 힙 최대':>14} {'최대 RSS':>12}")
+    for row in rows:
+        peak = f"{row['peak_rss_mb']:.1f}MB" if row["peak_rss_mb"] is not None else "-"
+        print(
+            f"{row['files']:>10,} {row['seconds']:>9.1f}s {row['files'] / row['seconds']:>10.0f} "
+            f"{row['peak_heap_mb']:>12.1f}MB {peak:>12}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="코퍼스 크기별 인제스트 소요 시간 / 최대 메모리 비교")
+    parser.add_argument("--files", type=int, nargs="+", default=[200, 2000], help="코퍼스 파일 수 목록")
+    parser.add_argument("--workers", type=int, default=2, help="문서 로딩/분할 워커 프로세스 수")
+    parser.add_argument("--child", type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child is not None:
+        run_child(args.child, args.workers)
+    else:
+        main(args.files, args.workers)
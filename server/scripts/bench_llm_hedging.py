@@ -0,0 +1,130 @@
+# server/scripts/bench_llm_hedging.py
+
+"""
+LLM 공급자 대체 / 헤지 요청 / 회로 차단기의 꼬리 지연 비교 벤치마크 (오프라인)
+
+지연과 실패를 주입한 가짜 공급자 두 개(primary, backup)로 같은 요청을 다음 방식으로 보냅니다.
+- primary only : 현재 구성. 공급자 하나만 사용 (느린 응답/실패가 그대로 사용자에게 전달)
+- fallback     : 첫 토큰 전 실패 시 backup으로 대체, 헤지 없음
+- hedged       : 대체 + 첫 토큰이 p{percentile}보다 늦으면 backup에 같은 요청을 하나 더 보냄
+
+이어서 primary가 일정 시간 모두 실패하는 장애 구간을 재현해, 회로 차단기가 열린 동안 primary 호출을
+건너뛰어 (실패 후 대체하는) 지연이 줄어드는지 확인합니다.
+
+    python -m server.scripts.bench_llm_hedging --requests 400 --slow-rate 0.05 --failure-rate 0.02
+"""
+
+import argparse
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from server.core.fake_llm import FakeChatModel
+from server.core.llm_routing import RoutingChatModel
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def make_provider(latency: float, slow_rate: float, slow_latency: float, failure_rate: float, seed: int) -> FakeChatModel:
+    return FakeChatModel(
+        tool_name=None,
+        latency=latency,
+        token_latency=0.002,
+        slow_rate=slow_rate,
+        slow_latency=slow_latency,
+        failure_rate=failure_rate,
+        seed=seed,
+    )
+
+
+async def run_load(model, requests: int, concurrency: int):
+    """동시 요청 `concurrency`개로 `requests`번 호출하고 (요청별 지연 목록, 실패 수)를 반환합니다."""
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await model.ainvoke([HumanMessage(content=f"질문 {i}")])
+            except Exception:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors
+
+
+def _calls(model) -> int:
+    if isinstance(model, RoutingChatModel):
+        return sum(p["calls"] for p in model.get_stats()["providers"].values())
+    return 0
+
+
+def _print_row(name: str, latencies, errors: int, requests: int, model):
+    stats = model.get_stats() if isinstance(model, RoutingChatModel) else {}
+    calls = _calls(model) or requests
+    print(
+        f"{name:<14} {_percentile(latencies, 50) * 1000:>8.0f}ms {_percentile(latencies, 95) * 1000:>8.0f}ms "
+        f"{_percentile(latencies, 99) * 1000:>8.0f}ms {errors / requests:>7.1%} {stats.get('hedge_ratio', 0):>7.1%} "
+        f"{calls / requests - 1:>+8.1%}"
+    )
+
+
+async def main(args):
+    def primary(failure_rate=args.failure_rate, seed=0):
+        return make_provider(args.latency, args.slow_rate, args.slow_latency, failure_rate, seed)
+
+    def backup():
+        return make_provider(args.latency * 1.2, args.slow_rate, args.slow_latency, 0.0, seed=1)
+
+    def routed(hedge: bool, primary_model=None, breaker_min_calls: int = 5):
+        return RoutingChatModel(
+            providers=[("primary", primary_model or primary()), ("backup", backup())],
+            hedge=hedge,
+            hedge_percentile=args.percentile,
+            hedge_initial_delay=args.latency * 4,
+            hedge_max_ratio=args.max_ratio,
+            breaker_min_calls=breaker_min_calls,
+            breaker_cooldown=args.cooldown,
+        )
+
+    print(
+        f"요청 {args.requests}개 (동시 {args.concurrency}), 첫 토큰 {args.latency * 1000:.0f}ms, "
+        f"느린 응답 {args.slow_rate:.0%} ({args.slow_latency:.1f}s), primary 실패 {args.failure_rate:.0%}"
+    )
+    print(f"\n{'방식':<14} {'p50':>10} {'p95':>10} {'p99':>10} {'오류율':>7} {'헤지율':>7} {'추가 호출':>8}")
+    for name, model in (("primary only", primary()), ("fallback", routed(False)), ("hedged", routed(True))):
+        latencies, errors = await run_load(model, args.requests, args.concurrency)
+        _print_row(name, latencies, errors, args.requests, model)
+
+    # 장애 구간: primary가 모든 호출에 실패 (실패 응답까지 latency만큼 걸림)
+    print(f"\n장애 구간: primary 실패 100%, 회로 차단기 cooldown {args.cooldown:.0f}s")
+    print(f"{'방식':<14} {'p50':>10} {'p95':>10} {'p99':>10} {'오류율':>7} {'헤지율':>7} {'추가 호출':>8}")
+    # 회로 차단기 없음: 최소 호출 수를 요청 수보다 크게 두어 회로가 열리지 않게 합니다.
+    for name, min_calls in (("no breaker", args.requests + 1), ("breaker", 5)):
+        model = routed(True, primary(failure_rate=1.0), breaker_min_calls=min_calls)
+        latencies, errors = await run_load(model, args.requests, args.concurrency)
+        _print_row(name, latencies, errors, args.requests, model)
+        stats = model.get_stats()["providers"]["primary"]
+        print(f"{'':<14} primary 호출 {stats['calls']}회, 건너뜀 {stats['rejected']}회, 회로 {stats['breaker']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 공급자 대체/헤지/회로 차단기 꼬리 지연 비교")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.1, help="평소 첫 토큰 지연(초)")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="첫 토큰이 느려지는 호출 비율")
+    parser.add_argument("--slow-latency", type=float, default=2.0, help="느린 호출의 첫 토큰 지연(초)")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="primary 호출이 실패할 확률")
+    parser.add_argument("--percentile", type=float, default=95, help="헤지 기준 첫 토큰 지연 백분위수")
+    parser.add_argument("--max-ratio", type=float, default=0.1, help="헤지 요청의 최대 비율")
+    parser.add_argument("--cooldown", type=float, default=30, help="회로가 열린 뒤 다시 시도하기까지의 시간(초)")
+    asyncio.run(main(parser.parse_args()))
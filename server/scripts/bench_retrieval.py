@@ -0,0 +1,101 @@
+# server/scripts/bench_retrieval.py
+
+"""
+검색 방식별 recall@k / 지연 시간 벤치마크 (오프라인)
+
+`docs/` 문서로 임시 Vector DB + BM25 인덱스를 만든 뒤, 정답 문서가 정해진 질문 세트로
+Dense / BM25 / Hybrid(RRF) 검색을 비교합니다. 기본은 네트워크 없이 FakeEmbeddings를 쓰며,
+`--live`를 주면 서버와 같은 실제 임베딩을 사용합니다.
+
+    python -m server.scripts.bench_retrieval --k 1 3
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+# 서버 모듈을 임포트할 때 Google 클라이언트가 생성되므로 오프라인용 더미 키를 지정합니다.
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from server.core.hybrid_search import dense_search, hybrid_search  # noqa: E402
+from server.core.lexical_index import LexicalIndex  # noqa: E402
+from server.core.vectorstore import VectorStoreProvider  # noqa: E402
+from server.scripts.ingest_data import ingest_documents  # noqa: E402
+
+# (질문, 정답 문서 파일명)
+QUERIES = [
+    ("7월10일 진행한 회의록 요약해줘", "회의록_20250710.txt"),
+    ("7월 10일 회의 참석자는 누구야?", "회의록_20250710.txt"),
+    ("RAG 검색 속도 저하 이슈 담당자", "회의록_20250710.txt"),
+    ("이메일 자동 답장 초안 기능은 언제 추가돼?", "회의록_20250710.txt"),
+    ("프로젝트 A 보고서 내용 알려줘", "project_report_A.txt"),
+    ("LangGraph 멀티 에이전트 시스템 구축 성과", "project_report_A.txt"),
+    ("프로젝트 A의 향후 과제는?", "project_report_A.txt"),
+    ("보험 산업에서 AI 비서 활용 사례", "ai_assist.txt"),
+    ("Microsoft Copilot 문서 업무 자동화", "ai_assist.txt"),
+    ("JP모건, Roche, BASF의 AI 비서 도입", "ai_assist.txt"),
+]
+
+
+def _source_name(metadata) -> str:
+    return os.path.basename((metadata or {}).get("source", ""))
+
+
+def _evaluate(name: str, search_fn, to_sources, ks):
+    """search_fn의 지연 시간만 측정하고, to_sources로 결과를 문서 파일명 리스트로 바꿔 채점합니다."""
+    max_k = max(ks)
+    hits = {k: 0 for k in ks}
+    latencies = []
+    for query, expected in QUERIES:
+        start = time.perf_counter()
+        results = search_fn(query, max_k)
+        latencies.append(time.perf_counter() - start)
+        sources = to_sources(results)
+        for k in ks:
+            if expected in sources[:k]:
+                hits[k] += 1
+    recalls = ", ".join(f"recall@{k} {hits[k] / len(QUERIES):.2f}" for k in ks)
+    print(f"[{name:<6}] {recalls}, 평균 지연 {statistics.mean(latencies) * 1000:.2f}ms")
+
+
+def main(ks, live: bool):
+    if live:
+        from server.core.providers import get_embeddings
+
+        embedding_function = get_embeddings()
+    else:
+        from server.core.fake_llm import FakeEmbeddings
+
+        embedding_function = FakeEmbeddings()
+
+    with tempfile.TemporaryDirectory() as root:
+        ingest_documents(full=True, embedding_function=embedding_function, root=root)
+        provider = VectorStoreProvider(root, embedding_function, reload_interval=3600)
+        vectorstore = provider.open()
+        lexical_index = LexicalIndex.open(provider.persist_directory)
+
+        everything = vectorstore._collection.get(include=["metadatas"])
+        source_by_id = {
+            doc_id: _source_name(metadata) for doc_id, metadata in zip(everything["ids"], everything["metadatas"])
+        }
+        docs_to_sources = lambda docs: [_source_name(doc.metadata) for doc in docs]  # noqa: E731
+
+        print(f"\n청크 {len(source_by_id)}개, 질문 {len(QUERIES)}개, 임베딩: {'실제' if live else 'FakeEmbeddings (의미 없는 벡터)'}")
+        _evaluate("dense", lambda q, k: list(dense_search(vectorstore, q, k).values()), docs_to_sources, ks)
+        _evaluate(
+            "bm25",
+            lambda q, k: lexical_index.search(q, k),
+            lambda results: [source_by_id[doc_id] for doc_id, _ in results],
+            ks,
+        )
+        _evaluate("hybrid", lambda q, k: hybrid_search(vectorstore, lexical_index, q, k=k), docs_to_sources, ks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="검색 방식별 recall@k / 지연 시간 벤치마크")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3], help="recall@k를 계산할 k 값들")
+    parser.add_argument("--live", action="store_true", help="FakeEmbeddings 대신 실제 임베딩 사용 (네트워크 필요)")
+    args = parser.parse_args()
+    main(args.k, args.live)
@@ -0,0 +1,146 @@
+# server/scripts/bench_router.py
+
+"""
+의도 라우터 정확도 / 지연 시간 벤치마크
+
+정답 도구가 정해진 질문 세트로 라우터를 실행해 다음을 보고합니다.
+- 라우팅 비율: LLM 도구 선택 없이 바로 도구를 실행한 질문의 비율
+- 정확도: 바로 실행한 질문 중 정답 도구를 고른 비율 (잘못 보낸 질문 목록 포함)
+- LLM으로 넘긴 이유별 개수
+- 라우터 판단 지연 시간 (p50 / p95 / 최대)
+
+기본은 네트워크 없이 키워드 + FakeEmbeddings(유사도가 의미 없으므로 사실상 키워드만)로 실행합니다.
+`--live`를 주면 실제 임베딩으로 라우터를 실행하고, 같은 질문에 대해 LLM이 도구를 고르는 첫 호출의
+정확도와 지연 시간도 함께 측정해 라우터가 줄이는 왕복 시간을 비교합니다.
+
+    python -m server.scripts.bench_router
+    python -m server.scripts.bench_router --live
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from collections import Counter
+
+# 서버 모듈을 임포트할 때 필요한 키가 없어도 되도록 오프라인용 더미 키를 지정합니다.
+os.environ.setdefault("GOOGLE_API_KEY", "offline-benchmark")
+
+from server.agent.router import IntentRouter  # noqa: E402
+from server.core.config import settings  # noqa: E402
+
+# (질문, 정답 도구). None은 도구 없이 LLM이 답해야 하거나, LLM이 인자를 정해야 하는 질문
+CASES = [
+    ("오늘 오후 3시에 어떤 일정이 있어?", "get_schedule"),
+    ("오늘 일정 알려줘", "get_schedule"),
+    ("오늘 미팅 몇 개야?", "get_schedule"),
+    ("캘린더 확인해줘", "get_schedule"),
+    ("오늘 스케줄 정리해줘", "get_schedule"),
+    ("오늘 회의 몇 시에 있어?", "get_schedule"),
+    ("내일 일정 알려줘", None),
+    ("다음 주 월요일 미팅 있어?", None),
+    ("오늘 받은 메일 요약해줘", "get_email_summary"),
+    ("새 이메일 온 거 있어?", "get_email_summary"),
+    ("메일함에 중요한 거 있어?", "get_email_summary"),
+    ("받은편지함 정리해줘", "get_email_summary"),
+    ("7월10일 진행한 'AI 도입 TF' 회의록 요약해줘.", "search_knowledge_base"),
+    ("프로젝트 A 보고서 초안으로 발표자료 목차 만들어줘.", "search_knowledge_base"),
+    ("보험 산업에서 AI 비서 활용 사례 알려줘", "search_knowledge_base"),
+    ("Microsoft Copilot 문서 업무 자동화 내용 정리해줘", "search_knowledge_base"),
+    ("AI 비서 관련 자료 찾아줘", "search_knowledge_base"),
+    ("RAG 검색 속도 저하 이슈 담당자는 누구야?", "search_knowledge_base"),
+    ("지난 회의에서 결정된 사항이 뭐였어?", "search_knowledge_base"),
+    ("프로젝트 A의 향후 과제는?", "search_knowledge_base"),
+    ("JP모건은 AI 비서를 어떻게 쓰고 있어?", "search_knowledge_base"),
+    ("안녕하세요", None),
+    ("고마워, 도움이 됐어", None),
+    ("우주에 사는 돌고래에 대해 알려줘.", None),
+    ("파이썬 리스트 정렬하는 법 알려줘", None),
+    ("이 문장 영어로 번역해줘: 좋은 아침입니다", None),
+    ("파이썬 자료구조 설명해줘", None),
+    ("이 문서를 영어로 번역해줘", None),
+    ("오늘 일정이랑 새 메일 둘 다 알려줘", None),
+]
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+async def bench_router(router: IntentRouter):
+    router.prepare()
+    latencies, misroutes, reasons = [], [], Counter()
+    routed = correct = 0
+    for question, expected in CASES:
+        start = time.perf_counter()
+        decision = await router.aroute(question)
+        latencies.append(time.perf_counter() - start)
+        if decision.routed:
+            routed += 1
+            if decision.tool_name == expected:
+                correct += 1
+            else:
+                misroutes.append((question, expected, decision))
+        else:
+            reasons[decision.reason.split(" (")[0]] += 1
+
+    routable = sum(1 for _, expected in CASES if expected is not None)
+    print(f"\n[라우터] 질문 {len(CASES)}개 (도구로 바로 보낼 수 있는 질문 {routable}개)")
+    print(f"  라우팅 {routed}개 ({routed / len(CASES):.0%}), 정확도 {correct / routed if routed else 0:.0%}, 도구 질문 중 라우팅 {correct / routable:.0%}")
+    print("  LLM으로 넘김: " + ", ".join(f"{reason} {count}" for reason, count in reasons.most_common()))
+    for question, expected, decision in misroutes:
+        print(f"  잘못 보냄: {question!r} 정답={expected} 결과={decision}")
+    print(
+        f"  판단 지연 p50 {_percentile(latencies, 50) * 1000:.2f}ms / p95 {_percentile(latencies, 95) * 1000:.2f}ms"
+        f" / 최대 {max(latencies) * 1000:.2f}ms"
+    )
+
+
+async def bench_llm():
+    """LLM이 첫 호출에서 고른 도구와 그 호출의 지연 시간 (라우터가 건너뛰는 왕복)"""
+    from langchain_core.messages import HumanMessage
+
+    from server.agent.logic import get_llm_with_tools, prompt
+
+    chain = prompt | get_llm_with_tools()
+    latencies = []
+    correct = 0
+    for question, expected in CASES:
+        start = time.perf_counter()
+        response = await chain.ainvoke({"messages": [HumanMessage(content=question)]})
+        latencies.append(time.perf_counter() - start)
+        chosen = response.tool_calls[0]["name"] if response.tool_calls else None
+        correct += chosen == expected
+    print(f"\n[LLM 도구 선택] 정확도 {correct / len(CASES):.0%}")
+    print(
+        f"  첫 호출 지연 p50 {_percentile(latencies, 50) * 1000:.0f}ms / p95 {_percentile(latencies, 95) * 1000:.0f}ms"
+        f" / 최대 {max(latencies) * 1000:.0f}ms"
+    )
+
+
+def main(live: bool, keywords_only: bool):
+    if keywords_only:
+        embeddings = None
+    elif live:
+        from server.core.providers import get_embeddings
+
+        embeddings = get_embeddings()
+    else:
+        from server.core.fake_llm import FakeEmbeddings
+
+        embeddings = FakeEmbeddings()
+    router = IntentRouter(embeddings, threshold=settings.INTENT_ROUTER_THRESHOLD, margin=settings.INTENT_ROUTER_MARGIN)
+    asyncio.run(bench_router(router))
+    if live:
+        asyncio.run(bench_llm())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="의도 라우터 정확도 / 지연 시간 벤치마크")
+    parser.add_argument("--live", action="store_true", help="실제 임베딩과 LLM을 사용 (네트워크 필요)")
+    parser.add_argument("--keywords-only", action="store_true", help="임베딩 없이 키워드로만 라우팅")
+    args = parser.parse_args()
+    main(args.live, args.keywords_only)
@@ -0,0 +1,85 @@
+# server/scripts/bench_streaming.py
+
+"""
+첫 토큰까지의 시간(TTFT) 비교 벤치마크 (오프라인)
+
+- node diff : 이전 `/chat/stream` 방식. `agent` 노드가 끝나 전체 답변이 나온 뒤에야 텍스트를 보냅니다.
+- token     : 현재 방식. `astream_events`로 LLM 토큰이 생성되는 즉시 보냅니다.
+
+토큰마다 지연이 있는 FakeChatModel로 두 방식을 같은 조건에서 실행합니다.
+
+    python -m server.scripts.bench_streaming --runs 5 --latency 0.3 --token-latency 0.02
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# 첫 LLM 호출(도구 선택)까지 포함해 비교하도록 의도 라우터를 끕니다. 설정은 임포트 시 읽으므로 먼저 지정합니다.
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+
+import server.agent.logic as logic  # noqa: E402
+from server.core.fake_llm import FakeChatModel  # noqa: E402
+from server.core.streaming import stream_agent_events  # noqa: E402
+
+QUESTION = "오늘 오후 3시에 어떤 일정이 있어?"
+
+
+async def _node_diff_stream(input_data):
+    """이전 구현과 같은 방식: agent 노드 업데이트가 끝날 때마다 새로 늘어난 부분만 전달"""
+    last_sent_content = ""
+    async for chunk in logic.app.astream(input_data):
+        messages = chunk.get("agent", {}).get("messages")
+        if not messages:
+            continue
+        last_message = messages[-1]
+        if isinstance(last_message, AIMessage) and last_message.content != last_sent_content:
+            new_part = last_message.content[len(last_sent_content):]
+            last_sent_content = last_message.content
+            yield new_part
+
+
+async def _token_stream(input_data):
+    async for event, data in stream_agent_events(logic.app, input_data):
+        if event == "token":
+            yield data["text"]
+
+
+async def _measure(stream_fn) -> tuple:
+    input_data = {"messages": [HumanMessage(content=QUESTION)]}
+    start = time.perf_counter()
+    ttft = None
+    async for text in stream_fn(input_data):
+        if text and ttft is None:
+            ttft = time.perf_counter() - start
+    return ttft, time.perf_counter() - start
+
+
+async def main(runs: int, latency: float, token_latency: float):
+    model = FakeChatModel(latency=latency, token_latency=token_latency, tool_name="get_schedule")
+    logic.llm_with_tools = model.bind(tools=logic.tools)
+
+    print(f"LLM 첫 토큰 지연 {latency:.2f}초, 토큰당 {token_latency * 1000:.0f}ms, {runs}회 측정\n")
+    results = {}
+    for name, stream_fn in (("node diff (이전)", _node_diff_stream), ("token (astream_events)", _token_stream)):
+        samples = [await _measure(stream_fn) for _ in range(runs)]
+        ttft = statistics.median(s[0] for s in samples)
+        total = statistics.median(s[1] for s in samples)
+        results[name] = ttft
+        print(f"[{name}] TTFT 중앙값 {ttft * 1000:.0f}ms, 전체 응답 {total * 1000:.0f}ms")
+
+    before, after = results.values()
+    print(f"\n첫 토큰까지의 시간이 {before * 1000:.0f}ms → {after * 1000:.0f}ms로 {before / after:.1f}배 단축되었습니다.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="스트리밍 TTFT 비교 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3, help="가짜 LLM의 첫 토큰 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.02, help="가짜 LLM의 토큰당 지연(초)")
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.latency, args.token_latency))
@@ -0,0 +1,142 @@
+# server/scripts/bench_vector_index.py
+
+"""
+벡터 인덱스 방식별 메모리 / 생성 시간 / 검색 지연 / 재현율 비교 (오프라인)
+
+군집 구조를 가진 정규화된 가짜 임베딩으로 다음 인덱스를 만들어 같은 질문 벡터로 검색합니다.
+- chroma       : 현재 서비스 구성 (Chroma HNSW, 기본 파라미터)
+- mmap         : float32 원본 벡터 정확 검색 (VECTOR_BACKEND=mmap, 재현율 기준값)
+- faiss-*      : 양자화 인덱스 (VECTOR_BACKEND=faiss), 재정렬 없음 / 원본 벡터로 재정렬
+
+재현율(recall@k)은 mmap 정확 검색의 상위 k개 중 몇 개를 찾았는지입니다.
+인덱스 크기는 검색 시 메모리에 올라가는 인덱스 파일 크기이며, 재정렬에 쓰는 원본 벡터(mmap)는
+후보 행만 읽으므로 포함하지 않습니다. 실제 임베딩의 분포에 따라 재현율은 달라질 수 있습니다.
+
+    python -m server.scripts.bench_vector_index --vectors 20000 --dim 768
+    python -m server.scripts.bench_vector_index --vectors 50000 --dim 3072 --skip-chroma
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from server.core.dense_index import DenseIndex, build_dense_index
+from server.core.faiss_index import INDEX_TYPES, FaissIndex, build_faiss_index
+
+
+def make_vectors(count: int, dim: int, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    """군집 중심 주변에 흩어진 단위 벡터 (문서 임베딩처럼 주제별로 모여 있는 분포)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.6 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def make_queries(vectors: np.ndarray, count: int, seed: int = 1) -> np.ndarray:
+    """코퍼스 벡터에 잡음을 더한 질문 벡터 (질문은 관련 문서와 비슷하지만 같지 않음)"""
+    rng = np.random.default_rng(seed)
+    picked = vectors[rng.integers(0, len(vectors), count)]
+    queries = picked + 0.3 * rng.standard_normal(picked.shape).astype(np.float32) / np.sqrt(vectors.shape[1]) * 4
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def _measure(search, queries: np.ndarray, truth, k: int):
+    latencies, found = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        ids = search(query, k)
+        latencies.append(time.perf_counter() - start)
+        found += len(set(ids) & expected)
+    return _percentile(latencies, 50) * 1000, _percentile(latencies, 95) * 1000, found / (len(queries) * k)
+
+
+def _dir_bytes(path: str, exclude=()) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files if name not in exclude)
+    return total
+
+
+def bench_chroma(workdir: str, ids, vectors: np.ndarray):
+    """현재 구성과 같은 Chroma 컬렉션(기본 HNSW 파라미터)에 벡터를 넣고 검색 함수를 반환합니다."""
+    import chromadb
+
+    path = os.path.join(workdir, "chroma")
+    collection = chromadb.PersistentClient(path=path).get_or_create_collection("bench")
+    start = time.perf_counter()
+    for i in range(0, len(ids), 5000):
+        collection.add(ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000])
+    build_seconds = time.perf_counter() - start
+
+    def search(query, k):
+        return collection.query(query_embeddings=[query], n_results=k, include=[])["ids"][0]
+
+    # HNSW 세그먼트 파일 (서버가 메모리에 올리는 부분). sqlite의 임베딩 사본은 제외합니다.
+    return search, build_seconds, _dir_bytes(path, exclude=("chroma.sqlite3",))
+
+
+def main(count: int, dim: int, queries: int, k: int, rerank: int, nprobe: int, skip_chroma: bool):
+    print(f"벡터 {count:,}개 x {dim}차원, 질문 {queries}개, recall@{k}")
+    vectors = make_vectors(count, dim)
+    query_vectors = make_queries(vectors, queries)
+    ids = [f"chunk-{i}" for i in range(count)]
+    rows = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        start = time.perf_counter()
+        build_dense_index(workdir, zip(ids, vectors))
+        dense_build = time.perf_counter() - start
+        dense = DenseIndex.open(workdir)
+        truth = [{doc_id for doc_id, _ in dense.search(query, k)} for query in query_vectors]
+        p50, p95, recall = _measure(lambda q, n: [d for d, _ in dense.search(q, n)], query_vectors, truth, k)
+        rows.append(("mmap (float32 정확 검색)", dense.nbytes, dense_build, p50, p95, recall))
+
+        if not skip_chroma:
+            search, build_seconds, size = bench_chroma(workdir, ids, vectors)
+            rows.append(("chroma (HNSW)", size, build_seconds, *_measure(search, query_vectors, truth, k)))
+
+        # 모두 만든 뒤에 검색해야 FaissIndex가 줄이는 OpenMP 스레드 수가 생성 시간에 영향을 주지 않습니다.
+        metas = {}
+        for index_type in INDEX_TYPES:
+            path = os.path.join(workdir, index_type)
+            os.makedirs(path)
+            # 인덱스 종류마다 같은 Dense 인덱스를 공유합니다.
+            os.symlink(os.path.join(workdir, "dense"), os.path.join(path, "dense"))
+            metas[index_type] = build_faiss_index(path, index_type)
+
+        for index_type, meta in metas.items():
+            path = os.path.join(workdir, index_type)
+            label = meta["type"] + (f" nlist={meta['params']['nlist']} m={meta['params']['pq_m']}" if meta["params"] else "")
+            for factor in (0, rerank):
+                index = FaissIndex.open(path, dense, nprobe=nprobe, rerank=factor)
+                search = lambda q, n: [d for d, _ in index.search(q, n)]  # noqa: E731
+                name = f"faiss-{label}" + (f" + 재정렬 x{factor}" if factor else "")
+                rows.append((name, meta["index_bytes"], meta["build_seconds"], *_measure(search, query_vectors, truth, k)))
+
+    print(f"\n{'인덱스':<40} {'크기':>10} {'벡터당':>9} {'생성':>8} {'p50':>9} {'p95':>9} {'recall':>7}")
+    for name, size, build_seconds, p50, p95, recall in rows:
+        print(
+            f"{name:<40} {size / 1024 / 1024:>8.1f}MB {size / count:>7.0f}B {build_seconds:>7.2f}s "
+            f"{p50:>7.2f}ms {p95:>7.2f}ms {recall:>7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="벡터 인덱스 방식별 메모리 / 생성 시간 / 검색 지연 / 재현율 비교")
+    parser.add_argument("--vectors", type=int, default=20000, help="코퍼스 벡터 수")
+    parser.add_argument("--dim", type=int, default=768, help="벡터 차원 (text-embedding-3-large는 3072)")
+    parser.add_argument("--queries", type=int, default=200, help="질문 수")
+    parser.add_argument("-k", type=int, default=10, help="recall@k의 k")
+    parser.add_argument("--rerank", type=int, default=4, help="재정렬할 후보 수 (k의 배수)")
+    parser.add_argument("--nprobe", type=int, default=16, help="IVF 탐색 클러스터 수")
+    parser.add_argument("--skip-chroma", action="store_true", help="Chroma(HNSW) 비교를 건너뜀")
+    args = parser.parse_args()
+    main(args.vectors, args.dim, args.queries, args.k, args.rerank, args.nprobe, args.skip_chroma)
@@ -0,0 +1,80 @@
+# server/scripts/import_time.py
+
+"""
+서버 임포트(콜드 스타트) 시간 리포트
+
+새 파이썬 프로세스에서 `import server.main`(기본값)을 여러 번 실행해 임포트 시간을 측정하고,
+`python -X importtime` 결과에서 누적 시간이 큰 모듈을 보여줍니다. 워커 시작/오토스케일링 시
+요청을 받기 전까지 드는 비용을 확인하는 용도입니다.
+
+    python -m server.scripts.import_time
+    python -m server.scripts.import_time --module server.agent.logic --runs 5 --top 30
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    # 공급자 클라이언트는 지연 생성되지만, 키가 없어서 실패하는 경로가 없도록 더미 키를 지정합니다.
+    env.setdefault("GOOGLE_API_KEY", "offline-import-time")
+    return env
+
+
+def measure_wall(module: str, runs: int) -> list:
+    """임포트에 걸린 시간(초)을 프로세스마다 측정합니다. (인터프리터 시작 시간 제외)"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    results = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=_child_env(), check=True
+        )
+        results.append(float(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def top_modules(module: str, top: int) -> list:
+    """`-X importtime` 출력에서 (누적 μs, 자체 μs, 모듈 이름)을 누적 시간 순으로 반환합니다."""
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # 헤더
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(module: str, runs: int, top: int):
+    walls = measure_wall(module, runs)
+    print(f"`import {module}` {runs}회: 평균 {statistics.mean(walls) * 1000:.0f}ms, 최소 {min(walls) * 1000:.0f}ms\n")
+
+    print(f"누적 임포트 시간 상위 {top}개 모듈 (들여쓰기 = 임포트 깊이)")
+    print(f"{'누적(ms)':>10} {'자체(ms)':>10}  모듈")
+    for cumulative_us, self_us, name in top_modules(module, top):
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+
+    heavy = ("langchain_google_genai", "langchain_openai", "chromadb", "tiktoken")
+    loaded = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print(','.join(m for m in {heavy!r} if m in sys.modules))"],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    ).stdout.strip()
+    print(f"\n임포트 시점에 로드된 무거운 SDK: {loaded or '없음 (첫 사용/lifespan에서 로드)'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서버 모듈 임포트 시간 리포트")
+    parser.add_argument("--module", default="server.main", help="측정할 모듈")
+    parser.add_argument("--runs", type=int, default=3, help="측정 반복 횟수")
+    parser.add_argument("--top", type=int, default=20, help="출력할 모듈 개수")
+    args = parser.parse_args()
+    main(args.module, args.runs, args.top)
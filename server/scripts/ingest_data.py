@@ -1,51 +1,316 @@
+import argparse
 import os
 import shutil
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import time
+
 from langchain_community.vectorstores import Chroma
 
 # Google Embeddings을 사용하도록 경로 변경
-from server.core.google_llm import embeddings
 from server.core.config import settings
+from server.core.index_paths import (
+    activate_index,
+    cleanup_old_indexes,
+    get_active_index_path,
+    new_index_path,
+)
+from server.core.dense_index import DenseIndex, build_dense_index
+from server.core.faiss_index import FAISS_DIR, build_faiss_index, faiss_index_is_current
+from server.core.lexical_index import build_lexical_index
+from server.core.providers import get_embeddings
+from server.ingest.chunking import create_splitter
+from server.ingest.embedding_scheduler import EmbeddingCheckpoint, EmbeddingScheduler
+from server.ingest.manifest import IngestPlan, corpus_version, empty_manifest, load_manifest, save_manifest
+from server.ingest.pipeline import StageStats, batched, iter_source_files, load_and_split_files
+
+CHECKPOINT_FILE = "ingest_checkpoint.jsonl"
+
+
+class _StagingIndex:
+    """새 인덱스 디렉토리. 실제로 쓸 내용이 생길 때 처음 만들어집니다. (변경이 없으면 만들지 않음)"""
+
+    def __init__(self, root: str, active_path: str, copy_active: bool, embedding_function):
+        self.root = root
+        self.active_path = active_path
+        self.copy_active = copy_active
+        self.embedding_function = embedding_function
+        self.path = None
+        self.vectorstore = None
+
+    def open(self):
+        if self.vectorstore is None:
+            self.path = new_index_path(self.root)
+            # 증분 모드는 기존 인덱스를 복사해서 시작
+            if self.copy_active:
+                shutil.copytree(self.active_path, self.path)
+            else:
+                os.makedirs(self.path)
+            self.vectorstore = Chroma(persist_directory=self.path, embedding_function=self.embedding_function)
+        return self.vectorstore
+
+    def discard(self):
+        if self.path is not None:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+def _embedding_dim(embedding_function) -> int:
+    """임베딩 차원. 모델 이름이 같아도 차원 설정이 다를 수 있으므로 짧은 텍스트 하나를 임베딩해 확인합니다."""
+    return len(embedding_function.embed_query("dimension"))
+
+
+def _write_chunks(vectorstore, ids, texts, metadatas, vectors, batch_size):
+    """미리 계산한 벡터로 청크를 Chroma 컬렉션에 저장합니다. (임베딩 재호출 없음)"""
+    for i in range(0, len(ids), batch_size):
+        batch_ids = ids[i:i + batch_size]
+        vectorstore._collection.upsert(
+            ids=batch_ids,
+            embeddings=[vectors[cid] for cid in batch_ids],
+            documents=texts[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size],
+        )
+
 
-def ingest_documents():
-    """docs 폴더의 문서를 임베딩하여 ChromaDB에 저장합니다."""
-    
-    # 기존 db 디렉토리가 있다면 삭제
-    if os.path.exists(settings.CHROMA_PATH):
-        print(f"기존 Vector DB '{settings.CHROMA_PATH}'를 삭제합니다.")
-        shutil.rmtree(settings.CHROMA_PATH)
-
-    print("문서 로딩을 시작합니다...")
-    # 'utf-8' 인코딩 명시
-    loader = DirectoryLoader(
-        'docs', 
-        glob="**/*.txt", 
-        loader_cls=TextLoader, 
-        loader_kwargs={'encoding': 'utf-8'}
+def _iter_stored_chunks(vectorstore, batch_size=5000):
+    """Vector DB에 저장된 전체 청크를 (청크 ID, 텍스트)로 페이지 단위로 읽습니다."""
+    offset = 0
+    while True:
+        batch = vectorstore._collection.get(include=["documents"], limit=batch_size, offset=offset)
+        if not batch["ids"]:
+            break
+        yield from zip(batch["ids"], batch["documents"])
+        offset += len(batch["ids"])
+
+
+def _iter_stored_vectors(vectorstore, batch_size=5000):
+    """Vector DB에 저장된 전체 청크를 (청크 ID, 벡터)로 페이지 단위로 읽습니다."""
+    offset = 0
+    while True:
+        batch = vectorstore._collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+        if not len(batch["ids"]):
+            break
+        yield from zip(batch["ids"], batch["embeddings"])
+        offset += len(batch["ids"])
+
+
+def _update_metadatas(vectorstore, ids, metadatas, batch_size):
+    """이미 저장된 청크의 메타데이터만 갱신합니다. (내용이 같으므로 임베딩은 그대로 사용)"""
+    for i in range(0, len(ids), batch_size):
+        vectorstore._collection.update(ids=ids[i:i + batch_size], metadatas=metadatas[i:i + batch_size])
+
+
+def _iter_changed_chunks(results, plan: IngestPlan, stats: StageStats):
+    """
+    파일별 분할 결과를 매니페스트에 반영하면서, 바뀐 파일의 청크를 (청크, 새 청크 여부)로 내보냅니다.
+    새 청크는 임베딩하고, 이전에도 있던 청크는 파일 안의 위치가 바뀌었을 수 있어 메타데이터만 갱신합니다.
+    """
+    for result in results:
+        stats.add("load/split", result.seconds, files=1, bytes=result.size, chunks=len(result.chunks or ()))
+        if result.chunks is None:
+            plan.add_unchanged(result.source)
+            continue
+        new_ids = plan.add_changed(result.source, result.file_hash, [cid for cid, _, _ in result.chunks])
+        for chunk in result.chunks:
+            yield chunk, chunk[0] in new_ids
+
+
+def _build_faiss(index_path: str, stats: StageStats, chunks: int):
+    """Dense 인덱스의 벡터로 양자화 인덱스를 다시 학습합니다. (VECTOR_BACKEND=faiss)"""
+    start = time.perf_counter()
+    meta = build_faiss_index(index_path, settings.FAISS_INDEX_TYPE, nlist=settings.FAISS_NLIST, pq_m=settings.FAISS_PQ_M)
+    stats.add("faiss", time.perf_counter() - start, chunks=chunks)
+    print(f"FAISS {meta['type']} 인덱스를 생성했습니다. ({meta['index_bytes'] / 1024 / 1024:.1f}MB)")
+
+
+def _write_changes(staging: _StagingIndex, plan: IngestPlan, stats: StageStats, model_name: str):
+    """삭제된 청크를 지우고 BM25/Dense(/FAISS) 인덱스와 매니페스트를 새 인덱스 디렉토리에 씁니다."""
+    print(
+        f"변경/추가 파일 {len(plan.changed_sources)}개, 삭제 파일 {len(plan.removed_sources)}개 "
+        f"(추가 청크 {plan.added_chunks}개, 위치 갱신 청크 {plan.updated_chunks}개, 삭제 청크 {len(plan.ids_to_delete)}개)"
     )
-    documents = loader.load()
-    if not documents:
-        print("로드할 문서가 없습니다.")
-        return
-
-    print(f"{len(documents)}개의 문서를 로드했습니다.")
-    
-    print("문서 분할을 시작합니다...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-    splits = text_splitter.split_documents(documents)
-    print(f"{len(splits)}개의 청크로 분할했습니다.")
-
-    print("임베딩 및 Vector DB 저장을 시작합니다...")
-    
-    # ChromaDB에 저장 (embedding_model 대신 embeddings 객체 직접 사용)
-    vectorstore = Chroma.from_documents(
-        documents=splits,
-        embedding=embeddings,
-        persist_directory=settings.CHROMA_PATH
+    vectorstore = staging.open()
+    for ids in batched(plan.ids_to_delete, 5000):
+        vectorstore.delete(ids=ids)
+
+    print("BM25 역색인을 생성합니다...")
+    start = time.perf_counter()
+    build_lexical_index(staging.path, _iter_stored_chunks(vectorstore))
+    indexed = vectorstore._collection.count()
+    stats.add("bm25", time.perf_counter() - start, chunks=indexed)
+    print(f"{indexed}개 청크로 BM25 역색인을 생성했습니다.")
+    # 서버 워커들이 mmap으로 공유하는 Dense 인덱스 (VECTOR_BACKEND=mmap)
+    start = time.perf_counter()
+    build_dense_index(staging.path, _iter_stored_vectors(vectorstore))
+    stats.add("dense", time.perf_counter() - start, chunks=indexed)
+    if settings.VECTOR_BACKEND == "faiss":
+        _build_faiss(staging.path, stats, indexed)
+    else:
+        # 증분 모드에서 복사해 온 이전 FAISS 인덱스는 벡터가 달라졌으므로 지웁니다.
+        shutil.rmtree(os.path.join(staging.path, FAISS_DIR), ignore_errors=True)
+    # 서버의 검색 결과 캐시는 이 버전이 바뀌면 이전 결과를 사용하지 않습니다.
+    plan.new_manifest["corpus_version"] = corpus_version(plan.new_manifest, model_name)
+    save_manifest(staging.path, plan.new_manifest)
+
+
+def ingest_documents(
+    full: bool = False,
+    embedding_function=None,
+    root: str = None,
+    chunk_strategy: str = None,
+    docs_dir: str = None,
+    workers: int = None,
+):
+    """
+    docs 폴더의 문서를 임베딩하여 ChromaDB에 저장합니다.
+
+    기본은 증분 모드로, 이전 인덱스의 매니페스트와 비교해 추가/변경된 청크만 임베딩하고
+    삭제된 파일의 청크는 제거합니다. 새 인덱스는 별도 디렉토리에 만든 뒤 원자적으로 교체되므로
+    실행 중인 서버는 작성 중인 DB를 보지 않습니다.
+
+    문서는 한꺼번에 읽지 않고 디렉토리를 탐색하면서 프로세스 풀에서 읽고 분할하며,
+    새 청크는 `INGEST_BATCH_SIZE`개씩 임베딩해 바로 저장하므로 코퍼스가 커져도 메모리 사용량이 거의 일정합니다.
+
+    임베딩은 공급자의 최대 배치 크기로 묶어 동시에 실행하고, 429 응답에는 동시 실행 수를 줄여
+    재시도합니다. 완료된 배치는 체크포인트에 기록되므로 중단 후 다시 실행하면 이어서 진행합니다.
+
+    Args:
+        full (bool): True이면 이전 인덱스를 무시하고 전체 문서를 다시 임베딩합니다.
+        embedding_function: 사용할 임베딩 객체. 기본값은 서버와 같은 임베딩입니다.
+        root (str): Vector DB 루트 디렉토리. 기본값은 settings.CHROMA_PATH 입니다.
+        chunk_strategy (str): 청크 분할 전략(recursive | token | section). 기본값은 settings.CHUNK_STRATEGY 입니다.
+        docs_dir (str): 문서 디렉토리. 기본값은 settings.INGEST_DOCS_DIR 입니다.
+        workers (int): 문서 로딩/분할 워커 프로세스 수. 기본값은 settings.INGEST_WORKERS 입니다.
+    """
+    embedding_function = embedding_function or get_embeddings()
+    root = root or settings.CHROMA_PATH
+    docs_dir = docs_dir or settings.INGEST_DOCS_DIR
+    workers = settings.INGEST_WORKERS if workers is None else workers
+    active_path = get_active_index_path(root)
+    # CURRENT 포인터가 없는 예전 구조(db/ 자체가 Chroma DB)는 매니페스트가 없으므로 전체 재구축합니다.
+    has_previous = active_path != root and os.path.isdir(active_path)
+    old_manifest = load_manifest(active_path) if has_previous and not full else empty_manifest()
+
+    splitter = create_splitter(chunk_strategy or settings.CHUNK_STRATEGY, chunk_size=settings.CHUNK_SIZE or None)
+    if old_manifest["files"] and old_manifest.get("chunking") != splitter.config():
+        # 분할 방식이 바뀌면 내용이 같은 파일도 청크가 달라지므로 전체를 다시 만듭니다.
+        print(f"청크 분할 설정이 바뀌어 전체 문서를 다시 인제스트합니다. ({old_manifest.get('chunking')} -> {splitter.config()})")
+        old_manifest = empty_manifest()
+
+    model_name = getattr(embedding_function, "model_name", None) or getattr(embedding_function, "model", "unknown")
+    embedding = {"model": str(model_name), "dim": _embedding_dim(embedding_function)}
+    if old_manifest["files"] and old_manifest.get("embedding") != embedding:
+        # 임베딩 모델(차원)이 바뀌면 기존 벡터와 섞을 수 없으므로 전체를 새 인덱스에 다시 임베딩합니다.
+        print(f"임베딩 모델이 바뀌어 전체 문서를 다시 인제스트합니다. ({old_manifest.get('embedding')} -> {embedding})")
+        old_manifest = empty_manifest()
+
+    plan = IngestPlan(old_manifest)
+    plan.new_manifest["chunking"] = splitter.config()
+    plan.new_manifest["embedding"] = embedding
+    stats = StageStats()
+
+    checkpoint = EmbeddingCheckpoint(os.path.join(root, CHECKPOINT_FILE), model_name=str(model_name))
+    scheduler = EmbeddingScheduler(
+        embedding_function,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        checkpoint=checkpoint,
     )
-    
-    print(f"'{settings.CHROMA_PATH}'에 Vector DB 저장을 완료했습니다.")
+    staging = _StagingIndex(root, active_path, bool(old_manifest["files"]), embedding_function)
+
+    print(f"'{docs_dir}' 문서 로딩/분할과 임베딩을 시작합니다... (워커 {workers}개, 배치 {settings.INGEST_BATCH_SIZE}청크)")
+    try:
+        results = load_and_split_files(
+            iter_source_files(docs_dir), plan.old_hash, splitter.config(), workers=workers
+        )
+        for batch in batched(_iter_changed_chunks(results, plan, stats), settings.INGEST_BATCH_SIZE):
+            kept = [chunk for chunk, is_new in batch if not is_new]
+            if kept:
+                start = time.perf_counter()
+                _update_metadatas(
+                    staging.open(), [cid for cid, _, _ in kept], [meta for _, _, meta in kept], settings.EMBEDDING_BATCH_SIZE
+                )
+                stats.add("update", time.perf_counter() - start, chunks=len(kept))
+            batch = [chunk for chunk, is_new in batch if is_new]
+            if not batch:
+                continue
+            ids = [cid for cid, _, _ in batch]
+            texts = [text for _, text, _ in batch]
+
+            start = time.perf_counter()
+            vectors = scheduler.embed(ids, texts)
+            stats.add("embed", time.perf_counter() - start, chunks=len(ids))
+
+            vectorstore = staging.open()
+            start = time.perf_counter()
+            _write_chunks(vectorstore, ids, texts, [meta for _, _, meta in batch], vectors, settings.EMBEDDING_BATCH_SIZE)
+            stats.add("write", time.perf_counter() - start, chunks=len(ids))
+            print(f"  파일 {stats.get('load/split').get('files', 0)}개 처리, 청크 {stats.get('write')['chunks']}개 저장")
+
+        if scheduler.stats["resumed"] or scheduler.stats["rate_limited"]:
+            # 스케줄러 통계는 실행 전체의 누적값이므로 마지막에 한 번만 더합니다.
+            stats.add("embed", 0.0, resumed=scheduler.stats["resumed"], rate_limited=scheduler.stats["rate_limited"])
+        plan.finish()
+        if not plan.new_manifest["files"] and not old_manifest["files"]:
+            print("로드할 문서가 없습니다.")
+            return
+        if not plan.has_changes:
+            faiss_ready = settings.VECTOR_BACKEND != "faiss" or faiss_index_is_current(
+                active_path, settings.FAISS_INDEX_TYPE, nlist=settings.FAISS_NLIST, pq_m=settings.FAISS_PQ_M
+            )
+            if faiss_ready:
+                print("변경된 문서가 없습니다. 기존 Vector DB를 그대로 사용합니다.")
+                return
+            # 문서는 그대로지만 FAISS 인덱스가 없거나 종류/파라미터가 바뀐 경우: 복사본에서 FAISS 인덱스만 다시 만듭니다.
+            print("변경된 문서는 없지만 FAISS 인덱스가 없거나 설정이 바뀌어 FAISS 인덱스만 다시 만듭니다.")
+            vectorstore = staging.open()
+            indexed = vectorstore._collection.count()
+            if DenseIndex.open(staging.path) is None:
+                build_dense_index(staging.path, _iter_stored_vectors(vectorstore))
+            _build_faiss(staging.path, stats, indexed)
+        else:
+            _write_changes(staging, plan, stats, str(model_name))
+    except BaseException:
+        staging.discard()
+        raise
+    finally:
+        scheduler.close()
+
+    activate_index(root, staging.path)
+    checkpoint.clear()
+    cleanup_old_indexes(root)
+    print(stats.report())
+    print(f"'{staging.path}'에 Vector DB 저장을 완료하고 서비스 인덱스로 교체했습니다.")
+
 
 if __name__ == "__main__":
-    ingest_documents()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="docs 폴더의 문서를 Vector DB에 인제스트합니다.")
+    parser.add_argument("--full", action="store_true", help="증분 비교 없이 전체 문서를 다시 임베딩합니다.")
+    parser.add_argument("--db-path", default=None, help="Vector DB 루트 디렉토리 (기본값: settings.CHROMA_PATH)")
+    parser.add_argument(
+        "--fake-embeddings",
+        action="store_true",
+        help="네트워크 없이 가짜 임베딩으로 인제스트합니다. (오프라인 테스트용, --db-path와 함께 사용 권장)",
+    )
+    parser.add_argument(
+        "--chunk-strategy",
+        choices=["recursive", "token", "section"],
+        default=None,
+        help="청크 분할 전략 (기본값: settings.CHUNK_STRATEGY)",
+    )
+    parser.add_argument("--docs-dir", default=None, help="문서 디렉토리 (기본값: settings.INGEST_DOCS_DIR)")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="문서 로딩/분할 워커 프로세스 수, 0이면 단일 프로세스 (기본값: settings.INGEST_WORKERS)"
+    )
+    args = parser.parse_args()
+
+    embedding_function = None
+    if args.fake_embeddings:
+        from server.core.fake_llm import FakeEmbeddings
+
+        embedding_function = FakeEmbeddings()
+    ingest_documents(
+        full=args.full,
+        embedding_function=embedding_function,
+        root=args.db_path,
+        chunk_strategy=args.chunk_strategy,
+        docs_dir=args.docs_dir,
+        workers=args.workers,
+    )
@@ -0,0 +1,75 @@
+# server/scripts/load_test.py
+
+"""
+에이전트 그래프 동시 실행 부하 테스트 (오프라인)
+
+실제 LLM 대신 지연 시간을 주입한 FakeChatModel로 `agent_graph.astream`을 여러 사용자가
+동시에 실행했을 때의 처리 시간을 측정합니다. 이벤트 루프를 막는 동기 호출 방식(blocking)과
+비교해, async 노드에서는 동시 요청이 줄을 서지 않고 함께 처리되는지 확인합니다.
+
+    python -m server.scripts.load_test --users 20 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+# 요청마다 LLM이 도구를 고르도록(요청당 LLM 호출 2회) 의도 라우터를 끕니다. 설정은 임포트 시 읽으므로 먼저 지정합니다.
+os.environ["INTENT_ROUTER_ENABLED"] = "false"
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+
+import server.agent.logic as logic  # noqa: E402
+from server.core.executor import install_default_executor  # noqa: E402
+from server.core.fake_llm import FakeChatModel  # noqa: E402
+
+
+async def _run_one(question: str) -> float:
+    start = time.perf_counter()
+    async for _ in logic.app.astream({"messages": [HumanMessage(content=question)]}):
+        pass
+    return time.perf_counter() - start
+
+
+async def _run_mode(users: int, latency: float, blocking: bool) -> dict:
+    model = FakeChatModel(latency=latency, blocking=blocking, tool_name="get_schedule")
+    logic.llm_with_tools = model.bind(tools=logic.tools)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(_run_one(f"오늘 일정 알려줘 #{i}") for i in range(users)))
+    wall = time.perf_counter() - start
+
+    latencies = sorted(latencies)
+    return {
+        "wall": wall,
+        "mean": statistics.mean(latencies),
+        "p95": latencies[max(0, int(len(latencies) * 0.95) - 1)],
+        "throughput": users / wall,
+    }
+
+
+async def main(users: int, latency: float):
+    install_default_executor()
+    print(f"동시 사용자 {users}명, LLM 호출당 지연 {latency:.2f}초 (요청당 LLM 호출 2회)")
+    print(f"이상적인 요청 1건 처리 시간: {latency * 2:.2f}초\n")
+
+    results = {}
+    for name, blocking in (("blocking (이전 동기 호출)", True), ("async (ainvoke)", False)):
+        results[name] = result = await _run_mode(users, latency, blocking)
+        print(
+            f"[{name}] 전체 {result['wall']:.2f}초, 평균 {result['mean']:.2f}초, "
+            f"p95 {result['p95']:.2f}초, 처리량 {result['throughput']:.1f} req/s"
+        )
+
+    blocking_wall, async_wall = (r["wall"] for r in results.values())
+    print(f"\nasync 방식이 {blocking_wall / async_wall:.1f}배 빠르게 전체 요청을 처리했습니다.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="에이전트 그래프 동시 실행 부하 테스트")
+    parser.add_argument("--users", type=int, default=20, help="동시 사용자 수")
+    parser.add_argument("--latency", type=float, default=0.5, help="가짜 LLM 호출당 지연 시간(초)")
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.latency))
@@ -0,0 +1,79 @@
+# server/scripts/serve.py
+
+"""
+운영용 멀티 워커 서버 실행
+
+uvicorn 워커 프로세스를 여러 개 띄워 CPU 코어를 모두 사용합니다. 워커는 서로 메모리를 공유하지 않으므로,
+워커가 2개 이상이면 워커별로 따로 올라가는 데이터를 줄이도록 다음 기본값을 사용합니다. (환경 변수로 지정하면 그 값 우선)
+
+- `VECTOR_BACKEND=mmap`: Dense 검색을 인제스트 시 만든 벡터 파일의 mmap으로 하므로, 워커마다 Chroma HNSW
+  인덱스를 메모리에 올리지 않고 OS 페이지 캐시의 같은 페이지를 공유합니다. (BM25 인덱스는 원래 mmap)
+- `RETRIEVAL_CACHE_PATH=cache/retrieval.sqlite3`: 검색 결과 캐시를 SQLite 파일로 워커끼리 공유합니다.
+  (임베딩 캐시는 원래 `EMBEDDING_CACHE_PATH` SQLite 파일을 공유)
+
+워커마다 입장 제어(`ADMISSION_MAX_IN_FLIGHT`)로 동시에 실행하는 에이전트 수를 제한하고, 넘치는 요청은
+대기시키거나 429 + Retry-After로 거절해 부하가 몰려도 실행 중인 요청의 지연 시간이 함께 늘어나지 않게 합니다.
+
+    python -m server.scripts.serve --workers 4 --max-in-flight 8
+"""
+
+import argparse
+import os
+
+from server.core.config import settings
+
+SHARED_DEFAULTS = {
+    "VECTOR_BACKEND": "mmap",
+    "RETRIEVAL_CACHE_PATH": os.path.join("cache", "retrieval.sqlite3"),
+}
+
+
+def main(host: str, port: int, workers: int, max_in_flight: int = None):
+    # 워커 프로세스는 서버 모듈을 새로 임포트하므로 설정은 환경 변수로 전달합니다.
+    if max_in_flight is not None:
+        os.environ["ADMISSION_MAX_IN_FLIGHT"] = str(max_in_flight)
+    if workers > 1:
+        for name, value in SHARED_DEFAULTS.items():
+            os.environ.setdefault(name, value)
+        os.makedirs(os.path.dirname(os.environ["RETRIEVAL_CACHE_PATH"]) or ".", exist_ok=True)
+
+    import uvicorn
+
+    from server.core.dense_index import DenseIndex
+    from server.core.index_paths import get_active_index_path
+
+    # settings는 임포트 시점의 환경 변수 값이므로, 워커가 사용할 값은 환경 변수에서 다시 읽습니다.
+    vector_backend = os.environ.get("VECTOR_BACKEND", settings.VECTOR_BACKEND).lower()
+    max_in_flight = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", settings.ADMISSION_MAX_IN_FLIGHT))
+    index_path = get_active_index_path(settings.CHROMA_PATH)
+    print(
+        f"워커 {workers}개로 {host}:{port}에서 서버를 시작합니다. "
+        f"(Dense 검색 {vector_backend}, 워커당 동시 실행 {max_in_flight or '제한 없음'})"
+    )
+    if vector_backend == "mmap":
+        dense_index = DenseIndex.open(index_path)
+        if dense_index is None:
+            print(f"  '{index_path}'에 mmap Dense 인덱스가 없습니다. `python -m server.scripts.ingest_data`를 다시 실행하세요.")
+        else:
+            print(f"  mmap Dense 인덱스: 벡터 {dense_index.count:,}개, {dense_index.nbytes / 1024 / 1024:.1f}MB (워커 간 공유)")
+    if workers > 1 and settings.SESSION_STORE == "memory":
+        print("  SESSION_STORE=memory는 워커마다 대화 세션을 따로 보관합니다. 세션을 공유하려면 SESSION_STORE=sqlite를 사용하세요.")
+
+    uvicorn.run("server.main:app", host=host, port=port, workers=workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="멀티 워커로 API 서버를 실행합니다.")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help="기본값: settings.SERVER_HOST")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help="기본값: settings.SERVER_PORT")
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS, help="워커 프로세스 수 (기본값: settings.SERVER_WORKERS)"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="워커당 동시에 실행하는 에이전트 수, 0이면 제한 없음 (기본값: settings.ADMISSION_MAX_IN_FLIGHT)",
+    )
+    args = parser.parse_args()
+    main(args.host, args.port, args.workers, args.max_in_flight)
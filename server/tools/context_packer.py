@@ -0,0 +1,136 @@
+# server/tools/context_packer.py
+
+"""
+검색 결과를 LLM에 넘길 컨텍스트 문자열로 정리합니다.
+
+검색된 청크를 그대로 이어 붙이면 겹치는 부분(recursive/token 분할의 overlap)이 중복으로 들어가고,
+출처가 빠져 있어 모델이 [참고 자료]를 채우려고 같은 검색을 다시 호출하기도 합니다.
+
+1. 같은 파일의 청크 중 위치(start_index/end_index)가 겹치거나 바로 이어지는 청크는 하나의 블록으로 합칩니다.
+   위치 정보가 없는 예전 인덱스의 청크는 내용이 같거나 다른 청크에 포함되면 제외합니다.
+2. 블록은 가장 순위가 높은 청크의 순서대로 배치하고, 각 블록 앞에 출처/섹션 라벨을 붙입니다.
+3. 전체 결과가 토큰 예산을 넘으면 순위가 낮은 블록부터 줄이거나 제외합니다.
+"""
+
+from typing import List, Optional
+
+from langchain_core.documents import Document
+
+from server.agent.context_budget import count_tokens
+
+NO_RESULTS_MESSAGE = "지식 베이스에서 관련 문서를 찾지 못했습니다."
+# 예산이 이보다 적게 남으면 블록을 줄여 넣지 않고 제외합니다.
+_MIN_BLOCK_TOKENS = 50
+_TRUNCATED_MARKER = "\n...(이하 생략)"
+
+
+class _Block:
+    """같은 파일에서 이어지는 청크를 합친 컨텍스트 조각"""
+
+    def __init__(self, doc: Document, rank: int):
+        self.source = doc.metadata.get("source", "")
+        self.sections = [doc.metadata.get("section", "")]
+        self.start = doc.metadata.get("start_index")
+        self.end = doc.metadata.get("end_index")
+        self.chunk_index = doc.metadata.get("chunk_index")
+        self.text = doc.page_content
+        self.rank = rank
+
+    @property
+    def has_offsets(self) -> bool:
+        return isinstance(self.start, int) and isinstance(self.end, int) and self.start >= 0
+
+    def touches(self, other: "_Block") -> bool:
+        """other가 이 블록 바로 뒤에 이어지거나 겹치는지 (other.start >= self.start 가정)"""
+        if other.start <= self.end:
+            return True
+        # 분할 시 앞뒤 공백을 제거하므로 연속한 청크 사이에는 공백만큼의 틈이 있습니다.
+        return self.chunk_index is not None and other.chunk_index == self.chunk_index + 1
+
+    def absorb(self, other: "_Block"):
+        # 위치 정보가 실제 텍스트와 맞을 때만 겹친 부분을 잘라냅니다. (인덱스가 오래되어 위치가 어긋난 경우 대비)
+        overlap = self.end - other.start
+        if other.end <= self.end and other.text in self.text:
+            pass  # 완전히 포함된 청크
+        elif 0 <= overlap < len(other.text) and self.text.endswith(other.text[:overlap]):
+            self.text += other.text[overlap:]
+        else:
+            self.text += "\n\n" + other.text
+        self.end = max(self.end, other.end)
+        self.chunk_index = other.chunk_index if other.chunk_index is not None else self.chunk_index
+        self.rank = min(self.rank, other.rank)
+        for section in other.sections:
+            if section not in self.sections:
+                self.sections.append(section)
+
+    def label(self) -> str:
+        label = f"[출처: {self.source or '알 수 없음'}"
+        # 합쳐진 뒤쪽 섹션의 제목 줄은 본문에 그대로 들어 있으므로 첫 섹션만 표시하고,
+        # 본문이 섹션 제목으로 시작하면 생략합니다.
+        section = self.sections[0]
+        if section and not self.text.lstrip().lstrip("#").lstrip().startswith(section):
+            label += f" | 섹션: {section}"
+        return label + "]"
+
+
+def _merge_blocks(docs: List[Document]) -> List[_Block]:
+    by_source = {}
+    for rank, doc in enumerate(docs):
+        by_source.setdefault(doc.metadata.get("source", ""), []).append(_Block(doc, rank))
+
+    merged = []
+    for blocks in by_source.values():
+        located = sorted((b for b in blocks if b.has_offsets), key=lambda b: (b.start, b.end))
+        for block in located:
+            if merged and merged[-1].source == block.source and merged[-1].has_offsets and merged[-1].touches(block):
+                merged[-1].absorb(block)
+            else:
+                merged.append(block)
+
+        # 위치 정보가 없는 청크는 내용 기준으로만 중복을 제거합니다.
+        kept = [b for b in merged if b.source == blocks[0].source]
+        for block in (b for b in blocks if not b.has_offsets):
+            duplicate = next((k for k in kept if block.text in k.text), None)
+            if duplicate is not None:
+                duplicate.rank = min(duplicate.rank, block.rank)
+                continue
+            merged.append(block)
+            kept.append(block)
+    return sorted(merged, key=lambda b: b.rank)
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    tokens = count_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    max_tokens -= count_tokens(_TRUNCATED_MARKER)
+    cut = len(text) * max_tokens // tokens
+    while cut > 0 and count_tokens(text[:cut]) > max_tokens:
+        cut = cut * 9 // 10
+    return text[:cut].rstrip() + _TRUNCATED_MARKER
+
+
+def pack_context(docs: List[Document], max_tokens: Optional[int] = 1500) -> str:
+    """
+    검색된 청크를 출처 라벨이 붙은 컨텍스트 문자열로 합칩니다.
+
+    Args:
+        docs: 검색 순위 순서의 청크 목록.
+        max_tokens: 결과 문자열의 최대 토큰 수. None이나 0이면 제한하지 않습니다.
+    """
+    if not docs:
+        return NO_RESULTS_MESSAGE
+
+    parts = []
+    used = 0
+    for block in _merge_blocks(docs):
+        part = f"{block.label()}\n{block.text.strip()}"
+        tokens = count_tokens(part) + (2 if parts else 0)
+        if max_tokens and used + tokens > max_tokens:
+            remaining = max_tokens - used - count_tokens(block.label()) - 2
+            if remaining >= _MIN_BLOCK_TOKENS:
+                parts.append(f"{block.label()}\n{_truncate(block.text.strip(), remaining)}")
+            break
+        parts.append(part)
+        used += tokens
+    return "\n\n".join(parts)
@@ -1,12 +1,12 @@
-from langchain.tools import tool
-from langchain_community.vectorstores import Chroma
-from server.core.google_llm import embeddings  # Google Embeddings으로 변경
+from langchain_core.tools import tool
 from server.core.config import settings
+from server.core.vectorstore import vectorstore_provider
+from server.tools.context_packer import pack_context
 import datetime
 
 # --- RAG Tool ---
 @tool
-def search_knowledge_base(query: str) -> str:
+async def search_knowledge_base(query: str) -> str:
     """
     "사용자가 '문서', '보고서', '회의록' 등과 관련된 질문을 할 때 사용합니다.
     사내 데이터베이스(Vector DB)에서 관련 정보를 검색하여 답변의 근거를 마련합니다."
@@ -15,18 +15,14 @@ def search_knowledge_base(query: str) -> str:
         query (str): 사용자의 원본 질문 또는 검색에 최적화된 키워드.
 
     Returns:
-        str: 검색된 문서의 내용.
+        str: 출처 라벨이 붙은 검색된 문서의 내용.
     """
-    # embeddings 객체를 직접 사용
-    vectorstore = Chroma(persist_directory=settings.CHROMA_PATH, embedding_function=embeddings)
-    
-    # k=3은 가장 유사한 3개의 청크를 가져오라는 의미
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-    
-    docs = retriever.invoke(query)
-    
-    # 검색된 문서 내용을 하나의 문자열로 합쳐서 반환
-    return "\n\n".join([doc.page_content for doc in docs])
+    # 서버 시작 시 열어 둔 공용 벡터스토어를 재사용
+    # SEARCH_TOP_K(기본 3)개의 가장 유사한 청크를 가져옴
+    docs = await vectorstore_provider.asearch(query, k=settings.SEARCH_TOP_K)
+
+    # 겹치는 청크는 합치고, 출처 라벨을 붙여 토큰 예산 안에서 하나의 문자열로 반환
+    return pack_context(docs, max_tokens=settings.SEARCH_CONTEXT_MAX_TOKENS)
 
 # --- Dummy Tools for Demo ---
 @tool
@@ -1,9 +1,7 @@
 # test_rag.py
 
 import asyncio
-from langchain_community.vectorstores import Chroma
-from server.core.google_llm import embeddings
-from server.core.config import settings
+from server.core.vectorstore import vectorstore_provider
 
 async def main():
     """ChromaDB에서 문서를 검색하는 테스트"""
@@ -11,17 +9,11 @@ async def main():
     print(f"질문: {query}")
 
     try:
-        # 1. Vector DB 로드
-        vectorstore = Chroma(
-            persist_directory=settings.CHROMA_PATH, 
-            embedding_function=embeddings
-        )
-        
-        # 2. Retriever 생성 (가장 유사한 3개 문서 검색)
-        retriever = vectorstore.as_retriever(search_kwargs={"k": 3})
-        
-        # 3. 문서 검색 실행
-        docs = await retriever.ainvoke(query)
+        # 1. Vector DB 로드 (서버와 같이 CURRENT가 가리키는 현재 인덱스를 엽니다)
+        vectorstore_provider.open()
+
+        # 2. 문서 검색 실행 (가장 유사한 3개 문서, 서버의 검색 도구와 같은 경로)
+        docs = await vectorstore_provider.asearch(query, k=3)
         
         print("\n--- 검색 결과 ---")
         if not docs:
@@ -0,0 +1,26 @@
+# tests/conftest.py
+
+"""
+테스트 공통 설정: 네트워크 없이 가짜 공급자(`server/core/fake_llm.py`)로 실행합니다.
+Settings는 임포트 시점에 환경 변수를 읽으므로 server 모듈을 임포트하기 전에 지정합니다.
+"""
+
+import os
+import tempfile
+
+_CACHE_DIR = tempfile.mkdtemp(prefix="agent-tests-")
+
+for _key, _value in {
+    "GOOGLE_API_KEY": "test",
+    "FAKE_LLM": "true",
+    "LLM_PROVIDER": "fake",
+    "EMBEDDING_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY": "0",
+    "FAKE_LLM_TOKEN_LATENCY": "0",
+    "FAKE_EMBEDDING_LATENCY": "0",
+    "FAKE_LLM_TOOL": "get_schedule",
+    "EMBEDDING_CACHE_PATH": os.path.join(_CACHE_DIR, "embeddings.sqlite3"),
+    "SESSION_DB_PATH": os.path.join(_CACHE_DIR, "sessions.sqlite3"),
+    "PREWARM_PROVIDERS": "false",
+}.items():
+    os.environ.setdefault(_key, _value)
@@ -0,0 +1,124 @@
+# tests/test_admission.py
+
+import asyncio
+
+import pytest
+
+from server.core.admission import AdmissionController, AdmissionRejected
+
+
+async def _start(coro) -> asyncio.Task:
+    """태스크를 만들고 한 번 실행해, 슬롯이 없으면 대기열에 들어간 상태로 반환합니다."""
+    task = asyncio.create_task(coro)
+    await asyncio.sleep(0)
+    return task
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, max_queue=1)
+        ticket = await controller.acquire()
+        waiter = await _start(controller.acquire())
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+
+        ticket.release()
+        (await waiter).release()
+        return rejected.value, controller.get_stats()
+
+    rejected, stats = asyncio.run(run())
+
+    assert rejected.reason == "queue_full"
+    assert 1 <= rejected.retry_after <= 60
+    assert stats["rejected_queue_full"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_waiter_is_rejected_after_queue_timeout():
+    async def run():
+        controller = AdmissionController(max_in_flight=1, queue_timeout=0.05)
+        ticket = await controller.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        stats = controller.get_stats()
+        ticket.release()
+        return rejected.value, stats, controller.get_stats()
+
+    rejected, during, after = asyncio.run(run())
+
+    assert rejected.reason == "timeout"
+    assert during["rejected_timeout"] == 1
+    assert during["queued_now"] == 0 and during["in_flight"] == 1
+    assert after["in_flight"] == 0
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        ticket = await controller.acquire()
+        waiter = await _start(controller.acquire())
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        queued = controller.get_stats()["queued_now"]
+        ticket.release()
+        return queued, controller.get_stats()
+
+    queued, stats = asyncio.run(run())
+
+    assert queued == 0
+    assert stats["in_flight"] == 0
+
+
+def test_waiter_cancelled_during_handoff_does_not_leak_a_slot():
+    async def run():
+        controller = AdmissionController(max_in_flight=1)
+        ticket = await controller.acquire()
+        waiter = await _start(controller.acquire())
+        # 슬롯을 넘겨받은 직후, 대기 태스크가 깨어나기 전에 취소되는 경우
+        ticket.release()
+        waiter.cancel()
+        try:
+            # 취소와 슬롯 수신이 겹치면 티켓을 그대로 돌려받을 수도 있으며, 이때는 받은 쪽이 반환합니다.
+            (await waiter).release()
+        except asyncio.CancelledError:
+            pass
+        stats = controller.get_stats()
+        # 슬롯이 남아 있지 않다면 다음 요청은 기다리지 않고 바로 실행됩니다.
+        (await asyncio.wait_for(controller.acquire(), 0.1)).release()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert stats["in_flight"] == 0
+    assert stats["queued_now"] == 0
+
+
+def test_released_slots_are_handed_to_waiters_in_order():
+    async def run():
+        controller = AdmissionController(max_in_flight=2)
+        order, max_in_flight = [], 0
+
+        async def request(i: int):
+            nonlocal max_in_flight
+            ticket = await controller.acquire()
+            order.append(i)
+            max_in_flight = max(max_in_flight, controller.get_stats()["in_flight"])
+            await asyncio.sleep(0.01)
+            ticket.release()
+
+        holders = [await controller.acquire() for _ in range(2)]
+        tasks = [await _start(request(i)) for i in range(5)]
+        assert controller.get_stats()["queued_now"] == 5
+        for ticket in holders:
+            ticket.release()
+        await asyncio.gather(*tasks)
+        return order, max_in_flight, controller.get_stats()
+
+    order, max_in_flight, stats = asyncio.run(run())
+
+    assert order == [0, 1, 2, 3, 4]
+    assert max_in_flight <= 2
+    assert stats["in_flight"] == 0
+    assert stats["admitted"] == 7
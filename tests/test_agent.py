@@ -0,0 +1,77 @@
+# tests/test_agent.py
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+
+import server.agent.logic as logic
+from server.agent.tool_executor import ParallelToolExecutor
+from server.core.fake_llm import FakeChatModel
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    def install(**kwargs):
+        model = FakeChatModel(**kwargs).bind(tools=logic.get_tools())
+        monkeypatch.setattr(logic, "llm_with_tools", model)
+        return model
+
+    return install
+
+
+def _run(graph, question: str):
+    return graph.ainvoke({"messages": [HumanMessage(content=question)]})
+
+
+def test_agent_calls_tool_then_answers(fake_llm):
+    fake_llm(tool_name="get_schedule")
+    graph = logic.build_workflow().compile()
+
+    result = asyncio.run(_run(graph, "오늘 일정 알려줘"))
+
+    tool_results = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    assert [m.name for m in tool_results] == ["get_schedule"]
+    assert "[답변]" in result["messages"][-1].content
+    assert tool_results[0].content in result["messages"][-1].content
+
+
+def test_agent_runs_do_not_block_each_other(fake_llm):
+    # LLM 호출이 이벤트 루프를 막지 않으면 동시에 실행한 요청들의 지연이 겹칩니다.
+    fake_llm(tool_name=None, latency=0.2)
+    graph = logic.build_workflow().compile()
+
+    async def main():
+        start = time.perf_counter()
+        await asyncio.gather(*(_run(graph, f"질문 {i}") for i in range(5)))
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) < 0.6
+
+
+def test_tool_executor_waits_for_cancelled_tools():
+    cleaned_up = []
+
+    @tool
+    async def slow_tool(query: str) -> str:
+        """전체 시간 예산보다 오래 걸리는 도구"""
+        try:
+            await asyncio.sleep(5)
+        finally:
+            cleaned_up.append(query)
+        return query
+
+    executor = ParallelToolExecutor([slow_tool], default_timeout=10, total_budget=0.05)
+    call = AIMessage(content="", tool_calls=[{"name": "slow_tool", "args": {"query": "q"}, "id": "call-1"}])
+
+    async def run():
+        result = await executor({"messages": [call]}, {})
+        # 노드가 반환될 때는 취소된 도구의 정리 코드까지 끝나 있어야 합니다.
+        return result, list(cleaned_up)
+
+    result, cleaned_at_return = asyncio.run(run())
+
+    assert result["messages"][0].status == "error"
+    assert cleaned_at_return == ["q"]
@@ -0,0 +1,97 @@
+# tests/test_coalescing.py
+
+import asyncio
+
+from server.core.admission import AdmissionController
+from server.core.coalescing import RequestCoalescer
+
+
+def _agent(release: asyncio.Event, tokens=("안녕", "하세요")):
+    async def events():
+        yield "token", {"text": tokens[0]}
+        await release.wait()
+        for text in tokens[1:]:
+            yield "token", {"text": text}
+
+    return events
+
+
+def test_followers_share_one_run():
+    async def main():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        leader = coalescer.stream("q", _agent(release))
+        follower = coalescer.join("q")
+        release.set()
+        return [e async for e in leader], [e async for e in follower], coalescer.get_stats()
+
+    leader, follower, stats = asyncio.run(main())
+
+    assert [d["text"] for e, d in leader if e == "token"] == ["안녕", "하세요"]
+    assert follower[0][0] == "coalesced"
+    assert [d["text"] for e, d in follower if e == "token"] == ["안녕", "하세요"]
+    assert stats["flights"] == 1 and stats["joined"] == 1 and stats["in_flight"] == 0
+
+
+def test_unread_follower_does_not_keep_the_run_alive():
+    async def main():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        leader = coalescer.stream("q", _agent(release))
+        # 합류했지만 응답을 시작하지 못한 요청 (스트림을 한 번도 읽지 않음)
+        coalescer.join("q")
+        await leader.__anext__()
+        await leader.aclose()
+        await asyncio.sleep(0)
+        return coalescer.get_stats()
+
+    stats = asyncio.run(main())
+
+    assert stats["cancelled"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_run_keeps_admission_slot_after_leader_disconnects():
+    async def main():
+        controller = AdmissionController(max_in_flight=1)
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        ticket = await controller.acquire()
+        leader = coalescer.stream("q", _agent(release), on_finish=ticket.transfer().release)
+        follower = coalescer.join("q")
+        await leader.__anext__()
+        await follower.__anext__()
+        # 첫 요청의 응답이 끝남 (AdmittedStreamingResponse가 자기 티켓을 반환)
+        await leader.aclose()
+        ticket.release()
+        in_flight_while_running = controller.get_stats()["in_flight"]
+
+        release.set()
+        tokens = [d["text"] async for e, d in follower if e == "token"]
+        await asyncio.sleep(0)
+        return in_flight_while_running, controller.get_stats()["in_flight"], tokens
+
+    while_running, after, tokens = asyncio.run(main())
+
+    assert while_running == 1
+    assert after == 0
+    assert tokens == ["안녕", "하세요"]
+
+
+def test_joining_instead_of_running_releases_the_slot_at_once():
+    async def main():
+        controller = AdmissionController(max_in_flight=2)
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+        first = coalescer.stream("q", _agent(release))
+        # 슬롯을 기다리는 사이 같은 질문의 실행이 시작된 경우
+        ticket = await controller.acquire()
+        second = coalescer.stream("q", _agent(release), on_finish=ticket.transfer().release)
+        in_flight = controller.get_stats()["in_flight"]
+        release.set()
+        for events in (first, second):
+            [e async for e in events]
+        return in_flight
+
+    assert asyncio.run(main()) == 0
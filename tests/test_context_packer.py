@@ -0,0 +1,35 @@
+# tests/test_context_packer.py
+
+from langchain_core.documents import Document
+
+from server.tools.context_packer import pack_context
+
+TEXT = "첫째 문단입니다. 회의 일정을 정했습니다. 둘째 문단입니다. 담당자를 정했습니다."
+
+
+def _chunk(start: int, end: int, chunk_index: int, text: str = None) -> Document:
+    return Document(
+        page_content=TEXT[start:end] if text is None else text,
+        metadata={"source": "docs/회의록.txt", "start_index": start, "end_index": end, "chunk_index": chunk_index},
+    )
+
+
+def test_overlapping_chunks_are_merged_without_duplication():
+    context = pack_context([_chunk(0, 30, 0), _chunk(20, len(TEXT), 1)], max_tokens=None)
+
+    assert context == f"[출처: docs/회의록.txt]\n{TEXT}"
+
+
+def test_contained_chunk_is_dropped():
+    context = pack_context([_chunk(0, len(TEXT), 0), _chunk(10, 20, 1)], max_tokens=None)
+
+    assert context.count("회의 일정") == 1
+
+
+def test_mismatched_offsets_keep_the_whole_chunk():
+    # 위치는 겹친다고 되어 있지만 실제 텍스트는 이어지지 않는 청크 (위치 정보가 오래된 인덱스)
+    stale = "새로 추가된 안건입니다. 예산을 검토합니다."
+    context = pack_context([_chunk(0, 30, 0), _chunk(20, 20 + len(stale), 1, text=stale)], max_tokens=None)
+
+    assert stale in context
+    assert TEXT[:30] in context
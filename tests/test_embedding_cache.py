@@ -0,0 +1,33 @@
+# tests/test_embedding_cache.py
+
+import asyncio
+import threading
+
+from server.core.embedding_cache import CachedEmbeddings
+from server.core.fake_llm import FakeEmbeddings
+
+
+def test_async_embedding_keeps_sqlite_io_off_the_event_loop(tmp_path):
+    cache = CachedEmbeddings(FakeEmbeddings(size=8), "fake", str(tmp_path / "cache.sqlite3"), hot_size=0)
+    io_threads = []
+
+    for name in ("_disk_get_many", "_disk_put_many"):
+        original = getattr(cache, name)
+
+        def record(*args, _original=original):
+            io_threads.append(threading.get_ident())
+            return _original(*args)
+
+        setattr(cache, name, record)
+
+    async def run():
+        loop_thread = threading.get_ident()
+        first = await cache.aembed_documents(["가", "나"])
+        again = await cache.aembed_query("가")
+        return loop_thread, first, again
+
+    loop_thread, first, again = asyncio.run(run())
+
+    assert len(first) == 2 and len(again) == 8
+    assert cache.get_stats()["misses"] == 3
+    assert io_threads and loop_thread not in io_threads
@@ -0,0 +1,61 @@
+# tests/test_embedding_scheduler.py
+
+from server.core.fake_llm import FakeEmbeddings, FakeRateLimitError
+from server.ingest.embedding_scheduler import EmbeddingScheduler, is_rate_limit_error
+
+
+class _StatusError(Exception):
+    def __init__(self, message: str, status_code: int):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _RateLimitedOnce(FakeEmbeddings):
+    """처음 `failures`번의 호출만 429로 실패하는 가짜 임베딩"""
+
+    def __init__(self, failures: int):
+        super().__init__(size=8)
+        self.failures = failures
+
+    async def aembed_documents(self, texts):
+        if self.failures > 0:
+            self.failures -= 1
+            raise FakeRateLimitError()
+        return await super().aembed_documents(texts)
+
+
+def _batch(start: int, count: int):
+    ids = [f"c{i}" for i in range(start, start + count)]
+    return ids, [f"청크 {i}" for i in range(start, start + count)]
+
+
+def test_concurrency_and_stats_carry_over_between_embed_calls():
+    scheduler = EmbeddingScheduler(_RateLimitedOnce(failures=2), batch_size=1, max_concurrency=8, base_delay=0.0)
+    try:
+        first = scheduler.embed(*_batch(0, 4))
+        reduced = scheduler.stats["final_concurrency"]
+        second = scheduler.embed(*_batch(4, 4))
+    finally:
+        scheduler.close()
+
+    assert len(first) == len(second) == 4
+    assert reduced < 8
+    # 두 번째 호출은 최대값이 아니라 줄인 동시 실행 수에서 시작해 조금씩 늘립니다.
+    assert scheduler.stats["final_concurrency"] <= reduced + 1
+    assert scheduler.stats["rate_limited"] == 2
+    assert scheduler.stats["embedded"] == scheduler.stats["batches"] == 8
+
+
+def test_rate_limit_detection_uses_status_not_message():
+    assert is_rate_limit_error(_StatusError("quota exceeded", 429))
+    assert is_rate_limit_error(FakeRateLimitError())
+    assert not is_rate_limit_error(ValueError("chunk 4290 is too long"))
+    assert not is_rate_limit_error(_StatusError("bad request (429 tokens)", 400))
+
+    try:
+        try:
+            raise _StatusError("too many requests", 429)
+        except _StatusError as e:
+            raise RuntimeError("embedding failed") from e
+    except RuntimeError as wrapped:
+        assert is_rate_limit_error(wrapped)
@@ -0,0 +1,93 @@
+# tests/test_ingest.py
+
+from langchain_community.vectorstores import Chroma
+
+from server.agent import context_budget
+from server.core.config import settings
+from server.core.faiss_index import faiss_index_is_current
+from server.core.fake_llm import FakeEmbeddings
+from server.core.index_paths import get_active_index_path
+from server.ingest import chunking
+from server.ingest.manifest import load_manifest
+from server.scripts.ingest_data import ingest_documents
+
+SECTIONS = "\n\n".join(
+    f"{i}. 안건 {i}\n" + f"안건 {i}의 논의 내용입니다. 담당자와 일정을 정리했습니다. " * 5 for i in range(1, 5)
+)
+
+
+def _ingest(root, docs_dir):
+    ingest_documents(
+        root=str(root), docs_dir=str(docs_dir), embedding_function=FakeEmbeddings(), chunk_strategy="section", workers=0
+    )
+    vectorstore = Chroma(persist_directory=get_active_index_path(str(root)), embedding_function=FakeEmbeddings())
+    return vectorstore._collection.get(include=["documents", "metadatas"])
+
+
+def test_reingest_refreshes_offsets_of_retained_chunks(tmp_path):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    path = docs_dir / "회의록.txt"
+    path.write_text(SECTIONS, encoding="utf-8")
+    before = _ingest(tmp_path / "db", docs_dir)
+
+    # 앞에 새 섹션을 넣으면 기존 섹션 청크는 그대로(같은 ID) 남고 위치만 뒤로 밀립니다.
+    text = "0. 새 안건\n새로 추가된 안건의 논의 내용입니다. 다음 주까지 검토합니다. " * 3 + "\n\n" + SECTIONS
+    path.write_text(text, encoding="utf-8")
+    after = _ingest(tmp_path / "db", docs_dir)
+
+    assert set(before["ids"]) < set(after["ids"])
+    for document, metadata in zip(after["documents"], after["metadatas"]):
+        assert metadata["start_index"] == text.find(document)
+        assert metadata["end_index"] == metadata["start_index"] + len(document)
+    assert sorted(m["chunk_index"] for m in after["metadatas"]) == list(range(len(after["ids"])))
+
+
+def test_chunking_shares_context_budget_token_counter():
+    assert chunking.count_tokens is context_budget.count_tokens
+    assert context_budget.count_tokens("") == 0
+
+
+def test_unchanged_docs_still_build_missing_or_stale_faiss_index(tmp_path, monkeypatch):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "회의록.txt").write_text(SECTIONS, encoding="utf-8")
+    root = str(tmp_path / "db")
+    _ingest(root, docs_dir)
+
+    # 문서는 그대로인 채 VECTOR_BACKEND=faiss로 바꾸면 FAISS 인덱스만 만듭니다.
+    monkeypatch.setattr(settings, "VECTOR_BACKEND", "faiss")
+    _ingest(root, docs_dir)
+    index_path = get_active_index_path(root)
+    assert faiss_index_is_current(index_path, settings.FAISS_INDEX_TYPE)
+
+    # 설정이 같으면 새 인덱스를 만들지 않습니다.
+    _ingest(root, docs_dir)
+    assert get_active_index_path(root) == index_path
+
+    # 인덱스 종류가 바뀌면 다시 만듭니다.
+    monkeypatch.setattr(settings, "FAISS_INDEX_TYPE", "binary")
+    _ingest(root, docs_dir)
+    assert get_active_index_path(root) != index_path
+    assert faiss_index_is_current(get_active_index_path(root), "binary")
+
+
+def test_embedding_model_change_rebuilds_the_index(tmp_path):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    (docs_dir / "회의록.txt").write_text(SECTIONS, encoding="utf-8")
+    root = str(tmp_path / "db")
+    ingest_documents(root=root, docs_dir=str(docs_dir), embedding_function=FakeEmbeddings(), workers=0)
+    old_path = get_active_index_path(root)
+
+    # 차원이 다른 임베딩 모델로 바꾸면 문서가 그대로여도 새 인덱스에 전체를 다시 임베딩합니다.
+    ingest_documents(root=root, docs_dir=str(docs_dir), embedding_function=FakeEmbeddings(size=128), workers=0)
+    assert get_active_index_path(root) != old_path
+
+    # 이후 문서를 추가해도 새 차원의 컬렉션에 그대로 저장됩니다.
+    (docs_dir / "보고서.txt").write_text("프로젝트 A 보고서\n향후 과제를 정리했습니다.", encoding="utf-8")
+    ingest_documents(root=root, docs_dir=str(docs_dir), embedding_function=FakeEmbeddings(size=128), workers=0)
+    vectorstore = Chroma(persist_directory=get_active_index_path(root), embedding_function=FakeEmbeddings(size=128))
+    stored = vectorstore._collection.get(include=["embeddings"])
+    assert {len(vector) for vector in stored["embeddings"]} == {128}
+    assert load_manifest(get_active_index_path(root))["embedding"] == {"model": "fake-embedding-128", "dim": 128}
@@ -0,0 +1,118 @@
+# tests/test_llm_routing.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage
+
+from server.core.fake_llm import FakeChatModel
+from server.core.llm_routing import CircuitBreaker, RoutingChatModel
+
+
+def _provider(latency: float, failure_rate: float = 0.0) -> FakeChatModel:
+    return FakeChatModel(tool_name=None, latency=latency, failure_rate=failure_rate)
+
+
+def test_fallback_restarts_the_hedge_timer():
+    # primary는 0.05초 뒤 실패, backup은 0.08초 뒤 첫 토큰. 헤지 대기는 0.1초.
+    # 대체 시점부터 다시 재야 backup을 기다리고, 요청 시각부터 재면 0.1초에 spare로 헤지합니다.
+    model = RoutingChatModel(
+        providers=[("primary", _provider(0.05, failure_rate=1.0)), ("backup", _provider(0.08)), ("spare", _provider(0.01))],
+        hedge_initial_delay=0.1,
+        hedge_max_ratio=1.0,
+    )
+
+    message = asyncio.run(model.ainvoke([HumanMessage(content="안녕")]))
+    stats = model.get_stats()
+
+    assert "안녕" in message.content
+    assert stats["fallbacks"] == 1
+    assert stats["hedged"] == 0
+    assert stats["providers"]["spare"]["calls"] == 0
+
+
+def test_concurrent_sync_calls_keep_consistent_stats():
+    model = RoutingChatModel(providers=[("primary", _provider(0.0)), ("backup", _provider(0.0))])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: model.invoke([HumanMessage(content=f"질문 {i}")]), range(400)))
+    stats = model.get_stats()
+
+    assert stats["requests"] == 400
+    assert stats["providers"]["primary"]["calls"] == stats["providers"]["primary"]["success"] == 400
+
+
+def test_slow_primary_is_hedged_and_the_faster_provider_wins():
+    model = RoutingChatModel(
+        providers=[("primary", _provider(0.5)), ("backup", _provider(0.0))],
+        hedge_initial_delay=0.05,
+        hedge_max_ratio=1.0,
+    )
+
+    start = time.perf_counter()
+    message = asyncio.run(model.ainvoke([HumanMessage(content="안녕")]))
+    elapsed = time.perf_counter() - start
+    stats = model.get_stats()
+
+    assert "안녕" in message.content
+    assert elapsed < 0.4
+    assert stats["hedged"] == stats["hedge_wins"] == 1
+    assert stats["providers"]["primary"]["cancelled"] == 1
+    assert stats["providers"]["backup"]["success"] == 1
+
+
+def test_hedge_max_ratio_caps_hedged_requests():
+    model = RoutingChatModel(
+        providers=[("primary", _provider(0.1)), ("backup", _provider(0.0))],
+        hedge_initial_delay=0.01,
+        hedge_max_ratio=0.2,
+    )
+
+    async def run():
+        await asyncio.gather(*(model.ainvoke([HumanMessage(content=f"질문 {i}")]) for i in range(10)))
+
+    asyncio.run(run())
+    stats = model.get_stats()
+
+    assert stats["requests"] == 10
+    assert 1 <= stats["hedged"] <= 2
+    assert stats["providers"]["primary"]["success"] == 10 - stats["hedge_wins"]
+
+
+def test_breaker_opens_rejects_during_cooldown_and_closes_after_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(window=10, min_calls=3, error_rate=0.5, cooldown=30.0, clock=lambda: now[0])
+
+    for _ in range(2):
+        breaker.record(False)
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "open" and breaker.trips == 1
+
+    now[0] = 29.0
+    assert not breaker.allow()
+
+    now[0] = 30.0
+    assert breaker.allow()  # 회복 확인 요청
+    assert breaker.state == "half_open"
+    assert not breaker.allow()  # half_open에서는 하나만 허용
+    breaker.record(True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failing_primary_is_skipped_once_its_breaker_opens():
+    model = RoutingChatModel(
+        providers=[("primary", _provider(0.0, failure_rate=1.0)), ("backup", _provider(0.0))],
+        hedge=False,
+        breaker_min_calls=3,
+        breaker_cooldown=60.0,
+    )
+
+    for i in range(5):
+        model.invoke([HumanMessage(content=f"질문 {i}")])
+    primary = model.get_stats()["providers"]["primary"]
+
+    assert primary["breaker"] == "open"
+    assert primary["error"] == 3
+    assert primary["rejected"] == 2
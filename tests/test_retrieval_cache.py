@@ -0,0 +1,69 @@
+# tests/test_retrieval_cache.py
+
+from langchain_core.documents import Document
+
+import server.core.retrieval_cache as retrieval_cache
+from server.core.retrieval_cache import RetrievalCache
+
+
+def _docs(text: str):
+    return [Document(id="c1", page_content=text, metadata={"source": "a.txt"})]
+
+
+def _freeze_time(monkeypatch, start: float = 1000.0):
+    now = [start]
+    monkeypatch.setattr(retrieval_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = _freeze_time(monkeypatch)
+    cache = RetrievalCache(ttl=60.0)
+    cache.put("회의록 요약", 3, "v1", _docs("회의록"))
+
+    now[0] += 59
+    assert cache.get("회의록 요약", 3, "v1")[0].page_content == "회의록"
+    now[0] += 2
+    assert cache.get("회의록 요약", 3, "v1") is None
+
+    stats = cache.get_stats()
+    assert stats["memory_hits"] == 1 and stats["misses"] == 1
+    assert stats["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = RetrievalCache(max_entries=2)
+    cache.put("질문 1", 3, "v1", _docs("1"))
+    cache.put("질문 2", 3, "v1", _docs("2"))
+    cache.get("질문 1", 3, "v1")  # 질문 1을 최근 사용으로 올립니다.
+    cache.put("질문 3", 3, "v1", _docs("3"))
+    cache.put("질문 4", 3, "v1", _docs("4"))
+
+    assert cache.get_stats()["evictions"] == 2
+    assert cache.get("질문 2", 3, "v1") is None
+    assert cache.get("질문 1", 3, "v1") is None
+    assert cache.get("질문 4", 3, "v1") is not None
+
+
+def test_corpus_version_change_is_a_miss():
+    cache = RetrievalCache()
+    cache.put("회의록 요약", 3, "v1", _docs("이전 인덱스"))
+
+    assert cache.get("  회의록   요약 ", 3, "v1") is not None
+    assert cache.get("회의록 요약", 3, "v2") is None
+
+
+def test_workers_share_results_through_one_sqlite_file(tmp_path):
+    path = str(tmp_path / "retrieval.sqlite3")
+    worker_a = RetrievalCache(shared_path=path)
+    worker_b = RetrievalCache(shared_path=path)
+
+    worker_a.put("회의록 요약", 3, "v1", _docs("회의록"))
+    docs = worker_b.get("회의록 요약", 3, "v1")
+    again = worker_b.get("회의록 요약", 3, "v1")
+
+    assert docs[0].page_content == again[0].page_content == "회의록"
+    assert docs[0].metadata == {"source": "a.txt"}
+    stats = worker_b.get_stats()
+    assert stats["shared_hits"] == 1 and stats["memory_hits"] == 1
+    assert worker_b.get("회의록 요약", 3, "v2") is None
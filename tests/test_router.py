@@ -0,0 +1,83 @@
+# tests/test_router.py
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import server.agent.logic as logic
+from server.agent.router import IntentRouter
+from server.core.fake_llm import FakeEmbeddings
+
+
+def _route(router: IntentRouter, question: str, follow_up: bool = False):
+    return asyncio.run(router.aroute(question, follow_up=follow_up))
+
+
+@pytest.mark.parametrize(
+    "question, tool_name",
+    [
+        ("오늘 일정 알려줘", "get_schedule"),
+        ("오늘 미팅이 몇 개야?", "get_schedule"),
+        ("메일함에 중요한 거 있어?", "get_email_summary"),
+        ("새 이메일 온 거 있어?", "get_email_summary"),
+        ("AI 도입 TF 회의록 요약해줘", "search_knowledge_base"),
+        ("프로젝트 A 보고서의 향후 과제는?", "search_knowledge_base"),
+    ],
+)
+def test_clear_questions_are_routed_by_keyword(question, tool_name):
+    decision = _route(IntentRouter(), question)
+
+    assert decision.method == "keyword"
+    assert decision.tool_name == tool_name
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "파이썬 자료구조 설명해줘",  # "자료"가 다른 단어의 일부
+        "이 문서를 영어로 번역해줘",  # 약한 키워드만 있음
+        "오늘 일정이랑 새 메일 둘 다 알려줘",  # 도구가 둘 필요한 질문
+        "내일 일정 알려줘",  # 도구 인자를 LLM이 정해야 하는 질문
+    ],
+)
+def test_ambiguous_questions_fall_back_to_llm(question):
+    decision = _route(IntentRouter(embeddings=FakeEmbeddings()), question)
+
+    assert not decision.routed
+    assert decision.method == "fallback"
+
+
+def test_keyword_must_end_at_word_boundary():
+    router = IntentRouter()
+
+    assert router.match_keywords("파이썬 자료구조 설명해줘") == {}
+    assert router.match_keywords("사내 자료에서 찾아줘") == {"knowledge": ["자료"]}
+    assert set(router.match_keywords("오늘 일정이랑 새 메일 둘 다 알려줘")) == {"schedule", "email"}
+
+
+def test_weak_keyword_is_routed_when_embedding_agrees():
+    # 가짜 임베딩은 예시 질문과 똑같은 질문에서만 유사도가 높습니다.
+    decision = _route(IntentRouter(embeddings=FakeEmbeddings()), "사내 자료에서 관련 내용 찾아줘")
+
+    assert decision.method == "embedding"
+    assert decision.tool_name == "search_knowledge_base"
+
+
+def test_follow_up_question_is_left_to_the_llm():
+    decision = _route(IntentRouter(), "회의록 요약해줘", follow_up=True)
+
+    assert not decision.routed
+    assert decision.reason == "이전 대화가 있는 질문"
+
+
+def test_router_node_skips_sessions_with_earlier_turns():
+    question = HumanMessage(content="회의록 요약해줘")
+
+    single = asyncio.run(logic.router_node({"messages": [question]}))
+    follow_up = asyncio.run(
+        logic.router_node({"messages": [HumanMessage(content="지난주 회의 자료 찾아줘"), AIMessage(content="..."), question]})
+    )
+
+    assert single["messages"][0].tool_calls[0]["name"] == "search_knowledge_base"
+    assert follow_up == {"messages": []}
@@ -0,0 +1,38 @@
+# tests/test_semantic_cache.py
+
+import asyncio
+
+from server.core.fake_llm import FakeEmbeddings
+from server.core.semantic_cache import SemanticCache
+
+
+async def _events():
+    yield "token", {"text": "안녕"}
+    yield "token", {"text": "하세요"}
+
+
+def _collect(cache: SemanticCache, query: str):
+    async def main():
+        return [item async for item in cache.wrap(query, _events())]
+
+    return asyncio.run(main())
+
+
+def test_repeated_question_is_served_from_cache(tmp_path):
+    cache = SemanticCache(FakeEmbeddings(), index_root=str(tmp_path))
+
+    first = _collect(cache, "오늘 일정 알려줘")
+    second = _collect(cache, "오늘 일정 알려줘")
+
+    assert [e for e, _ in first] == ["token", "token"]
+    assert second[0][0] == "cache"
+    assert [d["text"] for e, d in second if e == "token"] == ["안녕", "하세요"]
+
+
+def test_embedding_failure_falls_back_to_agent_stream(tmp_path):
+    cache = SemanticCache(FakeEmbeddings(rate_limit_rate=1.0), index_root=str(tmp_path))
+
+    events = _collect(cache, "오늘 일정 알려줘")
+
+    assert [d["text"] for _, d in events] == ["안녕", "하세요"]
+    assert cache.get_stats()["lookup_errors"] == 1
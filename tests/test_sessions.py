@@ -0,0 +1,110 @@
+# tests/test_sessions.py
+
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import server.agent.logic as logic
+from server.agent.sessions import LatestCheckpointSaver, SessionManager, capped_messages, create_checkpointer
+from server.core.fake_llm import FakeChatModel
+
+
+def _manager(**kwargs) -> SessionManager:
+    return SessionManager(LatestCheckpointSaver(), **kwargs)
+
+
+def test_eviction_skips_busy_sessions_without_spinning():
+    manager = _manager(max_sessions=1)
+
+    async def main():
+        a_started, b_started, release = asyncio.Event(), asyncio.Event(), asyncio.Event()
+
+        async def hold(session_id, started):
+            async with manager.session(session_id):
+                started.set()
+                await release.wait()
+
+        holders = [asyncio.create_task(hold("a", a_started)), asyncio.create_task(hold("b", b_started))]
+        await a_started.wait()
+        await b_started.wait()
+        # a, b 모두 실행 중이면 지울 수 있는 세션이 없으므로, 정리는 바로 끝나고 b의 잠금을 기다려야 합니다.
+        waiter = asyncio.create_task(hold("b", asyncio.Event()))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*holders, waiter), timeout=1)
+
+    asyncio.run(main())
+    assert set(manager._last_used) <= {"a", "b"}
+
+
+def test_new_session_is_not_evicted_by_its_own_request():
+    manager = _manager(max_sessions=1)
+
+    async def main():
+        async with manager.session("a"):
+            pass
+        async with manager.session("b"):
+            assert "b" in manager._last_used
+
+    asyncio.run(main())
+    assert list(manager._last_used) == ["b"]
+    assert manager.get_stats()["evicted"] == 1
+
+
+def test_expired_sessions_are_deleted():
+    manager = _manager(ttl=0.01)
+
+    async def main():
+        async with manager.session("a"):
+            pass
+        await asyncio.sleep(0.02)
+        async with manager.session("b"):
+            pass
+
+    asyncio.run(main())
+    assert list(manager._last_used) == ["b"]
+    assert manager.get_stats()["expired"] == 1
+
+
+def test_capped_messages_trims_whole_turns(monkeypatch):
+    monkeypatch.setattr("server.agent.sessions.settings.SESSION_MAX_MESSAGES", 3)
+    turns = [HumanMessage(content="q1"), AIMessage(content="a1"), HumanMessage(content="q2"), AIMessage(content="a2")]
+
+    merged = capped_messages(turns[:2], turns[2:])
+
+    assert [m.content for m in merged] == ["q2", "a2"]
+
+
+def test_sqlite_session_store_persists_conversation(tmp_path, monkeypatch):
+    monkeypatch.setattr("server.agent.sessions.settings.SESSION_DB_PATH", str(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(logic, "llm_with_tools", FakeChatModel(tool_name=None).bind(tools=logic.get_tools()))
+    config = {"configurable": {"thread_id": "s1"}}
+
+    async def main():
+        checkpointer = create_checkpointer("sqlite")
+        graph = logic.build_workflow().compile(checkpointer=checkpointer)
+        try:
+            await graph.ainvoke({"messages": [HumanMessage(content="첫 질문")]}, config)
+            await graph.ainvoke({"messages": [HumanMessage(content="두 번째 질문")]}, config)
+            return (await graph.aget_state(config)).values["messages"]
+        finally:
+            await checkpointer.conn.close()
+
+    messages = asyncio.run(main())
+    assert [m.content for m in messages if isinstance(m, HumanMessage)] == ["첫 질문", "두 번째 질문"]
+
+
+def test_session_continues_conversation_and_can_be_seeded(monkeypatch):
+    monkeypatch.setattr(logic, "llm_with_tools", FakeChatModel(tool_name=None).bind(tools=logic.get_tools()))
+    graph = logic.build_workflow().compile(checkpointer=LatestCheckpointSaver())
+    config = {"configurable": {"thread_id": "s1"}}
+
+    async def main():
+        seeded = [HumanMessage(content="이전 질문"), AIMessage(content="이전 답변")]
+        await graph.ainvoke({"messages": seeded + [HumanMessage(content="첫 질문")]}, config)
+        await graph.ainvoke({"messages": [HumanMessage(content="두 번째 질문")]}, config)
+        return (await graph.aget_state(config)).values["messages"]
+
+    messages = asyncio.run(main())
+    assert [m.content for m in messages if isinstance(m, HumanMessage)] == ["이전 질문", "첫 질문", "두 번째 질문"]